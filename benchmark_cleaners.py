@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Unicode Cleaners
+
+This script measures normalize_unicode, process_json_value and the two file
+cleaners on the bundled corpora and on synthetic text of a chosen size, and
+reports throughput, per-stage time and peak memory.  Results can be saved as
+JSON and compared against an earlier run to catch regressions.
+
+Usage:
+    python benchmark_cleaners.py
+    python benchmark_cleaners.py --sizes 1MB,64MB --output results.json
+    python benchmark_cleaners.py --compare results.json  # fails on regressions
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from unicode_cleaner import jsonl, markdown, normalize
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+BUNDLED_CORPORA = ['train.jsonl', 'pr_uni.jsonl', 'gemini_dt.jsonl', 'pr2.md']
+
+# Per-stage timings are taken on an in-memory prefix of at most this size
+MAX_IN_MEMORY_BYTES = 64 << 20
+
+# Character pools of the synthetic text profiles; ASCII words are mixed into all of them
+SYNTHETIC_PROFILES = {
+    'ascii': '',
+    'accents': 'àáâäãåçèéêëìíîïñòóôöõùúûüýÿÀÉÎÕÜßæœøł',
+    'greek_symbols': 'αβγδεζηθλμπσφψωΑΒΓΔΘΛΣΦΨΩ°±×÷²³½¼¾€£¥©®™→←↔⇒≈≠≤≥∞…“”‘’—–',
+    'cjk': '的一是不了人我在有他这中大来上个国到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可她里后小么心多天而能好都然没日于起还发成事只作当想看文无开手十用主行方又如前所本见经头面公同三已老从动两长',
+}
+
+ASCII_WORDS = ('the of and to in is for that with on as are this be by from at or an it not '
+               'data model training record fine tuning league summit assistant question answer').split()
+
+
+def parse_size(text):
+    """Parse a size such as '64KB', '1MB' or '2GB' into bytes."""
+    units = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'B': 1}
+    text = text.strip().upper()
+    for unit, factor in units.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def _synthetic_sentence(rng, pool, length):
+    words = []
+    for _ in range(length):
+        word = rng.choice(ASCII_WORDS)
+        if pool and rng.random() < 0.3:
+            word = ''.join(rng.choice(pool) for _ in range(rng.randint(1, 6)))
+        words.append(word)
+    return ' '.join(words).capitalize() + '.'
+
+
+def write_synthetic_jsonl(path, profile, size, seed=0):
+    """Write instruction/context/response records of one text profile until size bytes."""
+    rng = random.Random(seed)
+    pool = SYNTHETIC_PROFILES[profile]
+    written = 0
+    with open(path, 'w', encoding='utf-8') as outfile:
+        while written < size:
+            record = {
+                'instruction': _synthetic_sentence(rng, pool, rng.randint(5, 20)),
+                'context': '',
+                'response': ' '.join(_synthetic_sentence(rng, pool, rng.randint(5, 25))
+                                     for _ in range(rng.randint(1, 6))),
+            }
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+            outfile.write(line)
+            written += len(line.encode('utf-8'))
+
+
+def write_synthetic_markdown(path, profile, size, seed=0):
+    """Write question/answer markdown of one text profile until size bytes."""
+    rng = random.Random(seed)
+    pool = SYNTHETIC_PROFILES[profile]
+    written = 0
+    number = 0
+    with open(path, 'w', encoding='utf-8') as outfile:
+        while written < size:
+            number += 1
+            block = (f"{number}. **Q: {_synthetic_sentence(rng, pool, rng.randint(5, 15))}**\n"
+                     f"   **A:** {_synthetic_sentence(rng, pool, rng.randint(10, 40))}\n\n")
+            outfile.write(block)
+            written += len(block.encode('utf-8'))
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _clean_file_in_child(kind, input_path, output_path, queue):
+    """Run one file cleaner in a fresh process and report its time and peak memory."""
+    baseline_rss = _peak_rss_bytes()
+    clean_file = jsonl.clean_jsonl_file if kind == 'jsonl' else markdown.clean_markdown_file
+    seconds, counts = _timed(clean_file, input_path, output_path)
+    queue.put((seconds, counts, baseline_rss, _peak_rss_bytes()))
+
+
+def benchmark_file(kind, input_path):
+    """
+    Time a whole-file clean in a separate process so its peak memory is isolated.
+
+    Returns:
+        dict: Seconds, throughput, counts and peak RSS of the run
+    """
+    size = Path(input_path).stat().st_size
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = str(Path(temp_dir) / Path(input_path).name)
+        child = context.Process(target=_clean_file_in_child, args=(kind, str(input_path), output_path, queue))
+        child.start()
+        seconds, counts, baseline_rss, peak_rss = queue.get()
+        child.join()
+
+    result = {
+        'seconds': seconds,
+        'mb_per_s': size / seconds / 1e6,
+        'lines': counts[0],
+        'lines_per_s': counts[0] / seconds,
+        'peak_rss_bytes': peak_rss,
+        'peak_rss_growth_bytes': None if peak_rss is None else peak_rss - baseline_rss,
+    }
+    if kind == 'jsonl':
+        result['records_per_s'] = counts[2] / seconds
+    return result
+
+
+def _read_prefix_lines(input_path):
+    with open(input_path, 'r', encoding='utf-8') as infile:
+        text = infile.read(MAX_IN_MEMORY_BYTES)
+    return text.splitlines(keepends=True)
+
+
+def benchmark_jsonl_stages(input_path):
+    """
+    Time each stage of the JSONL pipeline separately on an in-memory copy.
+
+    Returns:
+        dict: Seconds per stage and normalize_unicode throughput
+    """
+    lines = _read_prefix_lines(input_path)
+    data_bytes = sum(len(line.encode('utf-8')) for line in lines)
+    backend = jsonl.get_json_backend()
+
+    stats = {}
+    parse_seconds, records = _timed(
+        lambda: list(jsonl.parse_jsonl_lines(lines, stats, lambda *args: None, backend)))
+    normalize_seconds, normalized = _timed(lambda: [normalize.process_json_value(r) for r in records])
+    serialize_seconds, serialized = _timed(lambda: list(jsonl.serialize_records(normalized, backend)))
+    write_seconds, _ = _timed(lambda: io.StringIO().write(''.join(serialized)))
+
+    strings = [value for record in records if isinstance(record, dict)
+               for value in record.values() if isinstance(value, str)]
+    string_bytes = sum(len(value.encode('utf-8')) for value in strings)
+    unicode_seconds, _ = _timed(lambda: [normalize.normalize_unicode(value) for value in strings])
+
+    return {
+        'sample_bytes': data_bytes,
+        'records': len(records),
+        'stage_seconds': {
+            'parse': parse_seconds,
+            'normalize': normalize_seconds,
+            'serialize': serialize_seconds,
+            'write': write_seconds,
+        },
+        'process_json_value_records_per_s': len(records) / normalize_seconds if normalize_seconds else None,
+        'normalize_unicode_mb_per_s': string_bytes / unicode_seconds / 1e6 if unicode_seconds else None,
+    }
+
+
+def benchmark_markdown_stages(input_path):
+    """
+    Time normalize_unicode line by line on an in-memory copy of a Markdown file.
+
+    Returns:
+        dict: Seconds of the normalize stage and its throughput
+    """
+    lines = _read_prefix_lines(input_path)
+    data_bytes = sum(len(line.encode('utf-8')) for line in lines)
+    normalize_seconds, _ = _timed(lambda: [normalize.normalize_unicode(line) for line in lines])
+    return {
+        'sample_bytes': data_bytes,
+        'stage_seconds': {'normalize': normalize_seconds},
+        'normalize_unicode_mb_per_s': data_bytes / normalize_seconds / 1e6 if normalize_seconds else None,
+    }
+
+
+def run_benchmark(name, input_path):
+    """Run the file and stage benchmarks for one input."""
+    kind = 'markdown' if Path(input_path).suffix == '.md' else 'jsonl'
+    stages = benchmark_jsonl_stages if kind == 'jsonl' else benchmark_markdown_stages
+    return {
+        'name': name,
+        'kind': kind,
+        'bytes': Path(input_path).stat().st_size,
+        'file': benchmark_file(kind, input_path),
+        **stages(input_path),
+    }
+
+
+def compare_results(current, baseline, threshold):
+    """
+    Compare file throughput against a previous run.
+
+    Returns:
+        list: Descriptions of benchmarks that got slower by more than threshold
+    """
+    previous = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get(result['name'])
+        if before is None:
+            continue
+        ratio = result['file']['mb_per_s'] / before['file']['mb_per_s']
+        if ratio < 1 - threshold:
+            regressions.append(f"{result['name']}: {before['file']['mb_per_s']:.1f} -> "
+                               f"{result['file']['mb_per_s']:.1f} MB/s ({(ratio - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def _print_result(result):
+    file_result = result['file']
+    line = (f"{result['name']:32} {result['bytes'] / 1e6:9.2f} MB "
+            f"{file_result['mb_per_s']:8.1f} MB/s")
+    if 'records_per_s' in file_result:
+        line += f" {file_result['records_per_s']:10.0f} rec/s"
+    if file_result['peak_rss_bytes'] is not None:
+        line += f"  peak {file_result['peak_rss_bytes'] / 1e6:7.1f} MB"
+    stages = ', '.join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in result['stage_seconds'].items())
+    print(line)
+    print(f"{'':32} stages: {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark normalize_unicode and the JSONL/Markdown cleaners",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                   # Bundled corpora and 1MB synthetic text
+  %(prog)s --sizes 64KB,16MB,1GB             # Synthetic text from KB to GB
+  %(prog)s --output new.json --compare old.json  # Save and check for regressions
+        """
+    )
+    parser.add_argument('--sizes', default='1MB',
+                        help='Comma-separated synthetic input sizes, e.g. 64KB,1MB,1GB (default: 1MB)')
+    parser.add_argument('--profiles', default=','.join(SYNTHETIC_PROFILES),
+                        help=f"Comma-separated synthetic text profiles (default: {','.join(SYNTHETIC_PROFILES)})")
+    parser.add_argument('--no-bundled', action='store_true', help='Skip the bundled corpora')
+    parser.add_argument('--output', help='Save results as JSON')
+    parser.add_argument('--compare', help='Compare against results saved by an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Throughput drop that counts as a regression (default: 0.1 = 10%%)')
+
+    args = parser.parse_args()
+
+    results = []
+    if not args.no_bundled:
+        for corpus in BUNDLED_CORPORA:
+            results.append(run_benchmark(corpus, corpus))
+            _print_result(results[-1])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size_text in args.sizes.split(','):
+            size = parse_size(size_text)
+            for profile in args.profiles.split(','):
+                for kind, write in (('jsonl', write_synthetic_jsonl), ('md', write_synthetic_markdown)):
+                    path = Path(temp_dir) / f"{profile}_{size_text}.{kind}"
+                    write(path, profile, size)
+                    results.append(run_benchmark(f"{profile}/{size_text}/{kind}", path))
+                    _print_result(results[-1])
+                    path.unlink()
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'json_backend': jsonl.get_json_backend().name,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outfile:
+            json.dump(report, outfile, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as infile:
+            regressions = compare_results(report, json.load(infile), args.threshold)
+        if regressions:
+            print("Regressions:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
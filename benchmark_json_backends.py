@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+JSON Backend Benchmark for the JSONL Cleaner
+
+This script times the JSONL cleaning pipeline of clean_jsonl.py with every
+installed JSON backend and checks that all backends produce identical output.
+
+Usage:
+    python benchmark_json_backends.py
+    python benchmark_json_backends.py --repeat 20 train.jsonl pr_uni.jsonl
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+from unicode_cleaner.jsonl import JSON_BACKENDS, _clean_jsonl_lines
+
+
+DEFAULT_CORPORA = ['train.jsonl', 'pr_uni.jsonl']
+
+
+def benchmark_backend(lines, backend_name, repeat):
+    """
+    Clean the same lines repeatedly with one JSON backend.
+
+    Args:
+        lines (list): Lines of JSONL text
+        backend_name (str): Name of the JSON backend
+        repeat (int): Number of timed runs
+
+    Returns:
+        tuple: (best_seconds, cleaned_text)
+    """
+    best = float('inf')
+    cleaned_text = None
+    for _ in range(repeat):
+        outfile = io.StringIO()
+        start = time.perf_counter()
+        _clean_jsonl_lines(lines, outfile, on_invalid=lambda *args: None, json_backend=backend_name)
+        best = min(best, time.perf_counter() - start)
+        cleaned_text = outfile.getvalue()
+    return best, cleaned_text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON backends of the JSONL cleaner on bundled corpora",
+    )
+    parser.add_argument('corpora', nargs='*', default=DEFAULT_CORPORA, help='JSONL files to clean')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed runs per backend (default: 10)')
+
+    args = parser.parse_args()
+
+    mismatch = False
+    for corpus in args.corpora:
+        data = Path(corpus).read_bytes()
+        lines = data.decode('utf-8').splitlines(keepends=True)
+        print(f"{corpus}: {len(data) / 1024:.1f} KiB, {len(lines)} lines")
+
+        reference = None
+        for backend_name in JSON_BACKENDS:
+            seconds, cleaned_text = benchmark_backend(lines, backend_name, args.repeat)
+            if reference is None:
+                reference = cleaned_text
+            same = cleaned_text == reference
+            mismatch |= not same
+            print(f"  {backend_name:8} {seconds * 1000:8.2f} ms  "
+                  f"{len(data) / seconds / 1e6:8.1f} MB/s  "
+                  f"{'identical' if same else 'OUTPUT DIFFERS'}")
+
+    if mismatch:
+        print("Error: backends produced different output", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,292 +9,97 @@ This script processes JSONL (JSON Lines) files to:
 Usage:
     python clean_jsonl.py input.jsonl output.jsonl
     python clean_jsonl.py input.jsonl  # processes in-place
+    python clean_jsonl.py --workers 8 input.jsonl output.jsonl  # parallel
+    python clean_jsonl.py --validate-only cleaned.jsonl  # check the schema, write nothing
 """
 
-import json
-import unicodedata
 import argparse
+import functools
 import sys
-from pathlib import Path
+from collections import Counter
 
+from unicode_cleaner.batch import expand_input_paths, is_batch_invocation
+from unicode_cleaner.cli import print_cache_info, print_substitutions, run_batch
+from unicode_cleaner.compressed_io import is_stdio
+from unicode_cleaner.dedup import DEFAULT_THRESHOLD, Deduplicator
+from unicode_cleaner.incremental import DEFAULT_CHUNK_LINES
+from unicode_cleaner.jsonl import DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_BYTES, validate_jsonl_file
+from unicode_cleaner.lengths import OVER_BUDGET_ACTIONS, LengthStats
+from unicode_cleaner.normalize import describe_substitution, normalize_cache_info, use_profile
+from unicode_cleaner.profiling import Profiler, write_report
+from unicode_cleaner.transliteration import DEFAULT_PROFILE_NAME, available_profiles
+from unicode_cleaner.validate import DEFAULT_SCHEMA, ValidationReport
 
-def normalize_unicode(text):
-    """Normalize Unicode characters to ASCII equivalents by removing accents and replacing typographic characters."""
-    # First apply NFKD normalization (decomposes accented characters)
-    normalized = unicodedata.normalize('NFKD', text)
-    
-    # Remove combining characters (accent marks) to get pure ASCII base characters
-    # Filter out characters in categories 'Mn' (Mark, nonspacing) and 'Mc' (Mark, spacing combining)
-    ascii_text = ''.join(char for char in normalized 
-                        if unicodedata.category(char) not in ('Mn', 'Mc'))
-    
-    # Define replacements for common typographic characters
-    replacements = {
-        # Quotation marks
-        '\u201c': '"',  # Left double quotation mark
-        '\u201d': '"',  # Right double quotation mark
-        '\u2018': "'",  # Left single quotation mark
-        '\u2019': "'",  # Right single quotation mark
-        '\u201a': "'",  # Single low-9 quotation mark
-        '\u201e': '"',  # Double low-9 quotation mark
-        '\u2039': "'",  # Single left-pointing angle quotation mark
-        '\u203a': "'",  # Single right-pointing angle quotation mark
-        '\u00ab': '"',  # Left-pointing double angle quotation mark
-        '\u00bb': '"',  # Right-pointing double angle quotation mark
-        '\u300e': '"',  # Left white corner bracket
-        '\u300f': '"',  # Right white corner bracket
-        '\u300c': '"',  # Left corner bracket
-        '\u300d': '"',  # Right corner bracket
-        
-        # Apostrophes
-        '\u2019': "'",  # Right single quotation mark (apostrophe)
-        '`': "'",       # Grave accent (used as apostrophe)
-        '\u00b4': "'",  # Acute accent (used as apostrophe)
-        '\u02bc': "'",  # Modifier letter apostrophe
-        '\u02bb': "'",  # Modifier letter turned comma
-        
-        # Dashes
-        '\u2014': '-',  # Em dash
-        '\u2013': '-',  # En dash
-        '\u2212': '-',  # Minus sign
-        '\u2012': '-',  # Figure dash
-        '\u2e3a': '-',  # Two-em dash
-        '\u2e3b': '-',  # Three-em dash
-        '\ufe58': '-',  # Small em dash
-        '\ufe63': '-',  # Small hyphen-minus
-        
-        # Other common typographic characters
-        '\u2026': '...',  # Horizontal ellipsis
-        '\u2030': '%o',   # Per mille sign
-        '\u2031': '%oo',  # Per ten thousand sign
-        '\u2032': "'",    # Prime (often used as apostrophe)
-        '\u2033': '"',    # Double prime (often used as quote)
-        '\u2034': "'''",  # Triple prime
-        '\u2057': "''''", # Quadruple prime
-    }
-    
-    # Apply character replacements to the ASCII text
-    for original, replacement in replacements.items():
-        ascii_text = ascii_text.replace(original, replacement)
-    
-    # Additional mappings for characters that might not be handled by NFKD
-    additional_mappings = {
-        # Currency symbols
-        '€': 'EUR',
-        '£': 'GBP', 
-        '¥': 'JPY',
-        '¢': 'c',
-        '₹': 'Rs',
-        '₽': 'Rub',
-        
-        # Mathematical symbols
-        '×': 'x',
-        '÷': '/',
-        '±': '+/-',
-        '°': 'deg',
-        '²': '2',
-        '³': '3',
-        '¼': '1/4',
-        '½': '1/2',  
-        '¾': '3/4',
-        '⅐': '1/7',
-        '⅑': '1/9', 
-        '⅒': '1/10',
-        '⅓': '1/3',
-        '⅔': '2/3',
-        '⅕': '1/5',
-        '⅖': '2/5',
-        '⅗': '3/5',
-        '⅘': '4/5',
-        '⅙': '1/6',
-        '⅚': '5/6',
-        '⅛': '1/8',
-        '⅜': '3/8',
-        '⅝': '5/8',
-        '⅞': '7/8',
-        
-        # Other common symbols
-        '©': '(c)',
-        '®': '(r)',
-        '™': 'TM',
-        '§': 'section',
-        '¶': 'P',
-        '†': '+',
-        '‡': '++',
-        
-        # Letters that might not decompose properly
-        'ß': 'ss',
-        'æ': 'ae',
-        'œ': 'oe',
-        'Æ': 'AE',
-        'Œ': 'OE',
-        'ð': 'd',
-        'þ': 'th',
-        'Ð': 'D',
-        'Þ': 'Th',
-        'ø': 'o',
-        'Ø': 'O',
-        'ł': 'l',
-        'Ł': 'L',
-        
-        # Common Greek letters
-        'α': 'alpha',
-        'β': 'beta', 
-        'γ': 'gamma',
-        'δ': 'delta',
-        'ε': 'epsilon',
-        'ζ': 'zeta',
-        'η': 'eta',
-        'θ': 'theta',
-        'ι': 'iota',
-        'κ': 'kappa',
-        'λ': 'lambda',
-        'μ': 'mu',
-        'ν': 'nu',
-        'ξ': 'xi',
-        'ο': 'omicron',
-        'π': 'pi',
-        'ρ': 'rho',
-        'σ': 'sigma',
-        'τ': 'tau',
-        'υ': 'upsilon',
-        'φ': 'phi',
-        'χ': 'chi',
-        'ψ': 'psi',
-        'ω': 'omega',
-        'Α': 'Alpha',
-        'Β': 'Beta',
-        'Γ': 'Gamma',
-        'Δ': 'Delta',
-        'Ε': 'Epsilon',
-        'Ζ': 'Zeta',
-        'Η': 'Eta',
-        'Θ': 'Theta',
-        'Ι': 'Iota',
-        'Κ': 'Kappa',
-        'Λ': 'Lambda',
-        'Μ': 'Mu',
-        'Ν': 'Nu',
-        'Ξ': 'Xi',
-        'Ο': 'Omicron',
-        'Π': 'Pi',
-        'Ρ': 'Rho',
-        'Σ': 'Sigma',
-        'Τ': 'Tau',
-        'Υ': 'Upsilon',
-        'Φ': 'Phi',
-        'Χ': 'Chi',
-        'Ψ': 'Psi',
-        'Ω': 'Omega',
-        
-        # Arrows and other symbols
-        '→': '->',
-        '←': '<-',
-        '↑': '^',
-        '↓': 'v',
-        '↔': '<->',
-        '⇒': '=>',
-        '⇐': '<=',
-        '⇔': '<=>',
-        '∞': 'infinity',
-        '≈': '~=',
-        '≠': '!=',
-        '≤': '<=',
-        '≥': '>=',
-    }
-    
-    # Apply additional mappings
-    for original, replacement in additional_mappings.items():
-        ascii_text = ascii_text.replace(original, replacement)
-    
-    # Final safety check: replace any remaining non-ASCII characters with '?'
-    # This ensures we truly get ASCII-only output
-    final_ascii = ''.join(char if ord(char) < 128 else '?' for char in ascii_text)
-    
-    return final_ascii
+# The cleaning logic lives in the unicode_cleaner package; the functions this
+# script used to define are re-exported for code that imports them from here
+from unicode_cleaner.jsonl import clean_jsonl_file
+from unicode_cleaner.normalize import normalize_unicode, process_json_value
 
 
-def process_json_value(value):
-    """Recursively process JSON values to normalize Unicode strings."""
-    if isinstance(value, str):
-        return normalize_unicode(value)
-    elif isinstance(value, dict):
-        return {k: process_json_value(v) for k, v in value.items()}
-    elif isinstance(value, list):
-        return [process_json_value(item) for item in value]
-    else:
-        return value
+def _print_duplicates(deduplicator):
+    """Print how many duplicate records were dropped, by reason."""
+    dropped = deduplicator.dropped
+    print(f"Dropped {sum(dropped.values())} duplicate records "
+          f"({dropped['exact']} exact, {dropped['near']} near duplicates)")
 
 
-def clean_jsonl_file(input_path, output_path=None):
-    """
-    Clean JSONL file by removing empty lines and normalizing Unicode.
-    
-    Args:
-        input_path (str): Path to input JSONL file
-        output_path (str, optional): Path to output file. If None, processes in-place.
-    
-    Returns:
-        tuple: (lines_processed, lines_removed, lines_written)
-    """
-    input_path = Path(input_path)
+def _print_lengths(length_stats):
+    """Print the per-field length table and the token histogram."""
+    for line in length_stats.format_report():
+        print(line)
+
+
+def _print_validation(validation):
+    """Print how many records failed validation, by error."""
+    for line in validation.format_summary():
+        print(line)
+
+
+def _run_validation(args, validation):
+    """Validate the input files without cleaning them, exiting with 1 if any record is invalid."""
+    paths = args.paths if all(is_stdio(path) for path in args.paths) else expand_input_paths(args.paths, ('.jsonl',))
+    if is_stdio(args.validation_report):
+        # stdout carries the report, so messages go to stderr
+        sys.stdout = sys.stderr
     
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if args.dry_run:
+        for input_path in paths:
+            print(f"DRY RUN: Would validate {input_path}")
+        return
     
-    # Use temporary file for in-place processing
-    if output_path is None:
-        output_path = input_path.with_suffix(input_path.suffix + '.tmp')
-        process_in_place = True
-    else:
-        output_path = Path(output_path)
-        process_in_place = False
+    for input_path in paths:
+        lines_processed, records_checked = validate_jsonl_file(input_path, validation, workers=args.workers,
+                                                               json_backend=args.json_backend)
+        if args.verbose:
+            print(f"{input_path}: {lines_processed} lines, {records_checked} records checked")
     
-    lines_processed = 0
-    lines_removed = 0
-    lines_written = 0
+    _print_validation(validation)
+    if validation.invalid_records:
+        sys.exit(1)
+    print("✅ JSONL files are valid!")
+
+
+def _describe_counts(counts):
+    return f"{counts[0]} processed, {counts[1]} removed, {counts[2]} written"
+
+
+def _run_batch(args, options, deduplicator=None, length_stats=None, validation=None):
+    """Clean every input file of a batch invocation and print one summary."""
+    clean_file = functools.partial(clean_jsonl_file, deduplicator=deduplicator,
+                                   length_stats=length_stats, validation=validation, **options)
+    # Records can only be compared, measured and validated across files within one process
+    single_process = deduplicator is not None or length_stats is not None or validation is not None
     
-    try:
-        with open(input_path, 'r', encoding='utf-8') as infile, \
-             open(output_path, 'w', encoding='utf-8') as outfile:
-            
-            for line_num, line in enumerate(infile, 1):
-                lines_processed += 1
-                
-                # Skip empty lines or lines with only whitespace
-                if not line.strip():
-                    lines_removed += 1
-                    continue
-                
-                try:
-                    # Parse JSON to validate and process
-                    json_obj = json.loads(line.strip())
-                    
-                    # Normalize Unicode characters in the JSON object
-                    normalized_obj = process_json_value(json_obj)
-                    
-                    # Write normalized JSON back to file
-                    json.dump(normalized_obj, outfile, ensure_ascii=False, separators=(',', ':'))
-                    outfile.write('\n')
-                    lines_written += 1
-                    
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Skipping invalid JSON on line {line_num}: {e}", file=sys.stderr)
-                    print(f"  Line content: {line.strip()[:100]}...", file=sys.stderr)
-                    lines_removed += 1
-                    continue
-        
-        # Replace original file if processing in-place
-        if process_in_place:
-            output_path.replace(input_path)
-            
-    except Exception as e:
-        # Clean up temporary file if something goes wrong
-        if process_in_place and output_path.exists():
-            output_path.unlink()
-        raise e
+    def summarize():
+        if deduplicator is not None:
+            _print_duplicates(deduplicator)
+        if length_stats is not None:
+            _print_lengths(length_stats)
+        if validation is not None:
+            _print_validation(validation)
     
-    return lines_processed, lines_removed, lines_written
+    run_batch(args, clean_file, ('.jsonl',), _describe_counts, (0, 0, 0), 'JSONL files',
+              workers=1 if single_process else None, summarize=summarize)
 
 
 def main():
@@ -306,17 +111,173 @@ Examples:
   %(prog)s data.jsonl cleaned_data.jsonl    # Save to new file
   %(prog)s data.jsonl                       # Process in-place
   %(prog)s --verbose data.jsonl output.jsonl  # Show detailed progress
+  %(prog)s data.jsonl.gz cleaned.jsonl.zst   # Compressed input and output (zstd needs zstandard)
+  generate | %(prog)s --line-buffered - - | upload  # Clean a stream from stdin to stdout
+  %(prog)s --workers 8 big.jsonl output.jsonl  # Clean across 8 processes
+  %(prog)s --fields instruction,response data.jsonl out.jsonl  # Only normalize these fields
+  %(prog)s --profile-name compact data.jsonl out.jsonl  # Transliterate with another profile
+  %(prog)s --incremental data.jsonl cleaned_data.jsonl  # Reuse unchanged output of the last run
+  %(prog)s --near-dedup --dedup-report dropped.jsonl --output-dir dedup/ pr*.jsonl  # Drop duplicates across files
+  %(prog)s --max-tokens 2048 --over-budget truncate data.jsonl out.jsonl  # Fit records into a token budget
+  %(prog)s --validate --validation-report errors.jsonl data.jsonl out.jsonl  # Check the schema while cleaning
+  %(prog)s --validate-only --workers 8 cleaned.jsonl  # Only check the schema, across 8 processes
+  %(prog)s --profile report.json data.jsonl out.jsonl  # Time each stage, count substituted characters
+  %(prog)s --daemon data.jsonl out.jsonl     # Clean in a running daemon (python -m unicode_cleaner.daemon)
+  %(prog)s --suffix _clean --workers 4 pr*.jsonl  # Batch: pr1.jsonl -> pr1_clean.jsonl, ...
+  %(prog)s --output-dir cleaned/ data/           # Batch: every .jsonl in data/ into cleaned/
         """
     )
     
-    parser.add_argument('input_file', help='Input JSONL file path')
-    parser.add_argument('output_file', nargs='?', help='Output JSONL file path (optional, defaults to in-place)')
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='Input JSONL file path and optional output file path (defaults to in-place); '
+                             'in batch mode any number of input files, directories or glob patterns')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show verbose output')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Clean the file across N worker processes, or in batch mode '
+                             'N files at a time (default: 1)')
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help='Batch mode: write each cleaned file into DIR under its own name')
+    parser.add_argument('--suffix', default='', metavar='SUFFIX',
+                        help='Batch mode: name each cleaned file <stem>SUFFIX<ext>, e.g. _clean')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, metavar='N',
+                        help=f'Records per output write (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--max-batch-bytes', type=int, default=DEFAULT_MAX_BATCH_BYTES, metavar='BYTES',
+                        help=f'Upper bound on the size of an output write and of the input read ahead '
+                             f'for batched normalization (default: {DEFAULT_MAX_BATCH_BYTES})')
+    parser.add_argument('--json-backend', choices=['auto', 'stdlib', 'orjson'], default='auto',
+                        help='JSON parser/serializer to use (default: auto, the fastest installed one)')
+    parser.add_argument('--fields', type=lambda value: value.split(','), metavar='PATHS',
+                        help='Comma-separated field paths to normalize, e.g. instruction,messages[*].content '
+                             '(default: every string)')
+    parser.add_argument('--profile-name', default=DEFAULT_PROFILE_NAME, metavar='NAME',
+                        help=f"Transliteration profile: a built-in one ({', '.join(available_profiles())}) "
+                             f"or the path of a profile file (default: {DEFAULT_PROFILE_NAME})")
+    parser.add_argument('--ascii-passthrough', action='store_true',
+                        help='Copy valid lines that are already clean ASCII verbatim (keeps their whitespace)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only clean chunks that changed since the last run into the same output file')
+    parser.add_argument('--chunk-lines', type=int, default=DEFAULT_CHUNK_LINES, metavar='N',
+                        help=f'Average lines per --incremental chunk; a changed line re-cleans its chunk '
+                             f'(default: {DEFAULT_CHUNK_LINES})')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Drop records that exactly repeat an earlier record (across all input files)')
+    parser.add_argument('--near-dedup', action='store_true',
+                        help='Also drop near duplicates, compared on their instruction and response text')
+    parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_THRESHOLD, metavar='SIMILARITY',
+                        help=f'Estimated similarity from which records are near duplicates '
+                             f'(default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--dedup-report', metavar='REPORT',
+                        help='Write one JSON line per dropped duplicate, with the record it repeats, to REPORT')
+    parser.add_argument('--length-stats', action='store_true',
+                        help='Print per-field character and approximate token counts and a histogram '
+                             'of tokens per record')
+    parser.add_argument('--max-tokens', type=int, metavar='N',
+                        help='Token budget per record, estimated at 4 characters per token '
+                             '(implies --length-stats)')
+    parser.add_argument('--over-budget', choices=OVER_BUDGET_ACTIONS, default='drop',
+                        help='Drop records over --max-tokens, or truncate their response to fit (default: drop)')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check every record against the instruction/context/response schema while cleaning')
+    parser.add_argument('--validate-only', action='store_true',
+                        help='Only check the input files against the schema, writing nothing; '
+                             'exits with 1 if any record is invalid')
+    parser.add_argument('--validation-report', metavar='REPORT',
+                        help="Write one JSON line per validation error, with its file and line, to REPORT "
+                             "('-' for stdout; implies --validate)")
+    parser.add_argument('--allow-extra-fields', action='store_true',
+                        help='Accept fields besides instruction, context and response when validating')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='Write a JSON report of per-stage times and substituted characters '
+                             "to REPORT ('-' for stdout); profiled runs are serial")
+    parser.add_argument('--line-buffered', action='store_true',
+                        help='Flush the output after every line, for readers of a pipe or a growing file; '
+                             'single input file only')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Clean through a running cleaning daemon if there is one, else locally')
+    parser.add_argument('--daemon-address', default='127.0.0.1:8765', metavar='HOST:PORT',
+                        help='Address of the cleaning daemon (default: 127.0.0.1:8765)')
     
     args = parser.parse_args()
     
     try:
+        use_profile(args.profile_name)
+    except (ValueError, OSError) as e:
+        parser.error(f"--profile-name: {e}")
+    deduplicate = args.dedup or args.near_dedup
+    if deduplicate and args.incremental:
+        parser.error("--dedup and --near-dedup cannot be combined with --incremental")
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold must be greater than 0 and at most 1")
+    measure = args.length_stats or args.max_tokens is not None
+    if measure and args.incremental:
+        parser.error("--length-stats and --max-tokens cannot be combined with --incremental")
+    if args.chunk_lines < 1:
+        parser.error("--chunk-lines must be positive")
+    if args.max_tokens is not None and args.max_tokens < 1:
+        parser.error("--max-tokens must be positive")
+    validate = args.validate or args.validate_only or args.validation_report is not None
+    if validate and args.incremental:
+        parser.error("--validate cannot be combined with --incremental")
+    
+    options = {
+        'batch_size': args.batch_size,
+        'max_batch_bytes': args.max_batch_bytes,
+        'json_backend': args.json_backend,
+        'fields': args.fields,
+        'ascii_passthrough': args.ascii_passthrough,
+        'incremental': args.incremental,
+        'chunk_lines': args.chunk_lines,
+        'profile': args.profile_name,
+    }
+    deduplicator = Deduplicator(near_duplicates=args.near_dedup, threshold=args.dedup_threshold) \
+        if deduplicate else None
+    length_stats = LengthStats(args.max_tokens, args.over_budget) if measure else None
+    validation = ValidationReport(schema=DEFAULT_SCHEMA._replace(allow_extra=args.allow_extra_fields)) \
+        if validate else None
+    report_file = None
+    validation_file = None
+    
+    try:
+        if deduplicator is not None and args.dedup_report and not args.dry_run:
+            report_file = deduplicator.report = open(args.dedup_report, 'w', encoding='utf-8')
+        if validation is not None and args.validation_report and not args.dry_run:
+            validation.report = sys.stdout if is_stdio(args.validation_report) \
+                else open(args.validation_report, 'w', encoding='utf-8')
+            if validation.report is not sys.stdout:
+                validation_file = validation.report
+        
+        if args.validate_only:
+            _run_validation(args, validation)
+            return
+        
+        if is_batch_invocation(args.paths, args.output_dir, args.suffix):
+            if args.profile:
+                parser.error("--profile takes a single input file")
+            if args.line_buffered:
+                # Batch jobs write whole files; nothing flushes them line by line
+                parser.error("--line-buffered takes a single input file")
+            _run_batch(args, options, deduplicator, length_stats, validation)
+            return
+        
+        args.input_file = args.paths[0]
+        args.output_file = args.paths[1] if len(args.paths) > 1 else None
+        if is_stdio(args.input_file) and args.output_file is None:
+            args.output_file = '-'
+        report_to_stdout = args.profile == '-'
+        if is_stdio(args.output_file):
+            if validation is not None and is_stdio(args.validation_report):
+                parser.error("--validation-report cannot go to stdout along with the cleaned data")
+            if report_to_stdout:
+                parser.error("--profile cannot go to stdout along with the cleaned data")
+        elif validation is not None and is_stdio(args.validation_report) and report_to_stdout:
+            parser.error("--profile and --validation-report cannot both go to stdout")
+        stdout = sys.stdout
+        if is_stdio(args.output_file) or report_to_stdout or \
+                (validation is not None and is_stdio(args.validation_report)):
+            # stdout carries the cleaned data or a report, so messages go to stderr
+            sys.stdout = sys.stderr
+        
         if args.dry_run:
             print(f"DRY RUN: Would process {args.input_file}")
             if args.output_file:
@@ -329,10 +290,46 @@ Examples:
             action = "in-place" if not args.output_file else f"to {args.output_file}"
             print(f"Processing {args.input_file} {action}...")
         
-        lines_processed, lines_removed, lines_written = clean_jsonl_file(
-            args.input_file, 
-            args.output_file
-        )
+        counts = None
+        if args.daemon and args.workers == 1 and not args.profile and deduplicator is None \
+                and length_stats is None and validation is None \
+                and not is_stdio(args.input_file) and not is_stdio(args.output_file):
+            # Imported here so runs without a daemon do not load the HTTP modules
+            from unicode_cleaner.daemon import clean_file_with_daemon
+            counts = clean_file_with_daemon(
+                args.daemon_address, 'jsonl', args.input_file, args.output_file,
+                options,
+            )
+            if args.verbose and counts is None:
+                print(f"No cleaning daemon at {args.daemon_address}, cleaning locally")
+        
+        profiler = Profiler() if args.profile else None
+        # Substitutions are only counted when they will be shown
+        substitutions = Counter() if args.verbose else None
+        if counts is None:
+            counts = clean_jsonl_file(
+                args.input_file, 
+                args.output_file,
+                workers=args.workers,
+                profiler=profiler,
+                substitutions=substitutions,
+                deduplicator=deduplicator,
+                length_stats=length_stats,
+                validation=validation,
+                line_buffered=args.line_buffered,
+                **options
+            )
+        lines_processed, lines_removed, lines_written = counts
+        
+        if profiler is not None:
+            write_report(profiler.report(
+                describe_substitution,
+                tool='clean_jsonl',
+                input=args.input_file,
+                counts={'lines_processed': lines_processed, 'lines_removed': lines_removed,
+                        'lines_written': lines_written},
+                cache=normalize_cache_info(),
+            ), args.profile, stdout)
         
         if args.verbose or not args.output_file:
             print(f"Processed {lines_processed} lines")
@@ -341,6 +338,18 @@ Examples:
             
             if lines_removed > 0:
                 print(f"Removed {lines_removed / lines_processed * 100:.1f}% of lines")
+        if deduplicator is not None:
+            _print_duplicates(deduplicator)
+        if length_stats is not None:
+            _print_lengths(length_stats)
+        if validation is not None:
+            _print_validation(validation)
+
+        if args.verbose:
+            # The daemon does not report the breakdown
+            if substitutions:
+                print_substitutions(substitutions)
+            print_cache_info()
         
         print("✅ JSONL file cleaned successfully!")
         
@@ -350,6 +359,11 @@ Examples:
     except Exception as e:
         print(f"Error processing file: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if report_file is not None:
+            report_file.close()
+        if validation_file is not None:
+            validation_file.close()
 
 
 if __name__ == "__main__":
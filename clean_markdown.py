@@ -12,266 +12,34 @@ Usage:
     python clean_markdown.py input.md  # processes in-place
 """
 
-import unicodedata
 import argparse
+import functools
 import sys
-from pathlib import Path
+from collections import Counter
 
+from unicode_cleaner.batch import is_batch_invocation
+from unicode_cleaner.cli import print_cache_info, print_substitutions, run_batch
+from unicode_cleaner.compressed_io import is_stdio, strip_compression_suffix
+from unicode_cleaner.incremental import DEFAULT_CHUNK_LINES
+from unicode_cleaner.normalize import describe_substitution, normalize_cache_info, use_profile
+from unicode_cleaner.profiling import Profiler, write_report
+from unicode_cleaner.transliteration import DEFAULT_PROFILE_NAME, available_profiles
 
-def normalize_unicode(text):
-    """Normalize Unicode characters to ASCII equivalents by removing accents and replacing typographic characters."""
-    # First apply NFKD normalization (decomposes accented characters)
-    normalized = unicodedata.normalize('NFKD', text)
-    
-    # Remove combining characters (accent marks) to get pure ASCII base characters
-    # Filter out characters in categories 'Mn' (Mark, nonspacing) and 'Mc' (Mark, spacing combining)
-    ascii_text = ''.join(char for char in normalized 
-                        if unicodedata.category(char) not in ('Mn', 'Mc'))
-    
-    # Define replacements for common typographic characters
-    replacements = {
-        # Quotation marks
-        '\u201c': '"',  # Left double quotation mark
-        '\u201d': '"',  # Right double quotation mark
-        '\u2018': "'",  # Left single quotation mark
-        '\u2019': "'",  # Right single quotation mark
-        '\u201a': "'",  # Single low-9 quotation mark
-        '\u201e': '"',  # Double low-9 quotation mark
-        '\u2039': "'",  # Single left-pointing angle quotation mark
-        '\u203a': "'",  # Single right-pointing angle quotation mark
-        '\u00ab': '"',  # Left-pointing double angle quotation mark
-        '\u00bb': '"',  # Right-pointing double angle quotation mark
-        '\u300e': '"',  # Left white corner bracket
-        '\u300f': '"',  # Right white corner bracket
-        '\u300c': '"',  # Left corner bracket
-        '\u300d': '"',  # Right corner bracket
-        
-        # Apostrophes
-        '\u2019': "'",  # Right single quotation mark (apostrophe)
-        '`': "'",       # Grave accent (used as apostrophe)
-        '\u00b4': "'",  # Acute accent (used as apostrophe)
-        '\u02bc': "'",  # Modifier letter apostrophe
-        '\u02bb': "'",  # Modifier letter turned comma
-        
-        # Dashes
-        '\u2014': '-',  # Em dash
-        '\u2013': '-',  # En dash
-        '\u2212': '-',  # Minus sign
-        '\u2012': '-',  # Figure dash
-        '\u2e3a': '-',  # Two-em dash
-        '\u2e3b': '-',  # Three-em dash
-        '\ufe58': '-',  # Small em dash
-        '\ufe63': '-',  # Small hyphen-minus
-        
-        # Other common typographic characters
-        '\u2026': '...',  # Horizontal ellipsis
-        '\u2030': '%o',   # Per mille sign
-        '\u2031': '%oo',  # Per ten thousand sign
-        '\u2032': "'",    # Prime (often used as apostrophe)
-        '\u2033': '"',    # Double prime (often used as quote)
-        '\u2034': "'''",  # Triple prime
-        '\u2057': "''''", # Quadruple prime
-    }
-    
-    # Apply character replacements to the ASCII text
-    for original, replacement in replacements.items():
-        ascii_text = ascii_text.replace(original, replacement)
-    
-    # Additional mappings for characters that might not be handled by NFKD
-    additional_mappings = {
-        # Currency symbols
-        '€': 'EUR',
-        '£': 'GBP', 
-        '¥': 'JPY',
-        '¢': 'c',
-        '₹': 'Rs',
-        '₽': 'Rub',
-        
-        # Mathematical symbols
-        '×': 'x',
-        '÷': '/',
-        '±': '+/-',
-        '°': 'deg',
-        '²': '2',
-        '³': '3',
-        '¼': '1/4',
-        '½': '1/2',  
-        '¾': '3/4',
-        '⅐': '1/7',
-        '⅑': '1/9', 
-        '⅒': '1/10',
-        '⅓': '1/3',
-        '⅔': '2/3',
-        '⅕': '1/5',
-        '⅖': '2/5',
-        '⅗': '3/5',
-        '⅘': '4/5',
-        '⅙': '1/6',
-        '⅚': '5/6',
-        '⅛': '1/8',
-        '⅜': '3/8',
-        '⅝': '5/8',
-        '⅞': '7/8',
-        
-        # Other common symbols
-        '©': '(c)',
-        '®': '(r)',
-        '™': 'TM',
-        '§': 'section',
-        '¶': 'P',
-        '†': '+',
-        '‡': '++',
-        
-        # Letters that might not decompose properly
-        'ß': 'ss',
-        'æ': 'ae',
-        'œ': 'oe',
-        'Æ': 'AE',
-        'Œ': 'OE',
-        'ð': 'd',
-        'þ': 'th',
-        'Ð': 'D',
-        'Þ': 'Th',
-        'ø': 'o',
-        'Ø': 'O',
-        'ł': 'l',
-        'Ł': 'L',
-        
-        # Common Greek letters
-        'α': 'alpha',
-        'β': 'beta', 
-        'γ': 'gamma',
-        'δ': 'delta',
-        'ε': 'epsilon',
-        'ζ': 'zeta',
-        'η': 'eta',
-        'θ': 'theta',
-        'ι': 'iota',
-        'κ': 'kappa',
-        'λ': 'lambda',
-        'μ': 'mu',
-        'ν': 'nu',
-        'ξ': 'xi',
-        'ο': 'omicron',
-        'π': 'pi',
-        'ρ': 'rho',
-        'σ': 'sigma',
-        'τ': 'tau',
-        'υ': 'upsilon',
-        'φ': 'phi',
-        'χ': 'chi',
-        'ψ': 'psi',
-        'ω': 'omega',
-        'Α': 'Alpha',
-        'Β': 'Beta',
-        'Γ': 'Gamma',
-        'Δ': 'Delta',
-        'Ε': 'Epsilon',
-        'Ζ': 'Zeta',
-        'Η': 'Eta',
-        'Θ': 'Theta',
-        'Ι': 'Iota',
-        'Κ': 'Kappa',
-        'Λ': 'Lambda',
-        'Μ': 'Mu',
-        'Ν': 'Nu',
-        'Ξ': 'Xi',
-        'Ο': 'Omicron',
-        'Π': 'Pi',
-        'Ρ': 'Rho',
-        'Σ': 'Sigma',
-        'Τ': 'Tau',
-        'Υ': 'Upsilon',
-        'Φ': 'Phi',
-        'Χ': 'Chi',
-        'Ψ': 'Psi',
-        'Ω': 'Omega',
-        
-        # Arrows and other symbols
-        '→': '->',
-        '←': '<-',
-        '↑': '^',
-        '↓': 'v',
-        '↔': '<->',
-        '⇒': '=>',
-        '⇐': '<=',
-        '⇔': '<=>',
-        '∞': 'infinity',
-        '≈': '~=',
-        '≠': '!=',
-        '≤': '<=',
-        '≥': '>=',
-    }
-    
-    # Apply additional mappings
-    for original, replacement in additional_mappings.items():
-        ascii_text = ascii_text.replace(original, replacement)
-    
-    # Final safety check: replace any remaining non-ASCII characters with '?'
-    # This ensures we truly get ASCII-only output
-    final_ascii = ''.join(char if ord(char) < 128 else '?' for char in ascii_text)
-    
-    return final_ascii
+# The cleaning logic lives in the unicode_cleaner package; the functions this
+# script used to define are re-exported for code that imports them from here
+from unicode_cleaner.markdown import clean_markdown_file
+from unicode_cleaner.normalize import normalize_unicode
 
 
-def clean_markdown_file(input_path, output_path=None):
-    """
-    Clean Markdown file by normalizing Unicode to ASCII while preserving structure.
-    
-    Args:
-        input_path (str): Path to input Markdown file
-        output_path (str, optional): Path to output file. If None, processes in-place.
-    
-    Returns:
-        tuple: (lines_processed, characters_replaced)
-    """
-    input_path = Path(input_path)
-    
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-    
-    # Use temporary file for in-place processing
-    if output_path is None:
-        output_path = input_path.with_suffix(input_path.suffix + '.tmp')
-        process_in_place = True
-    else:
-        output_path = Path(output_path)
-        process_in_place = False
-    
-    lines_processed = 0
-    characters_replaced = 0
-    
-    try:
-        with open(input_path, 'r', encoding='utf-8') as infile, \
-             open(output_path, 'w', encoding='utf-8') as outfile:
-            
-            for line in infile:
-                lines_processed += 1
-                
-                # Normalize Unicode characters in the line
-                original_line = line
-                normalized_line = normalize_unicode(line)
-                
-                # Count characters that were changed
-                if original_line != normalized_line:
-                    characters_replaced += sum(1 for a, b in zip(original_line, normalized_line) if a != b)
-                    # Account for length differences (some chars become multiple chars)
-                    characters_replaced += abs(len(original_line) - len(normalized_line))
-                
-                # Write the line (including newlines and empty lines)
-                outfile.write(normalized_line)
-        
-        # Replace original file if processing in-place
-        if process_in_place:
-            output_path.replace(input_path)
-            
-    except Exception as e:
-        # Clean up temporary file if something goes wrong
-        if process_in_place and output_path.exists():
-            output_path.unlink()
-        raise e
-    
-    return lines_processed, characters_replaced
+def _describe_counts(counts):
+    return f"{counts[0]} lines, {counts[1]} characters normalized"
+
+
+def _run_batch(args):
+    """Clean every input file of a batch invocation and print one summary."""
+    clean_file = functools.partial(clean_markdown_file, incremental=args.incremental, chunk_lines=args.chunk_lines,
+                                   use_mmap=args.mmap, preserve_code=args.preserve_code, profile=args.profile_name)
+    run_batch(args, clean_file, ('.md', '.markdown'), _describe_counts, (0, 0), 'Markdown files')
 
 
 def main():
@@ -283,19 +51,91 @@ Examples:
   %(prog)s document.md cleaned_document.md    # Save to new file
   %(prog)s document.md                        # Process in-place
   %(prog)s --verbose document.md output.md    # Show detailed progress
+  %(prog)s document.md.gz output.md.gz        # Compressed input and output
+  cat *.md | %(prog)s - > cleaned.md          # Clean stdin to stdout
+  %(prog)s --incremental document.md output.md  # Reuse unchanged output of the last run
+  %(prog)s --preserve-code README.md out.md   # Leave code blocks and `inline code` untouched
+  %(prog)s --profile-name my_profile.json document.md out.md  # Transliterate with a custom profile
+  %(prog)s --profile report.json document.md output.md  # Time each stage, count substituted characters
+  %(prog)s --daemon document.md output.md     # Clean in a running daemon (python -m unicode_cleaner.daemon)
+  %(prog)s --suffix _clean --workers 4 docs/  # Batch: every .md in docs/ -> <name>_clean.md
         """
     )
     
-    parser.add_argument('input_file', help='Input Markdown file path')
-    parser.add_argument('output_file', nargs='?', help='Output Markdown file path (optional, defaults to in-place)')
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='Input Markdown file path and optional output file path (defaults to in-place); '
+                             'in batch mode any number of input files, directories or glob patterns')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show verbose output')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only clean chunks that changed since the last run into the same output file')
+    parser.add_argument('--chunk-lines', type=int, default=DEFAULT_CHUNK_LINES, metavar='N',
+                        help=f'Average lines per --incremental chunk; a changed line re-cleans its chunk '
+                             f'(default: {DEFAULT_CHUNK_LINES})')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Read input through mmap and copy unchanged lines without decoding them')
+    parser.add_argument('--preserve-code', action='store_true',
+                        help='Copy fenced and indented code blocks and inline code spans unchanged; '
+                             'only normalize the prose')
+    parser.add_argument('--profile-name', default=DEFAULT_PROFILE_NAME, metavar='NAME',
+                        help=f"Transliteration profile: a built-in one ({', '.join(available_profiles())}) "
+                             f"or the path of a profile file (default: {DEFAULT_PROFILE_NAME})")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Batch mode: clean N files at a time (default: 1)')
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help='Batch mode: write each cleaned file into DIR under its own name')
+    parser.add_argument('--suffix', default='', metavar='SUFFIX',
+                        help='Batch mode: name each cleaned file <stem>SUFFIX<ext>, e.g. _clean')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='Write a JSON report of per-stage times and substituted characters '
+                             "to REPORT ('-' for stdout)")
+    parser.add_argument('--line-buffered', action='store_true',
+                        help='Flush the output after every line, for readers of a pipe or a growing file; '
+                             'single input file only')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Clean through a running cleaning daemon if there is one, else locally')
+    parser.add_argument('--daemon-address', default='127.0.0.1:8765', metavar='HOST:PORT',
+                        help='Address of the cleaning daemon (default: 127.0.0.1:8765)')
     
     args = parser.parse_args()
     
+    if args.chunk_lines < 1:
+        parser.error("--chunk-lines must be positive")
+    if args.incremental and args.preserve_code:
+        parser.error("--preserve-code cannot be combined with --incremental")
+    try:
+        use_profile(args.profile_name)
+    except (ValueError, OSError) as e:
+        parser.error(f"--profile-name: {e}")
+    
+    if is_batch_invocation(args.paths, args.output_dir, args.suffix):
+        if args.profile:
+            parser.error("--profile takes a single input file")
+        if args.line_buffered:
+            # Batch jobs write whole files; nothing flushes them line by line
+            parser.error("--line-buffered takes a single input file")
+        try:
+            _run_batch(args)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    args.input_file = args.paths[0]
+    args.output_file = args.paths[1] if len(args.paths) > 1 else None
+    if is_stdio(args.input_file) and args.output_file is None:
+        args.output_file = '-'
+    report_to_stdout = args.profile == '-'
+    if is_stdio(args.output_file) and report_to_stdout:
+        parser.error("--profile cannot go to stdout along with the cleaned data")
+    stdout = sys.stdout
+    if is_stdio(args.output_file) or report_to_stdout:
+        # stdout carries the cleaned data or the report, so messages go to stderr
+        sys.stdout = sys.stderr
+    
     # Validate input file extension
-    input_path = Path(args.input_file)
-    if input_path.suffix.lower() not in ['.md', '.markdown']:
+    input_path = strip_compression_suffix(args.input_file)
+    if not is_stdio(args.input_file) and input_path.suffix.lower() not in ['.md', '.markdown']:
         print(f"Warning: Input file doesn't have .md or .markdown extension: {input_path}", file=sys.stderr)
     
     try:
@@ -311,14 +151,56 @@ Examples:
             action = "in-place" if not args.output_file else f"to {args.output_file}"
             print(f"Processing Markdown file {args.input_file} {action}...")
         
-        lines_processed, characters_replaced = clean_markdown_file(
-            args.input_file, 
-            args.output_file
-        )
+        counts = None
+        if args.daemon and not args.profile and not is_stdio(args.input_file) \
+                and not is_stdio(args.output_file):
+            # Imported here so runs without a daemon do not load the HTTP modules
+            from unicode_cleaner.daemon import clean_file_with_daemon
+            counts = clean_file_with_daemon(
+                args.daemon_address, 'markdown', args.input_file, args.output_file,
+                {'incremental': args.incremental, 'chunk_lines': args.chunk_lines, 'use_mmap': args.mmap,
+                 'preserve_code': args.preserve_code,
+                 'profile': args.profile_name},
+            )
+            if args.verbose and counts is None:
+                print(f"No cleaning daemon at {args.daemon_address}, cleaning locally")
+        
+        profiler = Profiler() if args.profile else None
+        # Substitutions are only counted when they will be shown
+        substitutions = Counter() if args.verbose else None
+        if counts is None:
+            counts = clean_markdown_file(
+                args.input_file, 
+                args.output_file,
+                incremental=args.incremental,
+                chunk_lines=args.chunk_lines,
+                use_mmap=args.mmap,
+                preserve_code=args.preserve_code,
+                line_buffered=args.line_buffered,
+                profile=args.profile_name,
+                profiler=profiler,
+                substitutions=substitutions
+            )
+        lines_processed, characters_replaced = counts
+        
+        if profiler is not None:
+            write_report(profiler.report(
+                describe_substitution,
+                tool='clean_markdown',
+                input=args.input_file,
+                counts={'lines_processed': lines_processed, 'characters_replaced': characters_replaced},
+                cache=normalize_cache_info(),
+            ), args.profile, stdout)
         
         if args.verbose or not args.output_file:
             print(f"Processed {lines_processed} lines")
             print(f"Normalized {characters_replaced} Unicode characters to ASCII")
+
+        if args.verbose:
+            # The daemon does not report the breakdown
+            if substitutions:
+                print_substitutions(substitutions)
+            print_cache_info()
         
         print("✅ Markdown file cleaned successfully!")
         
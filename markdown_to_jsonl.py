@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Markdown Question/Answer to JSONL Converter
+
+This script converts synthetic data exported as Markdown (numbered **Q:** / **A:**
+lists under section headings) into JSONL training records:
+1. Parse each question/answer pair into an instruction/context/response record
+2. Normalize Unicode characters to ASCII in the same pass
+3. Write compact JSONL, ready for training without running clean_jsonl.py
+
+Usage:
+    python markdown_to_jsonl.py input.md output.jsonl
+    python markdown_to_jsonl.py input.md  # writes input.jsonl
+    python markdown_to_jsonl.py input.md.gz output.jsonl.gz  # compressed input and output
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+from unicode_cleaner.compressed_io import strip_compression_suffix
+from unicode_cleaner.jsonl import DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_BYTES
+from unicode_cleaner.markdown_qa import convert_markdown_file
+from unicode_cleaner.normalize import describe_substitution, normalize_cache_info, use_profile
+from unicode_cleaner.profiling import Profiler, write_report
+from unicode_cleaner.transliteration import DEFAULT_PROFILE_NAME, available_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert Markdown question/answer lists into cleaned instruction/context/response JSONL",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s pr2.md pr2.jsonl                 # Convert and clean in one pass
+  %(prog)s pr2.md                           # Writes pr2.jsonl
+  %(prog)s --section-context pr2.md out.jsonl  # Use the section heading as the context
+  %(prog)s --profile-name compact pr2.md out.jsonl  # Transliterate with another profile
+  %(prog)s --profile report.json pr2.md out.jsonl  # Time each stage, count substituted characters
+        """
+    )
+
+    parser.add_argument('input_file', help='Input Markdown file path')
+    parser.add_argument('output_file', nargs='?', help='Output JSONL file path (default: input with .jsonl extension)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show verbose output')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+    parser.add_argument('--section-context', action='store_true',
+                        help='Put the heading above each question into the context field (default: empty)')
+    parser.add_argument('--profile-name', default=DEFAULT_PROFILE_NAME, metavar='NAME',
+                        help=f"Transliteration profile: a built-in one ({', '.join(available_profiles())}) "
+                             f"or the path of a profile file (default: {DEFAULT_PROFILE_NAME})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, metavar='N',
+                        help=f'Records per output write (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--max-batch-bytes', type=int, default=DEFAULT_MAX_BATCH_BYTES, metavar='BYTES',
+                        help=f'Upper bound on the size of an output write (default: {DEFAULT_MAX_BATCH_BYTES})')
+    parser.add_argument('--json-backend', choices=['auto', 'stdlib', 'orjson'], default='auto',
+                        help='JSON serializer to use (default: auto, the fastest installed one)')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='Write a JSON report of per-stage times and substituted characters '
+                             "to REPORT ('-' for stdout)")
+
+    args = parser.parse_args()
+    try:
+        use_profile(args.profile_name)
+    except (ValueError, OSError) as e:
+        parser.error(f"--profile-name: {e}")
+
+    output_file = args.output_file or str(strip_compression_suffix(args.input_file).with_suffix('.jsonl'))
+    stdout = sys.stdout
+    if args.profile == '-':
+        # stdout carries the report, so messages go to stderr
+        sys.stdout = sys.stderr
+
+    try:
+        if args.dry_run:
+            print(f"DRY RUN: Would convert {args.input_file} to {output_file}")
+            return
+
+        if args.verbose:
+            print(f"Converting {args.input_file} to {output_file}...")
+
+        profiler = Profiler() if args.profile else None
+        substitutions = Counter() if args.verbose else None
+        lines_processed, records_written, questions_unanswered = convert_markdown_file(
+            args.input_file,
+            output_file,
+            json_backend=args.json_backend,
+            section_context=args.section_context,
+            batch_size=args.batch_size,
+            max_batch_bytes=args.max_batch_bytes,
+            profiler=profiler,
+            substitutions=substitutions,
+            profile=args.profile_name,
+        )
+
+        if profiler is not None:
+            write_report(profiler.report(
+                describe_substitution,
+                tool='markdown_to_jsonl',
+                input=args.input_file,
+                counts={'lines_processed': lines_processed, 'records_written': records_written,
+                        'questions_unanswered': questions_unanswered},
+                cache=normalize_cache_info(),
+            ), args.profile, stdout)
+
+        print(f"Processed {lines_processed} lines")
+        print(f"Written {records_written} records")
+        if questions_unanswered:
+            print(f"Skipped {questions_unanswered} questions without an answer")
+        if args.verbose:
+            print(f"Normalized {sum(substitutions.values())} Unicode characters to ASCII")
+
+        print("✅ Markdown converted to JSONL successfully!")
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error processing file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Reference Normalizer
+
+normalize_unicode exactly as clean_jsonl.py and clean_markdown.py shipped it
+before the transliteration engine was compiled into a translation table.
+The tests compare the package against it; do not change it.
+"""
+
+import unicodedata
+
+
+def normalize_unicode(text):
+    """Normalize Unicode characters to ASCII equivalents by removing accents and replacing typographic characters."""
+    # First apply NFKD normalization (decomposes accented characters)
+    normalized = unicodedata.normalize('NFKD', text)
+    
+    # Remove combining characters (accent marks) to get pure ASCII base characters
+    # Filter out characters in categories 'Mn' (Mark, nonspacing) and 'Mc' (Mark, spacing combining)
+    ascii_text = ''.join(char for char in normalized 
+                        if unicodedata.category(char) not in ('Mn', 'Mc'))
+    
+    # Define replacements for common typographic characters
+    replacements = {
+        # Quotation marks
+        '\u201c': '"',  # Left double quotation mark
+        '\u201d': '"',  # Right double quotation mark
+        '\u2018': "'",  # Left single quotation mark
+        '\u2019': "'",  # Right single quotation mark
+        '\u201a': "'",  # Single low-9 quotation mark
+        '\u201e': '"',  # Double low-9 quotation mark
+        '\u2039': "'",  # Single left-pointing angle quotation mark
+        '\u203a': "'",  # Single right-pointing angle quotation mark
+        '\u00ab': '"',  # Left-pointing double angle quotation mark
+        '\u00bb': '"',  # Right-pointing double angle quotation mark
+        '\u300e': '"',  # Left white corner bracket
+        '\u300f': '"',  # Right white corner bracket
+        '\u300c': '"',  # Left corner bracket
+        '\u300d': '"',  # Right corner bracket
+        
+        # Apostrophes
+        '\u2019': "'",  # Right single quotation mark (apostrophe)
+        '`': "'",       # Grave accent (used as apostrophe)
+        '\u00b4': "'",  # Acute accent (used as apostrophe)
+        '\u02bc': "'",  # Modifier letter apostrophe
+        '\u02bb': "'",  # Modifier letter turned comma
+        
+        # Dashes
+        '\u2014': '-',  # Em dash
+        '\u2013': '-',  # En dash
+        '\u2212': '-',  # Minus sign
+        '\u2012': '-',  # Figure dash
+        '\u2e3a': '-',  # Two-em dash
+        '\u2e3b': '-',  # Three-em dash
+        '\ufe58': '-',  # Small em dash
+        '\ufe63': '-',  # Small hyphen-minus
+        
+        # Other common typographic characters
+        '\u2026': '...',  # Horizontal ellipsis
+        '\u2030': '%o',   # Per mille sign
+        '\u2031': '%oo',  # Per ten thousand sign
+        '\u2032': "'",    # Prime (often used as apostrophe)
+        '\u2033': '"',    # Double prime (often used as quote)
+        '\u2034': "'''",  # Triple prime
+        '\u2057': "''''", # Quadruple prime
+    }
+    
+    # Apply character replacements to the ASCII text
+    for original, replacement in replacements.items():
+        ascii_text = ascii_text.replace(original, replacement)
+    
+    # Additional mappings for characters that might not be handled by NFKD
+    additional_mappings = {
+        # Currency symbols
+        '€': 'EUR',
+        '£': 'GBP', 
+        '¥': 'JPY',
+        '¢': 'c',
+        '₹': 'Rs',
+        '₽': 'Rub',
+        
+        # Mathematical symbols
+        '×': 'x',
+        '÷': '/',
+        '±': '+/-',
+        '°': 'deg',
+        '²': '2',
+        '³': '3',
+        '¼': '1/4',
+        '½': '1/2',  
+        '¾': '3/4',
+        '⅐': '1/7',
+        '⅑': '1/9', 
+        '⅒': '1/10',
+        '⅓': '1/3',
+        '⅔': '2/3',
+        '⅕': '1/5',
+        '⅖': '2/5',
+        '⅗': '3/5',
+        '⅘': '4/5',
+        '⅙': '1/6',
+        '⅚': '5/6',
+        '⅛': '1/8',
+        '⅜': '3/8',
+        '⅝': '5/8',
+        '⅞': '7/8',
+        
+        # Other common symbols
+        '©': '(c)',
+        '®': '(r)',
+        '™': 'TM',
+        '§': 'section',
+        '¶': 'P',
+        '†': '+',
+        '‡': '++',
+        
+        # Letters that might not decompose properly
+        'ß': 'ss',
+        'æ': 'ae',
+        'œ': 'oe',
+        'Æ': 'AE',
+        'Œ': 'OE',
+        'ð': 'd',
+        'þ': 'th',
+        'Ð': 'D',
+        'Þ': 'Th',
+        'ø': 'o',
+        'Ø': 'O',
+        'ł': 'l',
+        'Ł': 'L',
+        
+        # Common Greek letters
+        'α': 'alpha',
+        'β': 'beta', 
+        'γ': 'gamma',
+        'δ': 'delta',
+        'ε': 'epsilon',
+        'ζ': 'zeta',
+        'η': 'eta',
+        'θ': 'theta',
+        'ι': 'iota',
+        'κ': 'kappa',
+        'λ': 'lambda',
+        'μ': 'mu',
+        'ν': 'nu',
+        'ξ': 'xi',
+        'ο': 'omicron',
+        'π': 'pi',
+        'ρ': 'rho',
+        'σ': 'sigma',
+        'τ': 'tau',
+        'υ': 'upsilon',
+        'φ': 'phi',
+        'χ': 'chi',
+        'ψ': 'psi',
+        'ω': 'omega',
+        'Α': 'Alpha',
+        'Β': 'Beta',
+        'Γ': 'Gamma',
+        'Δ': 'Delta',
+        'Ε': 'Epsilon',
+        'Ζ': 'Zeta',
+        'Η': 'Eta',
+        'Θ': 'Theta',
+        'Ι': 'Iota',
+        'Κ': 'Kappa',
+        'Λ': 'Lambda',
+        'Μ': 'Mu',
+        'Ν': 'Nu',
+        'Ξ': 'Xi',
+        'Ο': 'Omicron',
+        'Π': 'Pi',
+        'Ρ': 'Rho',
+        'Σ': 'Sigma',
+        'Τ': 'Tau',
+        'Υ': 'Upsilon',
+        'Φ': 'Phi',
+        'Χ': 'Chi',
+        'Ψ': 'Psi',
+        'Ω': 'Omega',
+        
+        # Arrows and other symbols
+        '→': '->',
+        '←': '<-',
+        '↑': '^',
+        '↓': 'v',
+        '↔': '<->',
+        '⇒': '=>',
+        '⇐': '<=',
+        '⇔': '<=>',
+        '∞': 'infinity',
+        '≈': '~=',
+        '≠': '!=',
+        '≤': '<=',
+        '≥': '>=',
+    }
+    
+    # Apply additional mappings
+    for original, replacement in additional_mappings.items():
+        ascii_text = ascii_text.replace(original, replacement)
+    
+    # Final safety check: replace any remaining non-ASCII characters with '?'
+    # This ensures we truly get ASCII-only output
+    final_ascii = ''.join(char if ord(char) < 128 else '?' for char in ascii_text)
+    
+    return final_ascii
@@ -0,0 +1,12 @@
+"""Shared test setup: import the package from this checkout and keep its caches out of the home directory."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('UNICODE_CLEANER_CACHE_DIR', tempfile.mkdtemp(prefix='unicode_cleaner_cache_'))
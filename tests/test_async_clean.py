@@ -0,0 +1,90 @@
+"""Asyncio streaming API: batches cleaned in an executor."""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from unicode_cleaner.async_clean import _clean_in_batches, clean_lines, clean_records
+from unicode_cleaner.normalize import transliteration_profile
+
+
+async def _produce(items):
+    for item in items:
+        yield item
+
+
+def _collect(agen):
+    async def collect():
+        return [item async for item in agen]
+    return asyncio.run(collect())
+
+
+RECORD = {'instruction': 'α ½ °', 'response': 'ok'}
+
+
+def test_records_follow_the_callers_profile():
+    with transliteration_profile('compact'):
+        cleaned = _collect(clean_records(_produce([dict(RECORD)])))
+    assert cleaned == [{'instruction': 'a 1/2 ', 'response': 'ok'}]
+
+
+def test_profile_argument_applies_in_worker_processes():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        cleaned = _collect(clean_records(_produce([dict(RECORD)]), executor=executor, profile='compact'))
+        default = _collect(clean_records(_produce([dict(RECORD)]), executor=executor))
+    assert cleaned == [{'instruction': 'a 1/2 ', 'response': 'ok'}]
+    assert default[0]['instruction'] != cleaned[0]['instruction']
+
+
+def test_lines_follow_the_profile_argument():
+    lines = [json.dumps(RECORD) + '\n']
+    assert _collect(clean_lines(_produce(lines), profile='compact')) == [
+        json.dumps({'instruction': 'a 1/2 ', 'response': 'ok'}, separators=(',', ':')) + '\n',
+    ]
+
+
+def test_results_keep_producer_order_when_batches_finish_out_of_order():
+    def clean_batch(batch, items_before):
+        # Earlier batches take longer, so later ones finish first
+        time.sleep(0.02 * (10 - items_before // 3))
+        return [item * 10 for item in batch]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        cleaned = _collect(_clean_in_batches(_produce(range(30)), clean_batch, 3, 4, executor))
+    assert cleaned == [item * 10 for item in range(30)]
+
+
+def test_records_keep_producer_order():
+    records = [{'n': i, 'text': f'“{i}”'} for i in range(250)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        cleaned = _collect(clean_records(_produce(records), executor=executor, batch_size=7, max_pending=3))
+    assert cleaned == [{'n': i, 'text': f'"{i}"'} for i in range(250)]
+
+
+def test_consumer_stopping_early_stops_pulling_the_producer():
+    pulled = []
+
+    async def produce():
+        for i in range(1000):
+            pulled.append(i)
+            yield {'n': i}
+
+    async def take_one():
+        cleaned = clean_records(produce(), batch_size=10, max_pending=2)
+        first = await cleaned.__anext__()
+        await cleaned.aclose()
+        return first
+
+    assert asyncio.run(take_one()) == {'n': 0}
+    # At most the batches that fill the window, plus the one being gathered
+    assert len(pulled) <= 10 * 3
+
+
+def test_invalid_lines_are_numbered_from_the_start_of_the_stream(capsys):
+    lines = [json.dumps({'n': i}) + '\n' if i != 12 else '{broken\n' for i in range(20)]
+    stats = {}
+    cleaned = _collect(clean_lines(_produce(lines), stats=stats, batch_size=5))
+    assert [json.loads(line)['n'] for line in cleaned] == [i for i in range(20) if i != 12]
+    assert stats == {'lines_processed': 20, 'lines_removed': 1, 'lines_written': 19}
+    assert 'invalid JSON on line 13:' in capsys.readouterr().err
@@ -0,0 +1,55 @@
+"""Batch mode: expanding inputs and naming outputs without collisions."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+from unicode_cleaner.batch import batch_output_path, plan_batch_jobs
+
+
+def _write_jsonl(path, count=3):
+    path.write_text(''.join(json.dumps({'instruction': f'q{i} “x”', 'response': 'a'}) + '\n' for i in range(count)),
+                    encoding='utf-8')
+
+
+def test_output_names_keep_compression_suffix(tmp_path):
+    assert batch_output_path(tmp_path / 'pr1.jsonl.gz', suffix='_clean') == tmp_path / 'pr1_clean.jsonl.gz'
+    assert batch_output_path(tmp_path / 'pr1.jsonl', output_dir=tmp_path / 'out') == tmp_path / 'out' / 'pr1.jsonl'
+    assert batch_output_path(tmp_path / 'pr1.jsonl') is None
+
+
+def test_glob_skips_outputs_of_an_earlier_run(tmp_path):
+    _write_jsonl(tmp_path / 'pr1.jsonl')
+    _write_jsonl(tmp_path / 'pr1_clean.jsonl')
+    jobs = plan_batch_jobs([str(tmp_path / 'pr*.jsonl')], ('.jsonl',), suffix='_clean')
+    assert jobs == [(tmp_path / 'pr1.jsonl', tmp_path / 'pr1_clean.jsonl')]
+
+
+def test_output_over_an_explicit_input_is_refused(tmp_path):
+    _write_jsonl(tmp_path / 'pr1.jsonl')
+    _write_jsonl(tmp_path / 'pr1_clean.jsonl')
+    with pytest.raises(ValueError, match='overwrite an input'):
+        plan_batch_jobs([str(tmp_path / 'pr1.jsonl'), str(tmp_path / 'pr1_clean.jsonl')], ('.jsonl',),
+                        suffix='_clean')
+
+
+def test_two_inputs_with_one_output_are_refused(tmp_path):
+    for directory in ('a', 'b'):
+        (tmp_path / directory).mkdir()
+        _write_jsonl(tmp_path / directory / 'data.jsonl')
+    with pytest.raises(ValueError, match='both be written'):
+        plan_batch_jobs([str(tmp_path / 'a'), str(tmp_path / 'b')], ('.jsonl',), output_dir=str(tmp_path / 'out'))
+
+
+def test_repeated_batch_run_keeps_outputs_intact(tmp_path):
+    for name in ('pr1.jsonl', 'pr2.jsonl'):
+        _write_jsonl(tmp_path / name, count=20)
+    command = [sys.executable, str(REPO_ROOT / 'clean_jsonl.py'), '--suffix', '_clean', '--workers', '2',
+               str(tmp_path / 'pr*.jsonl')]
+    for _ in range(2):
+        subprocess.run(command, check=True, capture_output=True)
+    assert not (tmp_path / 'pr1_clean_clean.jsonl').exists()
+    assert len((tmp_path / 'pr1_clean.jsonl').read_text().splitlines()) == 20
@@ -0,0 +1,102 @@
+"""Command-line scripts: what goes to stdout and what goes to stderr."""
+
+import gzip
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+
+def _run(script, *args):
+    return subprocess.run([sys.executable, str(REPO_ROOT / script), *map(str, args)],
+                          capture_output=True, text=True, encoding='utf-8')
+
+
+def _pipe(script, data, *args):
+    return subprocess.run([sys.executable, str(REPO_ROOT / script), *map(str, args)], input=data,
+                          capture_output=True)
+
+
+@pytest.mark.parametrize('script, source, text', [
+    ('clean_jsonl.py', 'data.jsonl', json.dumps({'instruction': 'q “x”', 'response': 'a'}) + '\n'),
+    ('clean_markdown.py', 'doc.md', '# Café “notes”\n'),
+    ('markdown_to_jsonl.py', 'qa.md', '## Section\n\n1. **Q:** Why “this”?\n   **A:** Because.\n'),
+])
+def test_profile_report_on_stdout_is_valid_json(tmp_path, script, source, text):
+    (tmp_path / source).write_text(text, encoding='utf-8')
+    result = _run(script, '--profile', '-', tmp_path / source, tmp_path / 'out')
+    assert result.returncode == 0, result.stderr
+    assert 'counts' in json.loads(result.stdout)
+    assert '✅' in result.stderr
+
+
+@pytest.mark.parametrize('script, source', [('clean_jsonl.py', 'data.jsonl'), ('clean_markdown.py', 'doc.md')])
+def test_profile_report_and_data_cannot_share_stdout(tmp_path, script, source):
+    (tmp_path / source).write_text('{}\n', encoding='utf-8')
+    result = _run(script, '--profile', '-', tmp_path / source, '-')
+    assert result.returncode != 0
+    assert 'stdout' in result.stderr
+
+
+def test_cleaned_data_on_stdout_is_only_data(tmp_path):
+    (tmp_path / 'data.jsonl').write_text(json.dumps({'instruction': 'q “x”', 'response': 'a'}) + '\n',
+                                         encoding='utf-8')
+    result = _run('clean_jsonl.py', '--verbose', tmp_path / 'data.jsonl', '-')
+    assert result.returncode == 0, result.stderr
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [{'instruction': 'q "x"', 'response': 'a'}]
+
+
+def test_scripts_keep_their_original_functions():
+    import clean_jsonl
+    import clean_markdown
+    for name in ('normalize_unicode', 'process_json_value', 'clean_jsonl_file', 'main'):
+        assert callable(getattr(clean_jsonl, name))
+    for name in ('normalize_unicode', 'clean_markdown_file', 'main'):
+        assert callable(getattr(clean_markdown, name))
+
+
+@pytest.mark.parametrize('script, source, text', [
+    ('clean_jsonl.py', 'data.jsonl', ''.join(json.dumps({'instruction': f'q “{i}”', 'response': 'é'}) + '\n'
+                                             for i in range(1000)) + '{broken\n'),
+    ('clean_markdown.py', 'doc.md', ''.join(f'Line “{i}”\r\n' for i in range(1000))),
+])
+@pytest.mark.parametrize('compress', [False, True], ids=['plain', 'gzip'])
+def test_stdin_to_stdout_matches_files(tmp_path, script, source, text, compress):
+    (tmp_path / source).write_text(text, encoding='utf-8', newline='')
+    result = _run(script, tmp_path / source, tmp_path / 'out')
+    assert result.returncode == 0, result.stderr
+
+    data = text.encode('utf-8')
+    piped = _pipe(script, gzip.compress(data) if compress else data, '-', '-')
+    assert piped.returncode == 0, piped.stderr
+    assert piped.stdout == (tmp_path / 'out').read_bytes()
+
+
+@pytest.mark.parametrize('script, source', [('clean_jsonl.py', 'data.jsonl'), ('clean_markdown.py', 'doc.md')])
+def test_line_buffering_is_refused_in_batch_mode(tmp_path, script, source):
+    (tmp_path / source).write_text('{}\n', encoding='utf-8')
+    result = _run(script, '--line-buffered', '--suffix', '_clean', tmp_path / source)
+    assert result.returncode != 0
+    assert '--line-buffered' in result.stderr
+    assert not list(tmp_path.glob('*_clean*'))
+
+
+@pytest.mark.parametrize('script, suffix, text, total', [
+    ('clean_jsonl.py', '.jsonl', '{"a": "“x”"}\n', 'Total (2 files): 2 processed, 0 removed, 2 written'),
+    ('clean_markdown.py', '.md', '# “x”\n', 'Total (2 files): 2 lines, 4 characters normalized'),
+])
+def test_batch_summary_and_failures(tmp_path, script, suffix, text, total):
+    for name in ('a', 'b'):
+        (tmp_path / f'{name}{suffix}').write_text(text, encoding='utf-8')
+    result = _run(script, '--suffix', '_clean', tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert total in result.stdout
+
+    (tmp_path / f'c{suffix}').write_bytes(b'\xff\xfe not UTF-8\n')
+    result = _run(script, '--output-dir', tmp_path / 'out', tmp_path / f'*{suffix}')
+    assert result.returncode == 1
+    assert 'FAILED' in result.stdout
+    assert '1 of 5 files failed' in result.stderr
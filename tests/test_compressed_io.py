@@ -0,0 +1,65 @@
+"""Cleaning gzip and zstd files directly."""
+
+import gzip
+import json
+
+import pytest
+
+from unicode_cleaner import compressed_io
+from unicode_cleaner.jsonl import clean_jsonl_file
+from unicode_cleaner.markdown import clean_markdown_file
+
+
+JSONL = ''.join(json.dumps({'instruction': f'“{i}” café', 'response': 'ok'}, ensure_ascii=False) + '\n'
+                for i in range(2000))
+MARKDOWN = ''.join(f'# Section {i}\n\nNaïve “prose” {i}\n\n' for i in range(2000))
+
+
+def _compress(compression, data):
+    if compression == 'gzip':
+        return gzip.compress(data)
+    return pytest.importorskip('zstandard').ZstdCompressor().compress(data)
+
+
+def _decompress(compression, data):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    return pytest.importorskip('zstandard').ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Several chunks go through the compression thread's queue
+    monkeypatch.setattr(compressed_io, 'COMPRESS_CHUNK_SIZE', 4096)
+
+
+@pytest.mark.parametrize('compression, suffix', [('gzip', '.gz'), ('zstd', '.zst')])
+@pytest.mark.parametrize('clean_file, name, text', [
+    (clean_jsonl_file, 'data.jsonl', JSONL),
+    (clean_markdown_file, 'doc.md', MARKDOWN),
+], ids=['jsonl', 'markdown'])
+def test_compressed_round_trip_matches_plain_files(tmp_path, compression, suffix, clean_file, name, text):
+    source = tmp_path / name
+    source.write_text(text, encoding='utf-8')
+    compressed = tmp_path / (name + suffix)
+    compressed.write_bytes(_compress(compression, text.encode('utf-8')))
+
+    plain_counts = clean_file(source, tmp_path / 'plain.out')
+    compressed_counts = clean_file(compressed, tmp_path / ('compressed.out' + suffix))
+    # Inputs are recognized by their contents, whatever they are called
+    unnamed_counts = clean_file(compressed, tmp_path / 'unnamed.out')
+
+    expected = (tmp_path / 'plain.out').read_bytes()
+    assert _decompress(compression, (tmp_path / ('compressed.out' + suffix)).read_bytes()) == expected
+    assert (tmp_path / 'unnamed.out').read_bytes() == expected
+    assert compressed_counts == unnamed_counts == plain_counts
+
+
+@pytest.mark.parametrize('compression, suffix', [('gzip', '.gz'), ('zstd', '.zst')])
+def test_in_place_cleaning_keeps_the_compression(tmp_path, compression, suffix):
+    compressed = tmp_path / ('data.jsonl' + suffix)
+    compressed.write_bytes(_compress(compression, JSONL.encode('utf-8')))
+    clean_jsonl_file(compressed)
+    cleaned = _decompress(compression, compressed.read_bytes()).decode('utf-8').splitlines()
+    assert json.loads(cleaned[0]) == {'instruction': '"0" cafe', 'response': 'ok'}
+    assert len(cleaned) == 2000
@@ -0,0 +1,91 @@
+"""The cleaning daemon refuses requests that do not come from its own local clients."""
+
+import http.client
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import REPO_ROOT
+from unicode_cleaner.daemon import TOKEN_HEADER, clean_file_with_daemon, read_token, token_path
+
+
+@pytest.fixture(scope='module')
+def daemon():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen([sys.executable, '-m', 'unicode_cleaner.daemon', '--port', str(port), '--workers', '1'],
+                               cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while read_token(port) is None:
+            assert process.poll() is None and time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.05)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _post(port, body, headers):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        connection.request('POST', '/normalize', json.dumps(body), headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_token_file_is_private(daemon):
+    assert stat.S_IMODE(os.stat(token_path(daemon)).st_mode) == 0o600
+
+
+def test_accepts_json_with_token(daemon):
+    headers = {'Content-Type': 'application/json', TOKEN_HEADER: read_token(daemon)}
+    assert _post(daemon, {'texts': ['“Café”']}, headers) == (200, {'texts': ['"Cafe"']})
+
+
+def test_refuses_requests_without_the_token(daemon):
+    for token in ({}, {TOKEN_HEADER: 'guess'}):
+        assert _post(daemon, {'texts': ['x']}, {'Content-Type': 'application/json', **token})[0] == 403
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({'Content-Type': 'text/plain'}, 415),
+    ({'Content-Type': 'application/json', 'Origin': 'https://example.com'}, 403),
+    ({'Content-Type': 'application/json', 'Host': 'attacker.example:8765'}, 403),
+])
+def test_refuses_cross_origin_requests(daemon, headers, status):
+    assert _post(daemon, {'texts': ['x']}, {TOKEN_HEADER: read_token(daemon), **headers})[0] == status
+
+
+def test_cleans_files_through_client(daemon, tmp_path):
+    source = tmp_path / 'doc.md'
+    source.write_text('“Café”\n', encoding='utf-8')
+    counts = clean_file_with_daemon(f'127.0.0.1:{daemon}', 'markdown', source, tmp_path / 'out.md')
+    assert counts == (1, 3)
+    assert (tmp_path / 'out.md').read_text() == '"Cafe"\n'
+
+
+def test_relative_profile_names_are_resolved_by_the_client(daemon, tmp_path, monkeypatch):
+    (tmp_path / 'loud.json').write_text(json.dumps({'extends': 'default', 'replacements': {'g': {'é': 'E'}}}),
+                                        encoding='utf-8')
+    (tmp_path / 'doc.md').write_text('Café\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    clean_file_with_daemon(f'127.0.0.1:{daemon}', 'markdown', 'doc.md', 'out.md', {'profile': 'loud.json'})
+    assert (tmp_path / 'out.md').read_text() == 'CafE\n'
+
+
+@pytest.mark.parametrize('body', [['texts'], 'texts', 3])
+def test_non_object_bodies_get_an_error_response(daemon, body):
+    headers = {'Content-Type': 'application/json', TOKEN_HEADER: read_token(daemon)}
+    status, payload = _post(daemon, body, headers)
+    assert status == 400
+    assert 'JSON object' in payload['error']
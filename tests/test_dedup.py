@@ -0,0 +1,40 @@
+"""Exact and near-duplicate detection."""
+
+from unicode_cleaner.dedup import Deduplicator
+
+
+def test_exact_duplicates_are_dropped():
+    deduplicator = Deduplicator(near_duplicates=False)
+    record = {'instruction': 'What is it?', 'response': 'A test.'}
+    assert not deduplicator.is_duplicate(record)
+    assert deduplicator.is_duplicate(dict(record))
+    assert deduplicator.dropped == {'exact': 1}
+
+
+def test_near_duplicates_are_dropped():
+    deduplicator = Deduplicator()
+    text = 'the quick brown fox jumps over the lazy dog near the river bank every single morning'
+    assert not deduplicator.is_duplicate({'instruction': 'Describe the fox', 'response': text})
+    assert deduplicator.is_duplicate({'instruction': 'Describe the fox', 'response': text + '!'})
+    assert deduplicator.dropped == {'near': 1}
+
+
+def test_records_without_words_are_not_near_duplicates():
+    deduplicator = Deduplicator()
+    for record in ({'instruction': '???', 'response': '!!!'}, {'instruction': '...', 'response': '--'},
+                   {'instruction': '', 'response': '*'}):
+        assert not deduplicator.is_duplicate(record)
+    # Exact repeats are still found
+    assert deduplicator.is_duplicate({'instruction': '???', 'response': '!!!'})
+
+
+def test_bucket_shared_by_earlier_records_still_finds_later_ones(monkeypatch):
+    # Two bands of two values each; every band of b is already taken when it is added
+    signatures = {'a': [1, 1, 9, 9], 'a2': [8, 8, 2, 2], 'b': [1, 1, 2, 2]}
+    deduplicator = Deduplicator(threshold=0.6, num_perm=4)
+    monkeypatch.setattr(deduplicator, '_signature', lambda text: signatures[text.split('\n')[0]])
+
+    for name in ('a', 'a2', 'b'):
+        assert not deduplicator.is_duplicate({'instruction': name, 'response': 'x'})
+    assert deduplicator.is_duplicate({'instruction': 'b', 'response': 'x', 'context': 'copy'})
+    assert deduplicator.dropped == {'near': 1}
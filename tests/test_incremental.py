@@ -0,0 +1,71 @@
+"""Incremental re-cleaning: chunk reuse across edits."""
+
+import json
+
+from unicode_cleaner.incremental import clean_incrementally, iter_content_defined_chunks
+from unicode_cleaner.jsonl import clean_jsonl_file
+
+
+def _records(count):
+    return [json.dumps({'instruction': f'Question {i} “quoted”', 'response': f'Answer {i} – café'}) + '\n'
+            for i in range(count)]
+
+
+def _clean_upper(lines, first_line_num):
+    text = ''.join(lines).upper()
+    return text, (len(lines),), {}
+
+
+def test_chunk_boundaries_do_not_shift_after_an_insertion():
+    lines = [f'line {i}\n' for i in range(5000)]
+    before = list(iter_content_defined_chunks(lines, 64))
+    after = list(iter_content_defined_chunks(lines[:100] + ['inserted\n'] + lines[100:], 64))
+    assert len(before) > 10
+    unchanged = set(map(tuple, before)) & set(map(tuple, after))
+    # Only the chunk around the inserted line (or its neighbour) differs
+    assert len(unchanged) >= len(before) - 2
+
+
+def test_chunks_respect_the_maximum_on_repeated_lines():
+    chunks = list(iter_content_defined_chunks(['same\n'] * 1000, 16))
+    assert sum(map(len, chunks)) == 1000
+    assert all(len(chunk) <= 16 * 8 for chunk in chunks)
+
+
+def test_insertion_reuses_chunks_before_and_after(tmp_path):
+    input_path = tmp_path / 'in.txt'
+    output_path = tmp_path / 'out.txt'
+    lines = [f'line {i}\n' for i in range(3000)]
+    input_path.write_text(''.join(lines))
+    _, reused, cleaned = clean_incrementally(input_path, output_path, 'v1', _clean_upper, (0,), chunk_lines=32)
+    assert reused == 0
+
+    input_path.write_text(''.join(lines[:1500] + ['new line\n'] + lines[1500:]))
+    counts, reused, cleaned = clean_incrementally(input_path, output_path, 'v1', _clean_upper, (0,), chunk_lines=32)
+    assert counts == (3001,)
+    assert cleaned <= 2
+    assert reused > 50
+    assert output_path.read_text() == ''.join(lines[:1500] + ['new line\n'] + lines[1500:]).upper()
+
+
+def test_changed_fingerprint_cleans_everything_again(tmp_path):
+    input_path = tmp_path / 'in.txt'
+    input_path.write_text(''.join(f'line {i}\n' for i in range(500)))
+    clean_incrementally(input_path, tmp_path / 'out.txt', 'v1', _clean_upper, (0,), chunk_lines=32)
+    _, reused, _ = clean_incrementally(input_path, tmp_path / 'out.txt', 'v2', _clean_upper, (0,), chunk_lines=32)
+    assert reused == 0
+
+
+def test_incremental_jsonl_matches_a_full_run(tmp_path):
+    input_path = tmp_path / 'data.jsonl'
+    records = _records(2000)
+    input_path.write_text(''.join(records), encoding='utf-8')
+    clean_jsonl_file(input_path, tmp_path / 'inc.jsonl', incremental=True, chunk_lines=64)
+    records.insert(700, '\n')
+    del records[1200]
+    input_path.write_text(''.join(records), encoding='utf-8')
+
+    incremental_counts = clean_jsonl_file(input_path, tmp_path / 'inc.jsonl', incremental=True, chunk_lines=64)
+    full_counts = clean_jsonl_file(input_path, tmp_path / 'full.jsonl')
+    assert incremental_counts == full_counts
+    assert (tmp_path / 'inc.jsonl').read_bytes() == (tmp_path / 'full.jsonl').read_bytes()
@@ -0,0 +1,217 @@
+"""JSONL pipeline stages."""
+
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+from unicode_cleaner import jsonl
+from unicode_cleaner.jsonl import (
+    _clean_jsonl_lines, clean_jsonl_file, compile_field_paths, is_clean_line, normalize_fields, normalize_records, parse_jsonl_lines,
+)
+
+
+def _lines(count, size):
+    return [json.dumps({'instruction': 'q “x”', 'response': 'a' * size}) + '\n' for _ in range(count)]
+
+
+def test_read_ahead_is_bounded_by_bytes():
+    stats = {}
+    parsed = []
+
+    def parse(lines):
+        for record in parse_jsonl_lines(lines, stats):
+            parsed.append(record)
+            yield record
+
+    normalized = normalize_records(parse(_lines(100, 1000)), batch_size=1000, max_batch_bytes=2500, stats=stats)
+    first = next(normalized)
+    assert first['instruction'] == 'q "x"'
+    # Three lines of about 1000 characters reach the limit
+    assert len(parsed) == 3
+    assert len(list(normalized)) == 99
+
+
+def test_read_ahead_without_stats_is_bounded_by_the_records_text():
+    parsed = []
+
+    def parse(lines):
+        for record in parse_jsonl_lines(lines):
+            parsed.append(record)
+            yield record
+
+    normalized = normalize_records(parse(_lines(100, 1000)), batch_size=1000, max_batch_bytes=2500)
+    assert next(normalized)['instruction'] == 'q "x"'
+    assert len(parsed) == 3
+    assert len(list(normalized)) == 99
+
+
+def test_read_ahead_without_byte_limit_fills_the_batch():
+    parsed = []
+
+    def parse(lines):
+        for record in parse_jsonl_lines(lines):
+            parsed.append(record)
+            yield record
+
+    next(normalize_records(parse(_lines(100, 1000)), batch_size=50))
+    assert len(parsed) == 50
+
+
+def test_byte_limited_batches_write_every_record():
+    outfile = io.StringIO()
+    counts = _clean_jsonl_lines(_lines(20, 300), outfile, batch_size=1000, max_batch_bytes=1000)
+    assert counts == (20, 0, 20)
+    assert [json.loads(line)['instruction'] for line in outfile.getvalue().splitlines()] == ['q "x"'] * 20
+
+
+def test_validation_checks_the_records_as_written():
+    from unicode_cleaner.validate import DEFAULT_SCHEMA
+    errors = []
+    lines = [
+        json.dumps({'instruction': 'ok', 'response': 'fine'}) + '\n',
+        '\n',
+        # A lone combining accent normalizes to an empty string
+        json.dumps({'instruction': 'q', 'response': '́'}) + '\n',
+        json.dumps({'instruction': 'q', 'response': 'good'}) + '\n',
+    ]
+    outfile = io.StringIO()
+    _clean_jsonl_lines(lines, outfile, schema=DEFAULT_SCHEMA,
+                       on_schema_error=lambda *error: errors.append(error))
+    assert errors == [(3, 'empty_field', 'response', None)]
+    assert json.loads(outfile.getvalue().splitlines()[1]) == {'instruction': 'q', 'response': ''}
+
+
+NESTED = {
+    'instruction': '“q”',
+    'x': {'y': '“y”', 'z': '“z”'},
+    'messages': [{'role': '“r”', 'content': '“c”'}],
+}
+
+
+@pytest.mark.parametrize('paths, expected', [
+    (['instruction'], {**NESTED, 'instruction': '"q"'}),
+    (['x.y'], {**NESTED, 'x': {'y': '"y"', 'z': '“z”'}}),
+    (['messages[*].content'], {**NESTED, 'messages': [{'role': '“r”', 'content': '"c"'}]}),
+    (['x', 'x.y'], {**NESTED, 'x': {'y': '"y"', 'z': '"z"'}}),
+    # A specific path next to a wildcard must not narrow what the wildcard selects
+    (['*', 'x.y'], {'instruction': '"q"', 'x': {'y': '"y"', 'z': '"z"'},
+                    'messages': [{'role': '"r"', 'content': '"c"'}]}),
+    (['*.z', 'x.y'], {**NESTED, 'x': {'y': '"y"', 'z': '"z"'}}),
+])
+def test_field_selection(paths, expected):
+    assert normalize_fields(json.loads(json.dumps(NESTED)), compile_field_paths(paths)) == expected
+
+
+@pytest.mark.parametrize('path', ['', 'a..b', 'a[1]', 'a]'])
+def test_invalid_field_paths_are_rejected(path):
+    with pytest.raises(ValueError, match='Invalid field path'):
+        compile_field_paths([path])
+
+
+def test_fields_option_normalizes_only_the_selected_fields(tmp_path):
+    source = tmp_path / 'data.jsonl'
+    source.write_text(json.dumps(NESTED) + '\n', encoding='utf-8')
+    result = subprocess.run([sys.executable, str(REPO_ROOT / 'clean_jsonl.py'), '--fields', '*,x.y', str(source), '-'],
+                            capture_output=True, text=True, encoding='utf-8')
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {'instruction': '"q"', 'x': {'y': '"y"', 'z': '"z"'},
+                                         'messages': [{'role': '"r"', 'content': '"c"'}]}
+
+
+def test_workers_match_a_single_process(tmp_path, monkeypatch, capsys):
+    lines = []
+    for i in range(300):
+        if i % 37 == 5:
+            lines.append(f'{{"broken": {i}\n')
+        elif i % 11 == 0:
+            lines.append(json.dumps({'instruction': f'“{i}” café', 'response': 'ok'}, ensure_ascii=False) + '\r\n')
+        else:
+            lines.append(json.dumps({'instruction': f'plain {i}', 'response': 'ok'}) + '\n')
+    source = tmp_path / 'in.jsonl'
+    source.write_text(''.join(lines), encoding='utf-8', newline='')
+    # Small chunks, so invalid lines fall in chunks after the first
+    monkeypatch.setattr(jsonl, 'MIN_CHUNK_SIZE', 256)
+
+    serial_counts = clean_jsonl_file(source, tmp_path / 'serial.jsonl')
+    serial_warnings = capsys.readouterr().err
+    parallel_counts = clean_jsonl_file(source, tmp_path / 'parallel.jsonl', workers=2)
+    parallel_warnings = capsys.readouterr().err
+
+    assert (tmp_path / 'parallel.jsonl').read_bytes() == (tmp_path / 'serial.jsonl').read_bytes()
+    assert parallel_counts == serial_counts
+    assert parallel_warnings == serial_warnings
+    assert [int(line.split('line ')[1].split(':')[0]) for line in serial_warnings.splitlines()
+            if line.startswith('Warning')] == [i + 1 for i in range(300) if i % 37 == 5]
+
+
+BACKEND_LINES = [
+    '{"instruction": "“quoted” café", "response": "ok"}',
+    '{"instruction": "escaped \\u00e9 \\u201c", "response": "\\u0001 control"}',
+    '{"a": 1e16, "b": 0.1, "c": -0.0, "d": 1.0}',
+    '{"big": 123456789012345678901234567890, "neg": -18446744073709551616}',
+    '{"nan": NaN, "inf": Infinity}',
+    '{"surrogate": "\\ud800 alone"}',
+    '{"a": 1, "a": 2}',
+    '[1, "two", {"three": [null, true, false]}]',
+    '"just a string"',
+    '{"nested": {"deep": ["´tick`", "ﬁ ligature"]}}',
+    '{"broken": ',
+    '',
+    '{"instruction": "plain ascii", "response": "with `grave`"}',
+]
+
+
+@pytest.mark.parametrize('ascii_passthrough', [False, True])
+def test_orjson_backend_matches_the_stdlib(ascii_passthrough):
+    pytest.importorskip('orjson')
+    outputs = {}
+    for backend in ('stdlib', 'orjson'):
+        outfile = io.StringIO()
+        invalid = []
+        counts = _clean_jsonl_lines([line + '\n' for line in BACKEND_LINES], outfile, json_backend=backend,
+                                    ascii_passthrough=ascii_passthrough,
+                                    on_invalid=lambda line_num, error, line: invalid.append((line_num, str(error))))
+        outputs[backend] = (outfile.getvalue(), counts, invalid)
+    assert outputs['orjson'] == outputs['stdlib']
+
+
+@pytest.mark.parametrize('line, clean', [
+    ('{"a": "plain"}', True),
+    ('{"a": "caf\\u00e9"}', False),
+    ('{"a": "\\u0060escaped grave"}', False),
+    ('{"a": "C:\\\\users"}', False),
+    ('{"a": "`grave`"}', False),
+    ('{"a": "café"}', False),
+])
+def test_clean_line_screening(line, clean):
+    assert is_clean_line(line) is clean
+
+
+@pytest.mark.parametrize('profile', [None, {'extends': 'default', 'replacements': {'g': {'`': '^'}}}],
+                         ids=['default', 'grave remapped'])
+def test_ascii_passthrough_matches_full_normalization(tmp_path, profile):
+    if profile is not None:
+        (tmp_path / 'grave.json').write_text(json.dumps(profile), encoding='utf-8')
+        profile = str(tmp_path / 'grave.json')
+    lines = [
+        '{"a": "plain"}\n',
+        '{"a": "caf\\u00e9 \\u201cq\\u201d"}\n',
+        '{"a": "\\u0060escaped grave"}\n',
+        '{"a": "`grave` in ascii"}\n',
+        '{"a": "C:\\\\users"}\n',
+    ]
+    outputs = []
+    for ascii_passthrough in (False, True):
+        outfile = io.StringIO()
+        _clean_jsonl_lines(lines, outfile, ascii_passthrough=ascii_passthrough, profile=profile)
+        outputs.append([json.loads(line) for line in outfile.getvalue().splitlines()])
+    # Lines passed through keep their original spacing, so compare the values
+    assert outputs[1] == outputs[0]
+    grave = '^' if profile is not None else "'"
+    assert [record['a'] for record in outputs[1]] == [
+        'plain', 'cafe "q"', f'{grave}escaped grave', f'{grave}grave{grave} in ascii', 'C:\\users',
+    ]
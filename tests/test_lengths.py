@@ -0,0 +1,30 @@
+"""Token budgets: dropping and truncating records that are too long."""
+
+from unicode_cleaner.lengths import LengthStats
+
+
+def test_truncate_cuts_at_a_word_boundary():
+    stats = LengthStats(max_tokens=5, over_budget='truncate')
+    record = stats.measure({'instruction': 'Why?', 'response': 'alpha beta gamma delta epsilon zeta'})
+    assert record == {'instruction': 'Why?', 'response': 'alpha beta'}
+    assert stats.truncated == 1
+
+
+def test_truncate_never_leaves_an_empty_response():
+    stats = LengthStats(max_tokens=3, over_budget='truncate')
+    # Only whitespace fits in the budget, so the record is dropped instead
+    assert stats.measure({'instruction': 'Why?', 'response': ' ' * 8 + 'word ' * 10}) is None
+    assert (stats.truncated, stats.dropped) == (0, 1)
+
+
+def test_truncate_hard_cuts_a_response_without_spaces():
+    stats = LengthStats(max_tokens=3, over_budget='truncate')
+    record = stats.measure({'instruction': 'Why?', 'response': 'x' * 40})
+    assert record['response'] == 'x' * 8
+
+
+def test_drop_removes_records_over_the_budget():
+    stats = LengthStats(max_tokens=2)
+    assert stats.measure({'response': 'short'}) == {'response': 'short'}
+    assert stats.measure({'response': 'x' * 40}) is None
+    assert stats.dropped == 1
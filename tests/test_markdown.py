@@ -0,0 +1,70 @@
+"""Tests of the Markdown cleaner: the memory-mapped path against the text path, and code preservation."""
+
+import pytest
+
+from unicode_cleaner import markdown
+from unicode_cleaner.markdown import clean_markdown_file
+
+
+DOCUMENTS = {
+    'empty': '',
+    'ascii': 'plain line\nanother one\n',
+    'no final newline': 'plain line\nlast “line”',
+    'crlf': 'first\r\nCafé\r\nthird\r\n',
+    'lone cr': 'old\rmac\rlines “here”\r',
+    'backticks': 'use `code` here\nplain\n```\nfence\n```\n',
+    'mixed': ''.join(
+        f"line {i} “quoted”\n" if i % 7 == 0 else f"ascii line {i}\n" for i in range(500)
+    ),
+}
+
+
+@pytest.fixture(params=[False, True], ids=['default windows', 'small windows'])
+def windows(request, monkeypatch):
+    if request.param:
+        # Push line runs across window edges and split the clean runs between them
+        monkeypatch.setattr(markdown, '_SCREEN_WINDOW', 16)
+        monkeypatch.setattr(markdown, '_MIN_COPY', 8)
+
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_mapped_output_matches_text_path(tmp_path, windows, name):
+    source = tmp_path / 'in.md'
+    source.write_bytes(DOCUMENTS[name].encode('utf-8'))
+
+    text_counts = clean_markdown_file(source, tmp_path / 'text.md')
+    mapped_counts = clean_markdown_file(source, tmp_path / 'mapped.md', use_mmap=True)
+
+    assert (tmp_path / 'mapped.md').read_bytes() == (tmp_path / 'text.md').read_bytes()
+    assert mapped_counts == text_counts
+
+
+def test_mapped_preserve_code_matches_text_path(tmp_path):
+    source = tmp_path / 'in.md'
+    source.write_bytes(DOCUMENTS['backticks'].encode('utf-8') + 'Naïve “prose”\n'.encode('utf-8'))
+
+    text_counts = clean_markdown_file(source, tmp_path / 'text.md', preserve_code=True)
+    mapped_counts = clean_markdown_file(source, tmp_path / 'mapped.md', use_mmap=True, preserve_code=True)
+
+    assert (tmp_path / 'mapped.md').read_bytes() == (tmp_path / 'text.md').read_bytes()
+    assert mapped_counts == text_counts
+
+
+@pytest.mark.parametrize('document, expected', [
+    ('````md\n```python\nx = “q”\n```\nstill “code”\n````\nafter “prose”\n',
+     '````md\n```python\nx = “q”\n```\nstill “code”\n````\nafter "prose"\n'),
+    ('“before”\n```\ncode “q”\nmore é\n', '"before"\n```\ncode “q”\nmore é\n'),
+    ('~~~\n```\n“tilde”\n~~~\n“out”\n', '~~~\n```\n“tilde”\n~~~\n"out"\n'),
+    ('use ``a ` “b”`` and `é` then “prose”\n', 'use ``a ` “b”`` and `é` then "prose"\n'),
+    ('start `code\n“x”` end “y”\n', 'start `code\n“x”` end "y"\n'),
+    # Backticks that open no span are prose, so they become apostrophes
+    ('\\`not “code”`\n', '\\\'not "code"\'\n'),
+    ('a `b “c”\n', 'a \'b "c"\n'),
+], ids=['nested fences', 'unterminated fence', 'tilde fence', 'inline spans', 'span across lines',
+        'escaped backtick', 'unclosed span'])
+def test_preserve_code_leaves_code_untouched(tmp_path, windows, document, expected):
+    source = tmp_path / 'in.md'
+    source.write_text(document, encoding='utf-8')
+    for use_mmap in (False, True):
+        clean_markdown_file(source, tmp_path / 'out.md', use_mmap=use_mmap, preserve_code=True)
+        assert (tmp_path / 'out.md').read_text(encoding='utf-8') == expected
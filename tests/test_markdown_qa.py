@@ -0,0 +1,76 @@
+"""Parsing question/answer pairs out of Markdown."""
+
+from unicode_cleaner.markdown_qa import parse_qa_markdown
+
+
+def _parse(text, **kwargs):
+    stats = {}
+    records = list(parse_qa_markdown(text.splitlines(keepends=True), stats, **kwargs))
+    return [(record['instruction'], record['response']) for record in records], stats
+
+
+def test_bold_numbered_pairs_take_their_section():
+    text = (
+        '### Attractions\n'
+        '\n'
+        '1. **Q: What should I see?**\n'
+        '   **A:** The pier.\n'
+        '2. **Q:** Where do I eat?\n'
+        '   **A:** Downtown.\n'
+    )
+    records = list(parse_qa_markdown(text.splitlines(keepends=True), section_context=True))
+    assert records == [
+        {'instruction': 'What should I see?', 'context': 'Attractions', 'response': 'The pier.'},
+        {'instruction': 'Where do I eat?', 'context': 'Attractions', 'response': 'Downtown.'},
+    ]
+
+
+def test_answers_span_wrapped_lines_and_paragraphs():
+    text = (
+        'Q: What is in the bag?\n'
+        'A: A book,\n'
+        '   a pen.\n'
+        '\n'
+        '   And a map.\n'
+        '\n'
+        'Unrelated text after the list.\n'
+        'Q: Next?\n'
+        'A: Yes.\n'
+    )
+    pairs, stats = _parse(text)
+    assert pairs == [('What is in the bag?', 'A book, a pen.\n\nAnd a map.'), ('Next?', 'Yes.')]
+    assert stats['answers_orphaned'] == 0
+
+
+def test_questions_wrap_onto_further_lines():
+    pairs, _ = _parse('**Q: Why is the sky\nblue at noon?**\n**A:** Scattering.\n')
+    assert pairs == [('Why is the sky blue at noon?', 'Scattering.')]
+
+
+def test_orphaned_answers_are_counted_and_dropped():
+    text = (
+        'A: Nobody asked.\n'
+        'Q: One?\n'
+        'A: First.\n'
+        'A: Second answer to the same question.\n'
+        'Q: Unanswered?\n'
+    )
+    pairs, stats = _parse(text)
+    assert pairs == [('One?', 'First.')]
+    assert stats['answers_orphaned'] == 2
+    assert stats['questions_unanswered'] == 1
+
+
+def test_lines_merely_starting_with_a_label_are_text():
+    text = (
+        'Q: How do experiments compare two pages?\n'
+        'A: With a split test:\n'
+        '   A:B testing shows each visitor one page.\n'
+        'Q:A ratio is not a question line either.\n'
+    )
+    pairs, stats = _parse(text)
+    assert pairs == [(
+        'How do experiments compare two pages?',
+        'With a split test: A:B testing shows each visitor one page. Q:A ratio is not a question line either.',
+    )]
+    assert stats['answers_orphaned'] == 0
@@ -0,0 +1,88 @@
+"""Parity of the compiled transliteration engine with the original algorithm."""
+
+import json
+import threading
+from collections import Counter
+
+import pytest
+
+from baseline_normalize import normalize_unicode as reference_normalize
+from conftest import DATA_DIR
+from unicode_cleaner.normalize import (
+    active_profile, counting_substitutions, normalize_many, normalize_unicode, process_json_value,
+    transliteration_profile,
+)
+
+
+def _load_corpus():
+    with open(DATA_DIR / 'normalize_corpus.jsonl', encoding='utf-8') as corpus:
+        return [json.loads(line) for line in corpus]
+
+
+CORPUS = _load_corpus()
+
+
+@pytest.mark.parametrize('case', CORPUS, ids=[case['text'][:30] for case in CORPUS])
+def test_corpus_matches_recorded_output(case):
+    assert normalize_unicode(case['text']) == case['expected']
+
+
+def test_corpus_matches_reference_algorithm():
+    for case in CORPUS:
+        assert normalize_unicode(case['text']) == reference_normalize(case['text'])
+
+
+@pytest.mark.parametrize('start', range(0x80, 0x10000, 0x1000))
+def test_every_bmp_character_matches_reference(start):
+    for codepoint in range(start, min(start + 0x1000, 0x10000)):
+        char = chr(codepoint)
+        assert normalize_unicode(char) == reference_normalize(char), hex(codepoint)
+
+
+def test_astral_characters_match_reference():
+    for codepoint in list(range(0x1D400, 0x1D800)) + list(range(0x1F300, 0x1F700)) + [0x10348, 0x13000]:
+        char = chr(codepoint)
+        assert normalize_unicode(char) == reference_normalize(char), hex(codepoint)
+
+
+def test_whole_corpus_as_one_string_matches_reference():
+    # Runs spanning many different characters go through the run cache and the long-run path
+    text = '\n'.join(case['text'] for case in CORPUS)
+    assert normalize_unicode(text) == reference_normalize(text)
+    assert normalize_unicode(text * 3) == reference_normalize(text) * 3
+
+
+def test_normalize_many_matches_one_at_a_time():
+    texts = [case['text'] for case in CORPUS] + ['a\x00b “c”', '']
+    assert normalize_many(texts) == [reference_normalize(text) for text in texts]
+
+
+def test_process_json_value_normalizes_nested_strings_only():
+    value = {'a': ['“x”', 1, None, {'b': 'café'}], 'n': 2.5}
+    assert process_json_value(value) == {'a': ['"x"', 1, None, {'b': 'cafe'}], 'n': 2.5}
+
+
+def test_profiles_and_counts_stay_within_their_thread():
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def clean(name, profile, text):
+        counts = Counter()
+        with counting_substitutions(counts), transliteration_profile(profile):
+            outputs = []
+            for _ in range(50):
+                # Both threads are inside their blocks whenever either normalizes
+                barrier.wait()
+                outputs.append(normalize_unicode(text))
+        results[name] = set(outputs), counts
+
+    threads = [threading.Thread(target=clean, args=('default', 'default', '½ é')),
+               threading.Thread(target=clean, args=('compact', 'compact', '½ ü'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results['default'] == ({'1?2 e'}, Counter({'½': 50, 'é': 50}))
+    assert results['compact'] == ({'1/2 u'}, Counter({'½': 50, 'ü': 50}))
+    assert active_profile().name == 'default'
@@ -0,0 +1,86 @@
+"""Transliteration profiles: loading, inheritance and precomposed keys."""
+
+import json
+
+import pytest
+
+from unicode_cleaner.normalize import normalize_unicode, transliteration_profile
+from unicode_cleaner.transliteration import load_profile
+
+
+def _write_profile(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_precomposed_characters_take_their_own_replacement(tmp_path):
+    german = _write_profile(tmp_path / 'german.json', {
+        'extends': 'default',
+        'replacements': {'german': {'ü': 'ue', 'Ö': 'Oe', 'ß': 'ss'}},
+    })
+    with transliteration_profile(german):
+        assert normalize_unicode('Über Größe: Müller') == 'Uber Grosse: Mueller'
+        assert normalize_unicode('ÖL') == 'OeL'
+    # Characters without their own entry are still decomposed
+    assert normalize_unicode('Müller') == 'Muller'
+
+
+def test_compact_profile_spells_out_fractions_and_symbols():
+    with transliteration_profile('compact'):
+        assert normalize_unicode('½ cup, x² ≠ y™') == '1/2 cup, x2 != yTM'
+    # The default profile keeps the original output for these characters
+    assert normalize_unicode('½ cup, x² ≠ y™') == '1?2 cup, x2 = yTM'
+
+
+def test_extending_profile_overrides_and_removes_entries(tmp_path):
+    _write_profile(tmp_path / 'base.json', {
+        'fallback': '#',
+        'replacements': {'quotes': {'“': '<', '”': '>'}, 'greek': {'α': 'alpha'}},
+    })
+    child = _write_profile(tmp_path / 'child.json', {
+        'extends': 'base.json',
+        'replacements': {'quotes': {'“': '"', '”': None}, 'greek': None},
+    })
+    profile = load_profile(child)
+    assert profile.replacements == {'“': '"'}
+    assert profile.fallback == '#'
+    with transliteration_profile(profile):
+        assert normalize_unicode('“α”') == '"##'
+
+
+@pytest.mark.parametrize('replacements, message', [
+    ({'g': {'ab': 'x'}}, 'not a single character'),
+    ({'g': {'a': 'x'}}, 'ASCII character'),
+    ({'g': {'é': 'è'}}, 'not a string of printable ASCII'),
+    ({'g': {'é': '\x00'}}, 'not a string of printable ASCII'),
+    ({'g': {'é': 'e\n'}}, 'not a string of printable ASCII'),
+    ({'g': ['é']}, 'must be an object or null'),
+])
+def test_invalid_profiles_are_rejected(tmp_path, replacements, message):
+    path = _write_profile(tmp_path / 'bad.json', {'replacements': replacements})
+    with pytest.raises(ValueError, match=message):
+        load_profile(path)
+
+
+def test_profiles_extending_each_other_are_rejected(tmp_path):
+    _write_profile(tmp_path / 'a.json', {'extends': 'b.json'})
+    path = _write_profile(tmp_path / 'b.json', {'extends': 'a.json'})
+    with pytest.raises(ValueError, match='cycle'):
+        load_profile(path)
+
+
+def test_control_character_fallback_is_rejected(tmp_path):
+    path = _write_profile(tmp_path / 'bad.json', {'fallback': '\x00'})
+    with pytest.raises(ValueError, match='fallback'):
+        load_profile(path)
+
+
+def test_edited_profiles_are_reloaded(tmp_path):
+    _write_profile(tmp_path / 'base.json', {'replacements': {'g': {'α': 'a'}}})
+    child = _write_profile(tmp_path / 'child.json', {'extends': 'base.json'})
+    assert load_profile(child).replacements == {'α': 'a'}
+    assert load_profile(child) is load_profile(child)
+
+    # Only the file it extends changes
+    _write_profile(tmp_path / 'base.json', {'replacements': {'g': {'α': 'alpha'}}})
+    assert load_profile(child).replacements == {'α': 'alpha'}
@@ -0,0 +1,25 @@
+"""Schema checks of training records."""
+
+from unicode_cleaner.validate import DEFAULT_SCHEMA, check_record
+
+
+def test_valid_record_has_no_errors():
+    assert check_record({'instruction': 'q', 'context': '', 'response': 'a'}) == []
+
+
+def test_extra_field_is_reported_when_a_required_one_is_missing():
+    assert check_record({'instruction': 'x', 'foo': 'y'}) == [
+        ('missing_field', 'response'), ('unexpected_field', 'foo'),
+    ]
+
+
+def test_extra_fields_can_be_allowed():
+    schema = DEFAULT_SCHEMA._replace(allow_extra=True)
+    assert check_record({'instruction': 'x', 'response': 'y', 'foo': 'z'}, schema) == []
+
+
+def test_wrong_types_and_empty_fields():
+    assert check_record({'instruction': 1, 'response': '  ', 'context': None}) == [
+        ('wrong_type', 'instruction'), ('empty_field', 'response'), ('wrong_type', 'context'),
+    ]
+    assert check_record(['not', 'a', 'record']) == [('not_object', None)]
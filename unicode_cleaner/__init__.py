@@ -0,0 +1,23 @@
+"""
+Unicode Cleaner
+
+Library behind clean_jsonl.py, clean_markdown.py and markdown_to_jsonl.py: normalizes Unicode text
+to ASCII and cleans JSONL and Markdown files, for use from other Python code
+without going through the command line scripts.
+
+Example:
+    from unicode_cleaner import clean_jsonl_file, normalize_unicode
+
+    normalize_unicode('“Café”')  # '"Cafe"'
+    clean_jsonl_file('data.jsonl', 'cleaned.jsonl')
+"""
+
+from .jsonl import clean_jsonl_file, get_json_backend, validate_jsonl_file
+from .markdown import clean_markdown_file
+from .markdown_qa import convert_markdown_file
+from .validate import ValidationReport
+from .normalize import (
+    describe_substitution, normalize_cache_info, normalize_many, normalize_unicode, process_json_value,
+    transliteration_profile, use_profile,
+)
+from .transliteration import available_profiles, load_profile
@@ -0,0 +1,173 @@
+"""
+Asyncio Streaming API for the JSONL Cleaner
+
+Cleans records or JSONL lines as an async producer emits them, so cleaning
+overlaps with generation instead of running as a separate step afterwards.
+Items are grouped into batches that are normalized in an executor, keeping
+the event loop free, and only a bounded number of batches is in flight: when
+the consumer falls behind, the producer is no longer pulled from.  Executor
+threads and processes do not see the caller's transliteration_profile block,
+so the profile active when cleaning starts is handed to every batch.
+
+Example:
+    async for record in clean_records(generate_records()):
+        await sink.write(record)
+"""
+
+import asyncio
+import functools
+from collections import deque
+
+from .jsonl import (
+    DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_BYTES, _clean_jsonl_text_chunk, compile_field_paths,
+    get_json_backend, normalize_records,
+)
+from .normalize import active_profile, transliteration_profile
+from .transliteration import resolve_profile
+
+
+# Items handed to the executor at a time
+DEFAULT_ASYNC_BATCH_SIZE = 100
+
+# Batches being cleaned at once before the producer has to wait
+DEFAULT_MAX_PENDING = 4
+
+
+async def _clean_in_batches(items, clean_batch, batch_size, max_pending, executor):
+    """
+    Clean an async iterable batch by batch in an executor, yielding results in order.
+
+    Args:
+        items (async iterable): Items to clean
+        clean_batch (callable): Picklable function called with a list of items and
+            the number of items before it; returns the list of cleaned results
+        batch_size (int): Items per batch
+        max_pending (int): Batches in flight before the producer is paused
+        executor (Executor, optional): Executor running clean_batch; None uses the
+            event loop's default thread pool
+
+    Yields:
+        Cleaned results
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    batch = []
+    items_seen = 0
+
+    def submit():
+        pending.append(loop.run_in_executor(executor, clean_batch, batch, items_seen - len(batch)))
+
+    async for item in items:
+        batch.append(item)
+        items_seen += 1
+        if len(batch) < batch_size:
+            continue
+        submit()
+        batch = []
+
+        # Hand out finished batches early and wait for the oldest once the window is full
+        while pending and (pending[0].done() or len(pending) >= max_pending):
+            for result in await pending.popleft():
+                yield result
+
+    if batch:
+        submit()
+    while pending:
+        for result in await pending.popleft():
+            yield result
+
+
+def _normalize_record_batch(records, records_before, selection, profile):
+    # Without a field selection the whole batch is normalized a column at a time
+    with transliteration_profile(profile):
+        return list(normalize_records(records, selection, batch_size=len(records)))
+
+
+def _clean_line_batch(lines, lines_before, options):
+    cleaned_text, counts, _ = _clean_jsonl_text_chunk(
+        [line.decode('utf-8') if isinstance(line, bytes) else line for line in lines],
+        lines_before + 1,
+        options,
+    )
+    # Split on '\n' only: fields left alone by a field selection may contain other line separators
+    return [([line + '\n' for line in cleaned_text.split('\n')[:-1]], counts)]
+
+
+async def clean_records(records, executor=None, fields=None, profile=None,
+                        batch_size=DEFAULT_ASYNC_BATCH_SIZE, max_pending=DEFAULT_MAX_PENDING):
+    """
+    Normalize Unicode in parsed JSON records from an async producer.
+
+    Args:
+        records (async iterable): JSON values, such as dicts from a generator
+        executor (Executor, optional): Runs the normalization; None uses the event
+            loop's default thread pool, a ProcessPoolExecutor spreads it across cores
+        fields (list, optional): Field paths to normalize, such as 'messages[*].content'.
+            If None, every string is normalized. Selected fields are normalized in
+            place, so with a thread pool the producer's records are modified.
+        profile (str or TransliterationProfile, optional): Transliteration profile, by
+            built-in name or file path; None uses the one active in the caller
+        batch_size (int, optional): Records per executor call
+        max_pending (int, optional): Batches in flight before the producer is paused
+
+    Yields:
+        Normalized JSON values in producer order
+    """
+    selection = compile_field_paths(fields) if fields is not None else None
+    profile = resolve_profile(profile) if profile is not None else active_profile()
+    clean_batch = functools.partial(_normalize_record_batch, selection=selection, profile=profile)
+    async for record in _clean_in_batches(records, clean_batch, batch_size, max_pending, executor):
+        yield record
+
+
+async def clean_lines(lines, executor=None, stats=None, fields=None, json_backend='auto',
+                      ascii_passthrough=False, profile=None, batch_size=DEFAULT_ASYNC_BATCH_SIZE,
+                      max_pending=DEFAULT_MAX_PENDING):
+    """
+    Clean JSONL lines from an async producer like clean_jsonl_file cleans a file.
+
+    Empty, whitespace-only and invalid lines are dropped, with a warning on
+    stderr for invalid ones numbered from the start of the stream.
+
+    Args:
+        lines (async iterable): Lines of JSONL text as str or UTF-8 bytes
+        executor (Executor, optional): Runs the cleaning; None uses the event
+            loop's default thread pool, a ProcessPoolExecutor spreads it across cores
+        stats (dict, optional): Updated in place with 'lines_processed',
+            'lines_removed' and 'lines_written'
+        fields (list, optional): Field paths to normalize; None normalizes every string
+        json_backend (str, optional): 'stdlib', 'orjson', or 'auto' for the fastest installed one
+        ascii_passthrough (bool, optional): Copy valid, already-clean lines verbatim
+        profile (str or TransliterationProfile, optional): Transliteration profile, by
+            built-in name or file path; None uses the one active in the caller
+        batch_size (int, optional): Lines per executor call
+        max_pending (int, optional): Batches in flight before the producer is paused
+
+    Yields:
+        str: Cleaned JSONL lines, each ending with a newline
+    """
+    # Fail on an unavailable backend or a bad field path before consuming anything
+    get_json_backend(json_backend)
+    if fields is not None:
+        compile_field_paths(fields)
+
+    options = {
+        'batch_size': DEFAULT_BATCH_SIZE,
+        'max_batch_bytes': DEFAULT_MAX_BATCH_BYTES,
+        'json_backend': json_backend,
+        'fields': fields,
+        'ascii_passthrough': ascii_passthrough,
+        'profile': resolve_profile(profile) if profile is not None else active_profile(),
+    }
+    if stats is None:
+        stats = {}
+    for key in ('lines_processed', 'lines_removed', 'lines_written'):
+        stats.setdefault(key, 0)
+
+    clean_batch = functools.partial(_clean_line_batch, options=options)
+    async for cleaned_lines, counts in _clean_in_batches(lines, clean_batch, batch_size, max_pending, executor):
+        stats['lines_processed'] += counts[0]
+        stats['lines_removed'] += counts[1]
+        stats['lines_written'] += counts[2]
+        for line in cleaned_lines:
+            yield line
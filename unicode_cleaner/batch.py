@@ -0,0 +1,172 @@
+"""
+Batch Cleaning of Many Files
+
+Expands files, directories and glob patterns given on the command line and
+cleans the resulting files concurrently across a process pool, so a whole
+dataset directory is cleaned by one invocation instead of one interpreter
+start per file.
+"""
+
+import contextlib
+import glob
+import io
+from pathlib import Path
+
+from .compressed_io import strip_compression_suffix
+
+
+def is_batch_invocation(paths, output_dir=None, suffix=''):
+    """
+    Decide whether command line paths select batch mode.
+
+    One or two plain file paths keep the classic 'input [output]' form;
+    anything else (more paths, a directory, a glob, or an output naming
+    option) treats every path as an input.
+    """
+    if output_dir is not None or suffix or len(paths) > 2:
+        return True
+    return any(glob.has_magic(path) or Path(path).is_dir() for path in paths)
+
+
+def expand_input_paths(patterns, extensions, exclude_suffix=''):
+    """
+    Expand files, directories and glob patterns into a list of input files.
+
+    Directories contribute the files directly inside them whose extension is
+    in extensions, compressed or not (data.jsonl or data.jsonl.gz).  Files
+    named explicitly are kept whatever their extension.
+
+    Args:
+        patterns (list): File paths, directory paths or glob patterns
+        extensions (tuple): Lower-case extensions (with dot) picked up from directories
+        exclude_suffix (str, optional): Skip directory and glob matches whose stem ends
+            with it, i.e. the outputs of an earlier run with that batch suffix
+
+    Returns:
+        list: Unique Path objects in command line order
+
+    Raises:
+        FileNotFoundError: If a pattern matches nothing
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True))]
+            matches = [path for path in matches if path.is_file()]
+        elif Path(pattern).is_dir():
+            matches = sorted(path for path in Path(pattern).iterdir()
+                             if path.is_file() and strip_compression_suffix(path).suffix.lower() in extensions)
+        else:
+            matches = [Path(pattern)]
+            if not matches[0].exists():
+                raise FileNotFoundError(f"Input file not found: {pattern}")
+            paths.extend(matches)
+            continue
+
+        if not matches:
+            raise FileNotFoundError(f"No input files match: {pattern}")
+        if exclude_suffix:
+            matches = [path for path in matches if not strip_compression_suffix(path).stem.endswith(exclude_suffix)]
+        paths.extend(matches)
+
+    return list(dict.fromkeys(paths))
+
+
+def batch_output_path(input_path, output_dir=None, suffix=''):
+    """
+    Name the output file of one input file in batch mode.
+
+    Args:
+        input_path (Path): Input file
+        output_dir (str, optional): Directory for the outputs; defaults to the input's directory
+        suffix (str, optional): Appended to the file stem, e.g. '_clean' for pr1_clean.jsonl
+            (and pr1_clean.jsonl.gz for pr1.jsonl.gz)
+
+    Returns:
+        Path: Output path, or None to clean the file in place
+    """
+    if output_dir is None and not suffix:
+        return None
+    directory = Path(output_dir) if output_dir is not None else input_path.parent
+    name = strip_compression_suffix(input_path)
+    compression_suffix = input_path.suffix if name != input_path else ''
+    return directory / f"{name.stem}{suffix}{name.suffix}{compression_suffix}"
+
+
+def plan_batch_jobs(patterns, extensions, output_dir=None, suffix=''):
+    """
+    Expand the inputs of a batch invocation and name their outputs.
+
+    Files that already carry the suffix are skipped when they come from a
+    directory or glob, so running the same command twice does not clean the
+    previous outputs again.
+
+    Args:
+        patterns (list): File paths, directory paths or glob patterns
+        extensions (tuple): Lower-case extensions (with dot) picked up from directories
+        output_dir (str, optional): Directory for the outputs, see batch_output_path
+        suffix (str, optional): Appended to each output's stem, see batch_output_path
+
+    Returns:
+        list: (input_path, output_path) pairs; output_path None cleans in place
+
+    Raises:
+        FileNotFoundError: If a pattern matches nothing
+        ValueError: If an output would overwrite an input or another output
+    """
+    jobs = [(path, batch_output_path(path, output_dir, suffix))
+            for path in expand_input_paths(patterns, extensions, exclude_suffix=suffix)]
+
+    inputs = {path.resolve() for path, _ in jobs}
+    outputs = {}
+    for input_path, output_path in jobs:
+        if output_path is None:
+            continue
+        target = output_path.resolve()
+        # Workers read and write concurrently, so neither may alias another job's file
+        if target in inputs:
+            raise ValueError(f"Output {output_path} of {input_path} would overwrite an input file")
+        if target in outputs:
+            raise ValueError(f"{outputs[target]} and {input_path} would both be written to {output_path}")
+        outputs[target] = input_path
+    return jobs
+
+
+def _clean_one(clean_file, input_path, output_path):
+    """Clean one file in a worker process, capturing its warnings."""
+    warnings = io.StringIO()
+    with contextlib.redirect_stderr(warnings):
+        try:
+            return clean_file(input_path, output_path), None, warnings.getvalue()
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", warnings.getvalue()
+
+
+def clean_files(clean_file, jobs, workers=1):
+    """
+    Clean many files concurrently.
+
+    A failing file does not stop the others; its error is returned instead.
+
+    Args:
+        clean_file (callable): Picklable function called as clean_file(input_path, output_path)
+        jobs (list): (input_path, output_path) pairs; output_path None cleans in place
+        workers (int, optional): Number of worker processes
+
+    Yields:
+        tuple: (input_path, output_path, counts, error, warnings) in job order,
+        where counts is clean_file's return value and error a message or None
+    """
+    if workers <= 1:
+        for input_path, output_path in jobs:
+            yield (input_path, output_path, *_clean_one(clean_file, input_path, output_path))
+        return
+
+    # Imported here so serial runs do not pay for loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_clean_one, clean_file, input_path, output_path)
+                   for input_path, output_path in jobs]
+        for (input_path, output_path), future in zip(jobs, futures):
+            yield (input_path, output_path, *future.result())
@@ -0,0 +1,76 @@
+"""
+Command Line Helpers
+
+Output and batch-mode scaffolding shared by clean_jsonl.py and
+clean_markdown.py, so the scripts only differ in their options and in how
+they describe their counts.
+"""
+
+import sys
+from pathlib import Path
+
+from .batch import clean_files, plan_batch_jobs
+from .normalize import normalize_cache_info
+
+
+def print_substitutions(substitutions, top=5):
+    """Print how many characters were substituted and the most frequent ones."""
+    common = ', '.join(f"{char!r} x{count}" for char, count in substitutions.most_common(top))
+    print(f"Substituted {sum(substitutions.values())} characters" + (f" (most often {common})" if common else ""))
+
+
+def print_cache_info():
+    """Print the transliteration cache counters."""
+    info = normalize_cache_info()
+    print(f"Transliteration cache: {info['run_hits']} hits, {info['run_misses']} misses "
+          f"({info['run_cache_size']} runs cached, {info['codepoint_table_size']} code points compiled)")
+
+
+def run_batch(args, clean_file, suffixes, describe_counts, empty_counts, kind, workers=None, summarize=None):
+    """
+    Clean every input file of a batch invocation and print one summary.
+
+    Exits with status 1 if any file failed.
+
+    Args:
+        args (Namespace): Parsed arguments with paths, output_dir, suffix, dry_run and workers
+        clean_file (callable): Picklable function called as clean_file(input_path, output_path)
+        suffixes (tuple): Extensions of the files to pick out of directories
+        describe_counts (callable): Formats one file's counts, or the totals, for the summary
+        empty_counts (tuple): Totals before any file is cleaned
+        kind (str): What is cleaned, for the closing message, e.g. 'JSONL files'
+        workers (int, optional): Files cleaned at a time; None uses args.workers
+        summarize (callable, optional): Prints further summary lines after the totals
+    """
+    jobs = plan_batch_jobs(args.paths, suffixes, args.output_dir, args.suffix)
+
+    if args.dry_run:
+        for input_path, output_path in jobs:
+            print(f"DRY RUN: Would process {input_path} {'in-place' if output_path is None else f'to {output_path}'}")
+        return
+
+    if args.output_dir is not None:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+
+    totals = list(empty_counts)
+    failures = 0
+    for input_path, output_path, counts, error, warnings in clean_files(
+            clean_file, jobs, args.workers if workers is None else workers):
+        if warnings:
+            print(f"Warnings for {input_path}:", file=sys.stderr)
+            sys.stderr.write(warnings)
+        target = f" -> {output_path}" if output_path is not None else ""
+        if error is not None:
+            failures += 1
+            print(f"{input_path}{target}: FAILED: {error}")
+            continue
+        print(f"{input_path}{target}: {describe_counts(counts)}")
+        totals = [total + count for total, count in zip(totals, counts)]
+
+    print(f"Total ({len(jobs)} files): {describe_counts(totals)}")
+    if summarize is not None:
+        summarize()
+    if failures:
+        print(f"Error: {failures} of {len(jobs)} files failed", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ {kind} cleaned successfully!")
@@ -0,0 +1,241 @@
+"""
+Compressed File I/O
+
+Opens gzip and zstd files as text streams, so the cleaners read and write
+compressed exports directly instead of going through decompressed copies on
+disk.  Inputs are recognized by their magic bytes, outputs by their
+extension.  Output is compressed on a background thread fed through a
+bounded queue, overlapping compression with normalization; zlib and
+zstandard release the GIL while they compress.
+
+The path '-' stands for stdin or stdout, read and written through large
+binary buffers so the cleaners can sit in the middle of a pipeline.
+
+gzip support is built in; zstd needs the optional zstandard package.
+"""
+
+import gzip
+import io
+import queue
+import sys
+import threading
+import zlib
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional, for .zst files
+    zstandard = None
+
+
+# Compression formats by file extension
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+
+# Compression formats by the first bytes of a file
+_MAGIC_BYTES = {b'\x1f\x8b': 'gzip', b'\x28\xb5\x2f\xfd': 'zstd'}
+
+# Uncompressed bytes handed to the compression thread at a time
+COMPRESS_CHUNK_SIZE = 1 << 20
+
+# Chunks waiting for the compression thread before writers block
+_MAX_QUEUED_CHUNKS = 4
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Path standing for stdin or stdout
+STDIO_PATH = '-'
+
+# Buffer size of stdin and stdout streams
+STDIO_BUFFER_SIZE = 1 << 20
+
+
+def is_stdio(path):
+    """Whether a path stands for stdin or stdout."""
+    return str(path) == STDIO_PATH
+
+
+def compression_from_suffix(path):
+    """Compression format named by a path's extension, or None."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def detect_compression(path):
+    """
+    Compression format of an existing file, from its magic bytes.
+
+    Returns:
+        str: 'gzip', 'zstd', or None for an uncompressed file
+    """
+    with open(path, 'rb') as infile:
+        head = infile.read(4)
+    for magic, compression in _MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def strip_compression_suffix(path):
+    """Path without its compression extension, e.g. data.jsonl for data.jsonl.gz."""
+    path = Path(path)
+    return path.with_suffix('') if compression_from_suffix(path) else path
+
+
+def file_compressions(input_path, output_path=None):
+    """
+    Compression formats of a cleaner's input and output.
+
+    Args:
+        input_path (str): Existing input file
+        output_path (str, optional): Output file; None cleans in place, keeping
+            the input's compression
+
+    Returns:
+        tuple: (input_compression, output_compression)
+    """
+    # Compressed stdin is recognized when it is opened; stdout is never compressed
+    input_compression = None if is_stdio(input_path) else detect_compression(input_path)
+    if output_path is None:
+        return input_compression, input_compression
+    return input_compression, None if is_stdio(output_path) else compression_from_suffix(output_path)
+
+
+def _require(compression):
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd files need the zstandard package (pip install zstandard)")
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Unknown compression: {compression}")
+
+
+def open_input(path, compression=None, newline=None):
+    """
+    Open a possibly compressed UTF-8 file for reading as text.
+
+    Args:
+        path (str): File path, or '-' for stdin, whose compression is detected here
+        compression (str, optional): 'gzip', 'zstd' or None, as from detect_compression
+        newline (str, optional): Newline mode, as for open()
+
+    Returns:
+        file: Text file object decompressing on the fly
+    """
+    if is_stdio(path):
+        # A buffered reader of its own, so closing it leaves sys.stdin alone
+        binary = open(sys.stdin.fileno(), 'rb', buffering=STDIO_BUFFER_SIZE, closefd=False)
+        head = binary.peek(4)[:4]
+        compression = next((name for magic, name in _MAGIC_BYTES.items() if head.startswith(magic)), None)
+        _require(compression)
+        if compression == 'gzip':
+            binary = gzip.GzipFile(fileobj=binary, mode='rb')
+        elif compression == 'zstd':
+            binary = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(binary, read_across_frames=True),
+                                       STDIO_BUFFER_SIZE)
+        return io.TextIOWrapper(binary, encoding='utf-8', newline=newline)
+
+    _require(compression)
+    if compression is None:
+        return open(path, 'r', encoding='utf-8', newline=newline)
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8', newline=newline)
+    reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+    return io.TextIOWrapper(io.BufferedReader(reader, COMPRESS_CHUNK_SIZE), encoding='utf-8', newline=newline)
+
+
+class _CompressingWriter(io.RawIOBase):
+    """Binary sink that compresses and writes what it receives on a background thread."""
+
+    def __init__(self, path, compression):
+        if compression == 'gzip':
+            # wbits 31 writes the gzip header and trailer
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        self._file = open(path, 'wb')
+        self._queue = queue.Queue(maxsize=_MAX_QUEUED_CHUNKS)
+        self._error = None
+        self._thread = threading.Thread(target=self._compress, name=f'{compression}-writer', daemon=True)
+        self._thread.start()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self._error is not None:
+            raise self._error
+        # The buffer above reuses its memory, so hand over a copy
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def _compress(self):
+        chunk = b''
+        try:
+            while (chunk := self._queue.get()) is not None:
+                self._file.write(self._compressor.compress(chunk))
+            self._file.write(self._compressor.flush())
+        except BaseException as e:
+            self._error = e
+            # Keep taking chunks so writers do not block forever
+            while chunk is not None:
+                chunk = self._queue.get()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._queue.put(None)
+            self._thread.join()
+        finally:
+            self._file.close()
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+
+class _FlushingWriter(io.BufferedWriter):
+    """Buffered binary writer that passes every write straight on."""
+
+    def write(self, data):
+        written = super().write(data)
+        self.flush()
+        return written
+
+
+def open_output(path, compression=None, mode='w', newline=None, buffering=-1, line_buffering=False):
+    """
+    Open a file for writing, compressing on a background thread if asked to.
+
+    Args:
+        path (str): File path, or '-' for stdout
+        compression (str, optional): 'gzip', 'zstd' or None, as from compression_from_suffix
+        mode (str, optional): 'w' for a UTF-8 text file or 'wb' for a binary one
+        newline (str, optional): Newline mode of a text file, as for open()
+        buffering (int, optional): Buffer size, as for open()
+        line_buffering (bool, optional): Flush every write that ends a line (every
+            write in binary mode), for readers downstream in a pipeline. Has no
+            effect on compressed files.
+
+    Returns:
+        file: File object; closing it waits for the compression to finish
+    """
+    _require(compression)
+    if is_stdio(path):
+        # The process's own stdout, even while messages are redirected away from it;
+        # anything printed to it before must come out first
+        sys.__stdout__.flush()
+        raw = open(sys.__stdout__.fileno(), 'wb', buffering=0, closefd=False)
+        if mode == 'wb':
+            return (_FlushingWriter if line_buffering else io.BufferedWriter)(raw, STDIO_BUFFER_SIZE)
+        return io.TextIOWrapper(io.BufferedWriter(raw, STDIO_BUFFER_SIZE), encoding='utf-8', newline=newline,
+                                line_buffering=line_buffering)
+    if compression is None:
+        if mode == 'wb':
+            if line_buffering:
+                return _FlushingWriter(open(path, 'wb', buffering=0))
+            return open(path, 'wb', buffering=buffering)
+        return open(path, 'w', encoding='utf-8', newline=newline, buffering=1 if line_buffering else buffering)
+
+    buffered = io.BufferedWriter(_CompressingWriter(path, compression),
+                                 buffering if buffering > 0 else COMPRESS_CHUNK_SIZE)
+    if mode == 'wb':
+        return buffered
+    return io.TextIOWrapper(buffered, encoding='utf-8', newline=newline)
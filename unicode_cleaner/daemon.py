@@ -0,0 +1,347 @@
+"""
+Resident Cleaning Daemon
+
+Serves normalize and clean-file requests over HTTP on localhost, so frequent
+small cleaning jobs skip interpreter startup, imports and warming up the
+transliteration caches.  Files are cleaned by a pool of worker processes that
+stay alive between requests; short normalize requests are answered directly.
+
+Start it with:
+    python -m unicode_cleaner.daemon --workers 4
+
+and pass --daemon to clean_jsonl.py or clean_markdown.py to use it.
+
+Endpoints (JSON request and response bodies):
+    GET  /status     -> {"pid": ..., "workers": ..., "requests": ...}
+    POST /normalize  {"texts": [...]} -> {"texts": [...]}
+    POST /clean      {"kind": "jsonl" | "markdown", "input": path, "output": path or null,
+                      "options": {...}} -> {"counts": [...], "error": ..., "warnings": ...}
+
+The daemon reads and writes files with its own permissions on behalf of its
+clients, so it only ever listens on a loopback address and only answers
+requests that carry the secret token it writes at startup to a file only its
+user can read (see token_path).  Requests with an Origin header, a Host that
+is not a loopback address, or a body that is not declared as JSON are
+refused as well, so a web page cannot make a browser send it one.
+"""
+
+import argparse
+import functools
+import hmac
+import http.client
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .batch import _clean_one
+from .jsonl import clean_jsonl_file
+from .markdown import clean_markdown_file
+from .normalize import normalize_unicode
+from .transliteration import absolute_profile_name, table_cache_dir
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# How long a client waits for a daemon to accept its connection
+CONNECT_TIMEOUT = 0.5
+
+# Request header carrying the daemon's secret token
+TOKEN_HEADER = 'X-Cleaner-Token'
+
+# Cleaner functions by request kind, with the options a request may pass to them
+CLEANERS = {
+    'jsonl': (clean_jsonl_file, {'batch_size', 'max_batch_bytes', 'json_backend', 'fields',
+                                 'ascii_passthrough', 'incremental', 'chunk_lines', 'profile'}),
+    'markdown': (clean_markdown_file, {'incremental', 'chunk_lines', 'use_mmap', 'preserve_code', 'profile'}),
+}
+
+
+def parse_address(address):
+    """Split 'host:port' (or just 'port') into a (host, port) tuple."""
+    host, _, port = str(address).rpartition(':')
+    return host or DEFAULT_HOST, int(port)
+
+
+def token_path(port):
+    """File holding the secret token of the daemon listening on port, in the cache directory."""
+    return table_cache_dir() / f"daemon-{port}.token"
+
+
+def _write_token(path):
+    """Create a new secret token in a file only the current user can read, and return it."""
+    token = secrets.token_hex(32)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # Created with its final permissions and renamed into place, so the token is never readable by others
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as token_file:
+        token_file.write(token)
+    os.replace(temp_path, path)
+    return token
+
+
+def read_token(port):
+    """Return the secret token of the daemon on port, or None if there is none."""
+    try:
+        return token_path(port).read_text(encoding='ascii').strip()
+    except OSError:
+        return None
+
+
+def _is_loopback_host(host):
+    """Whether a Host header names a loopback address, with or without a port."""
+    host = host.strip()
+    if host.startswith('['):
+        host = host[1:].partition(']')[0]
+    elif host.count(':') == 1:
+        host = host.partition(':')[0]
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _warm_up():
+    """Build a worker's caches with a typical string before the first request."""
+    return normalize_unicode('“Café” – naïve ½ résumé…')
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    """Request handler; each request runs in its own thread of the server."""
+
+    server_version = 'UnicodeCleanerDaemon/1'
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(request, dict):
+            raise ValueError("the body must be a JSON object")
+        return request
+
+    def _refuse(self):
+        """Answer a request that does not come from a local client of this daemon, and return True."""
+        if self.headers.get('Origin') is not None:
+            status, error = 403, "Requests from web pages are not accepted"
+        elif not _is_loopback_host(self.headers.get('Host', '')):
+            status, error = 403, "Host is not a loopback address"
+        elif not hmac.compare_digest(self.headers.get(TOKEN_HEADER, '').encode('utf-8'),
+                                     self.server.token.encode('ascii')):
+            status, error = 403, f"Missing or wrong {TOKEN_HEADER} header"
+        elif self.command == 'POST' and \
+                self.headers.get('Content-Type', '').partition(';')[0].strip().lower() != 'application/json':
+            status, error = 415, "Request bodies must be sent as application/json"
+        else:
+            return False
+        self._send_json(status, {'error': error})
+        return True
+
+    def do_GET(self):
+        if self._refuse():
+            return
+        if self.path != '/status':
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        self._send_json(200, {
+            'pid': os.getpid(),
+            'workers': self.server.workers,
+            'requests': self.server.requests,
+        })
+
+    def do_POST(self):
+        if self._refuse():
+            return
+        handlers = {'/normalize': self._normalize, '/clean': self._clean}
+        if self.path not in handlers:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        with self.server.lock:
+            self.server.requests += 1
+        try:
+            request = self._read_json()
+            status, payload = handlers[self.path](request)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            status, payload = 400, {'error': f"Bad request: {e}"}
+        except Exception as e:
+            # Such as a broken worker pool; the client still gets an answer
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        self._send_json(status, payload)
+
+    def _normalize(self, request):
+        texts = request['texts']
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ValueError("'texts' must be a list of strings")
+        return 200, {'texts': [normalize_unicode(text) for text in texts]}
+
+    def _clean(self, request):
+        clean_file, allowed_options = CLEANERS[request['kind']]
+        options = request.get('options', {})
+        unknown = set(options) - allowed_options
+        if unknown:
+            raise ValueError(f"Unsupported options: {', '.join(sorted(unknown))}")
+
+        future = self.server.executor.submit(
+            _clean_one, functools.partial(clean_file, **options), request['input'], request.get('output'),
+        )
+        counts, error, warnings = future.result()
+        return 200, {'counts': counts, 'error': error, 'warnings': warnings}
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, verbose=False):
+    """
+    Run the daemon until interrupted.
+
+    Args:
+        host (str, optional): Loopback address to listen on
+        port (int, optional): Port to listen on
+        workers (int, optional): Worker processes cleaning files; defaults to the CPU count
+        verbose (bool, optional): Log every request to stderr
+
+    Raises:
+        ValueError: If host is not a loopback address
+        OSError: If the address is in use or the token file cannot be written
+    """
+    if not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+        raise ValueError(f"The daemon only listens on loopback addresses, not {host}")
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+         ThreadingHTTPServer((host, port), _DaemonHandler) as server:
+        # Start every worker now so the first requests do not pay for it
+        for future in [executor.submit(_warm_up) for _ in range(workers)]:
+            future.result()
+
+        server.executor = executor
+        server.workers = workers
+        server.verbose = verbose
+        server.requests = 0
+        server.lock = threading.Lock()
+        tokens = token_path(server.server_port)
+        server.token = _write_token(tokens)
+        print(f"Cleaning daemon listening on http://{host}:{server.server_port} "
+              f"with {workers} workers (pid {os.getpid()}), token in {tokens}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            tokens.unlink(missing_ok=True)
+
+
+def request_clean(address, kind, input_path, output_path=None, options=None):
+    """
+    Ask a running daemon to clean a file.
+
+    Args:
+        address (str): Daemon address as 'host:port'
+        kind (str): 'jsonl' or 'markdown'
+        input_path (str): Path to input file
+        output_path (str, optional): Path to output file. If None, processes in-place.
+        options (dict, optional): Keyword arguments for the cleaner function
+
+    Returns:
+        tuple: (counts, error, warnings) like batch.clean_files reports them,
+        or None if no daemon of the current user is listening at address
+    """
+    host, port = parse_address(address)
+    token = read_token(port)
+    if token is None:
+        return None
+    options = dict(options or {})
+    if isinstance(options.get('profile'), str):
+        # A profile file name relative to this process means nothing to the daemon
+        options['profile'] = absolute_profile_name(options['profile'])
+    request = {
+        'kind': kind,
+        # The daemon has its own working directory
+        'input': str(Path(input_path).resolve()),
+        'output': str(Path(output_path).resolve()) if output_path is not None else None,
+        'options': options,
+    }
+    body = json.dumps(request).encode('utf-8')
+
+    connection = http.client.HTTPConnection(host, port, timeout=CONNECT_TIMEOUT)
+    try:
+        try:
+            connection.connect()
+        except OSError:
+            return None
+        # Cleaning a large file takes as long as it takes
+        connection.sock.settimeout(None)
+        connection.request('POST', '/clean', body, {'Content-Type': 'application/json', TOKEN_HEADER: token})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        raise RuntimeError(f"Daemon rejected the request: {payload.get('error')}")
+    counts = tuple(payload['counts']) if payload['counts'] is not None else None
+    return counts, payload['error'], payload['warnings']
+
+
+def clean_file_with_daemon(address, kind, input_path, output_path=None, options=None):
+    """
+    Clean a file through a running daemon, relaying its warnings to stderr.
+
+    Returns:
+        tuple: The cleaner's counts, or None if no daemon is listening at address
+
+    Raises:
+        FileNotFoundError: If the input file does not exist
+        RuntimeError: If the daemon failed to clean the file
+    """
+    if not Path(input_path).exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    response = request_clean(address, kind, input_path, output_path, options)
+    if response is None:
+        return None
+    counts, error, warnings = response
+    sys.stderr.write(warnings)
+    if error is not None:
+        raise RuntimeError(error)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep the Unicode cleaners resident and serve requests on localhost",
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Loopback address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='Worker processes cleaning files (default: CPU count)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    try:
+        serve(args.host, args.port, args.workers, args.verbose)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
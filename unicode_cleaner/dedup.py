@@ -0,0 +1,205 @@
+"""
+Exact and Near-Duplicate Detection
+
+Drops records that repeat an earlier record, within a file or across all the
+files a Deduplicator sees.  Exact duplicates are found through a table of
+64-bit hashes of each record's canonical JSON.  Near duplicates are found
+through MinHash signatures of the word 3-grams of the instruction and
+response text: each 3-gram is hashed once with BLAKE2b, whose digest supplies
+one 16-bit hash value per signature position, and the signature keeps the
+minimum at every position.  Signatures are indexed by locality-sensitive
+hashing: a signature is split into bands, and records sharing any band are
+compared on their full signatures.  Records without any word in those fields
+have nothing to compare and are only checked for exact duplicates.
+
+Memory grows with the number of records kept, never with their size: about
+170 bytes per record for exact duplicates and 700 with near duplicates, so
+a million records fit in well under a gigabyte.
+"""
+
+import array
+import hashlib
+import json
+import re
+import struct
+from collections import Counter
+
+
+# Fields whose text is compared to find near duplicates
+DEFAULT_NEAR_FIELDS = ('instruction', 'response')
+
+# Estimated Jaccard similarity of word 3-grams at which records count as near duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# MinHash signature length; longer signatures estimate similarity more precisely
+DEFAULT_NUM_PERM = 32
+
+# A BLAKE2b digest has 64 bytes, room for this many 16-bit hash values
+MAX_NUM_PERM = 32
+
+# Words per shingle
+_SHINGLE_SIZE = 3
+
+_WORD = re.compile(r'\w+')
+
+
+def _exact_key(record):
+    """64-bit hash of a record's canonical JSON."""
+    text = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def choose_bands(num_perm, threshold):
+    """
+    Split a signature into the (bands, rows) whose LSH threshold is closest to threshold.
+    
+    Records with similarity s share at least one band with probability
+    1 - (1 - s**rows)**bands, which rises steepest around (1 / bands)**(1 / rows).
+    """
+    splits = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(splits, key=lambda split: abs((1 / split[0]) ** (1 / split[1]) - threshold))
+
+
+class Deduplicator:
+    """
+    Remembers the records seen so far and recognizes repeats of them.
+    
+    The first occurrence of a record is kept; later exact or near copies are
+    reported as duplicates of it.  Call begin_file() before each file so the
+    report can say where records came from.
+    """
+    
+    def __init__(self, near_duplicates=True, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 fields=DEFAULT_NEAR_FIELDS, report=None):
+        """
+        Args:
+            near_duplicates (bool, optional): Also drop near duplicates, not only exact ones
+            threshold (float, optional): Estimated similarity at which records are near duplicates
+            num_perm (int, optional): MinHash signature length, at most MAX_NUM_PERM
+            fields (tuple, optional): Record fields whose text is compared for near duplicates
+            report (file, optional): Text file receiving one JSON line per dropped record
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Similarity threshold must be in (0, 1], not {threshold}")
+        if not 0 < num_perm <= MAX_NUM_PERM:
+            raise ValueError(f"Signature length must be between 1 and {MAX_NUM_PERM}, not {num_perm}")
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.fields = tuple(fields)
+        self.report = report
+        self.dropped = Counter()
+        self.files = []
+        
+        self._num_perm = num_perm
+        self._hash_values = struct.Struct(f'<{num_perm}H')
+        self._bands, self._rows = choose_bands(num_perm, threshold)
+        
+        # Kept record number by exact hash
+        self._exact = {}
+        # Signature slot by band hash, or a list of slots for a band several records share
+        self._band_index = {}
+        # Signatures of the kept records with text to compare, 16 bits per value,
+        # and the kept record number of each
+        self._signatures = array.array('H')
+        self._signature_owners = array.array('L')
+        # File index and line number of each kept record
+        self._source_files = array.array('L')
+        self._source_lines = array.array('L')
+    
+    def begin_file(self, name):
+        """Attribute the following records to the named file."""
+        self.files.append(str(name))
+    
+    def _signature(self, text):
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+        if len(words) > _SHINGLE_SIZE:
+            shingles = {' '.join(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1)}
+        else:
+            shingles = {' '.join(words)}
+        digest_size = 2 * self._num_perm
+        unpack = self._hash_values.unpack
+        rows = [unpack(hashlib.blake2b(shingle.encode('utf-8'), digest_size=digest_size).digest())
+                for shingle in shingles]
+        return list(map(min, zip(*rows)))
+    
+    def _near_text(self, record):
+        if not isinstance(record, dict):
+            return None
+        parts = [record[field] for field in self.fields if isinstance(record.get(field), str)]
+        text = '\n'.join(parts)
+        return text if text.strip() else None
+    
+    def _similarity(self, signature, slot):
+        width = len(signature)
+        stored = self._signatures[slot * width:(slot + 1) * width]
+        return sum(1 for mine, theirs in zip(signature, stored) if mine == theirs) / width
+    
+    def _drop(self, reason, line_num, kept, similarity):
+        self.dropped[reason] += 1
+        if self.report is not None:
+            entry = {
+                'file': self.files[-1] if self.files else None,
+                'line': line_num,
+                'reason': reason,
+                'duplicate_of': {
+                    'file': self.files[self._source_files[kept]] if self.files else None,
+                    'line': self._source_lines[kept] or None,
+                },
+            }
+            if reason == 'near':
+                entry['similarity'] = round(similarity, 3)
+            self.report.write(json.dumps(entry) + '\n')
+    
+    def is_duplicate(self, record, line_num=None):
+        """
+        Check a record against the records seen so far, remembering it if it is new.
+        
+        Args:
+            record: Normalized JSON value
+            line_num (int, optional): Line of the record in the current file, for the report
+        
+        Returns:
+            bool: Whether the record repeats an earlier one and should be dropped
+        """
+        key = _exact_key(record)
+        kept = self._exact.get(key)
+        if kept is not None:
+            self._drop('exact', line_num, kept, 1.0)
+            return True
+        
+        kept = len(self._source_lines)
+        text = self._near_text(record) if self.near_duplicates else None
+        signature = self._signature(text) if text is not None else None
+        if signature is not None:
+            rows = self._rows
+            band_keys = [hash((band, *signature[band * rows:(band + 1) * rows])) for band in range(self._bands)]
+            candidates = set()
+            for band_key in band_keys:
+                slots = self._band_index.get(band_key)
+                if isinstance(slots, list):
+                    candidates.update(slots)
+                elif slots is not None:
+                    candidates.add(slots)
+            # The earliest similar record is the one reported
+            for slot in sorted(candidates):
+                similarity = self._similarity(signature, slot)
+                if similarity >= self.threshold:
+                    self._drop('near', line_num, self._signature_owners[slot], similarity)
+                    return True
+            slot = len(self._signature_owners)
+            self._signatures.extend(signature)
+            self._signature_owners.append(kept)
+            for band_key in band_keys:
+                # Most bands belong to a single record, which is stored without a list
+                slots = self._band_index.setdefault(band_key, slot)
+                if isinstance(slots, list):
+                    slots.append(slot)
+                elif slots != slot:
+                    self._band_index[band_key] = [slots, slot]
+        
+        self._exact[key] = kept
+        self._source_files.append(max(len(self.files) - 1, 0))
+        self._source_lines.append(line_num or 0)
+        return False
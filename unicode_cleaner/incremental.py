@@ -0,0 +1,202 @@
+"""
+Incremental Re-Cleaning Support
+
+Cleans a file in chunks of lines and records a content hash of every input
+chunk in a sidecar manifest next to the output.  When the same input is
+cleaned again, chunks whose hash is already in the manifest are copied from
+the previous output instead of being cleaned again, so a run over a file that
+only grew (or changed in a few places) only cleans the new or changed chunks.
+
+Chunk boundaries are content-defined: a chunk ends after a line whose hash
+hits a fixed pattern, so they depend on the lines around them and not on
+their position.  Inserting or deleting lines only changes the chunk they are
+in (and merges or splits it with its neighbour when a boundary line itself
+changes); every other chunk keeps its hash and is reused.  Small edits still
+re-clean a whole chunk, on average DEFAULT_CHUNK_LINES lines.
+
+The manifest also stores a fingerprint of the cleaner (its transliteration
+tables and output-affecting options) and is ignored when that changes.
+"""
+
+import hashlib
+import json
+import zlib
+from pathlib import Path
+
+
+# Bump when the manifest layout or the chunking changes
+MANIFEST_FORMAT = 3
+
+# Average lines of input per hashed chunk
+DEFAULT_CHUNK_LINES = 256
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def cleaner_fingerprint(*parts):
+    """
+    Hash everything that determines a cleaner's output into a version string.
+
+    Args:
+        *parts: JSON-serializable values, such as mapping tables and options
+
+    Returns:
+        str: Hex digest that changes whenever any of the parts change
+    """
+    payload = json.dumps([MANIFEST_FORMAT, *parts], sort_keys=True, ensure_ascii=True)
+    return _digest(payload.encode('utf-8'))
+
+
+def manifest_path_for(output_path):
+    """Return the sidecar manifest path of an output file."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.manifest.json')
+
+
+def _load_previous_chunks(manifest_path, output_path, fingerprint):
+    """Map input chunk hashes to their manifest entries, or return {} if the manifest is unusable."""
+    if not manifest_path.exists() or not output_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('fingerprint') != fingerprint:
+        return {}
+
+    previous = {}
+    for chunk in manifest.get('chunks', []):
+        previous.setdefault(chunk['input_hash'], chunk)
+    return previous
+
+
+def iter_content_defined_chunks(lines, average_lines=DEFAULT_CHUNK_LINES):
+    """
+    Group lines into chunks whose boundaries depend only on the lines' content.
+
+    A chunk ends after a line whose CRC-32 is divisible by average_lines.
+    Chunks are kept between average_lines // 16 and average_lines * 8 lines,
+    so runs of repeated lines neither split every line nor never split.
+
+    Args:
+        lines (iterable): Lines of text, with their line endings
+        average_lines (int, optional): Lines per chunk on average
+
+    Yields:
+        list: The lines of each chunk, in order
+    """
+    min_lines = max(1, average_lines // 16)
+    max_lines = average_lines * 8
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= max_lines or \
+                (len(chunk) >= min_lines and zlib.crc32(line.encode('utf-8')) % average_lines == 0):
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_previous_output(previous_output, chunk):
+    """Read a chunk's cleaned bytes from the previous output, or None if they no longer match."""
+    previous_output.seek(chunk['output_offset'])
+    data = previous_output.read(chunk['output_length'])
+    if len(data) != chunk['output_length'] or _digest(data) != chunk['output_hash']:
+        return None
+    return data
+
+
+def clean_incrementally(input_path, output_path, fingerprint, clean_chunk, empty_counts,
+                        chunk_lines=DEFAULT_CHUNK_LINES, substitutions=None):
+    """
+    Clean a file chunk by chunk, reusing the output of chunks cleaned by an earlier run.
+
+    The output is written to a temporary file that replaces output_path once
+    everything succeeded, after which the manifest is rewritten.
+
+    Args:
+        input_path (str): Path to input file
+        output_path (str): Path to output file; also the source of reusable chunks
+        fingerprint (str): Cleaner fingerprint from cleaner_fingerprint
+        clean_chunk (callable): Called with (lines, first_line_num) for every chunk
+            that has to be cleaned; returns (cleaned_text, counts, chunk_substitutions)
+            where counts is a tuple of ints that is summed over all chunks and
+            chunk_substitutions maps source characters to substitution counts
+        empty_counts (tuple): Counts of an empty input, e.g. (0, 0, 0)
+        chunk_lines (int, optional): Average lines of input per chunk, see
+            iter_content_defined_chunks
+        substitutions (Counter, optional): Receives the substitution counts of
+            every chunk, cleaned or reused
+
+    Returns:
+        tuple: (counts, chunks_reused, chunks_cleaned)
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    manifest_path = manifest_path_for(output_path)
+    temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+
+    previous = _load_previous_chunks(manifest_path, output_path, fingerprint)
+    if chunk_lines < 1:
+        raise ValueError("Chunks need at least one line")
+    chunks = []
+    totals = tuple(empty_counts)
+    chunks_reused = 0
+    chunks_cleaned = 0
+
+    try:
+        with open(input_path, 'r', encoding='utf-8') as infile, \
+             open(temp_path, 'wb') as outfile:
+            previous_output = open(output_path, 'rb') if previous else None
+            try:
+                first_line_num = 1
+                output_offset = 0
+                for lines in iter_content_defined_chunks(infile, chunk_lines):
+                    input_hash = _digest(''.join(lines).encode('utf-8'))
+                    chunk = previous.get(input_hash)
+                    data = _read_previous_output(previous_output, chunk) if chunk else None
+                    if data is not None:
+                        counts = tuple(chunk['counts'])
+                        chunk_substitutions = chunk['substitutions']
+                        chunks_reused += 1
+                    else:
+                        cleaned_text, counts, chunk_substitutions = clean_chunk(lines, first_line_num)
+                        data = cleaned_text.encode('utf-8')
+                        chunks_cleaned += 1
+
+                    outfile.write(data)
+                    chunks.append({
+                        'input_hash': input_hash,
+                        'output_offset': output_offset,
+                        'output_length': len(data),
+                        'output_hash': _digest(data),
+                        'counts': list(counts),
+                        'substitutions': dict(chunk_substitutions),
+                    })
+                    totals = tuple(map(sum, zip(totals, counts)))
+                    if substitutions is not None:
+                        substitutions.update(chunk_substitutions)
+                    first_line_num += len(lines)
+                    output_offset += len(data)
+            finally:
+                if previous_output is not None:
+                    previous_output.close()
+
+        temp_path.replace(output_path)
+    except Exception as e:
+        # Clean up temporary file if something goes wrong
+        if temp_path.exists():
+            temp_path.unlink()
+        raise e
+
+    manifest = {'format': MANIFEST_FORMAT, 'fingerprint': fingerprint, 'chunks': chunks}
+    manifest_temp_path = manifest_path.with_suffix('.tmp')
+    with open(manifest_temp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, separators=(',', ':'))
+    manifest_temp_path.replace(manifest_path)
+
+    return totals, chunks_reused, chunks_cleaned
@@ -0,0 +1,958 @@
+"""
+JSONL Cleaning Pipeline
+
+Parses JSONL lines, drops empty, whitespace-only and invalid ones, normalizes
+the strings of every record to ASCII and writes them back as compact JSONL.
+The pipeline is a chain of generators so files of any size stream through in
+bounded memory, and large files can be split across worker processes.
+"""
+
+import functools
+import io
+import itertools
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter, deque, namedtuple
+from pathlib import Path
+
+from .compressed_io import STDIO_PATH, file_compressions, is_stdio, open_input, open_output
+from .incremental import DEFAULT_CHUNK_LINES, clean_incrementally, cleaner_fingerprint
+from .normalize import (
+    CLEANER_VERSION, active_profile, counting_substitutions, normalize_many, process_json_value,
+    transliteration_profile,
+)
+from .transliteration import resolve_profile
+from .validate import check_record
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON backend
+    orjson = None
+
+
+# Byte range bounds for the chunks handed to worker processes
+MIN_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 32 << 20
+
+# Defaults for grouping cleaned records into block writes
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_BATCH_BYTES = 4 << 20
+
+# Buffer size of the output file
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+# A JSON parser/serializer pair; dumps returns compact JSON text without ASCII escaping
+JsonBackend = namedtuple('JsonBackend', ['name', 'loads', 'dumps'])
+
+
+def _stdlib_dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _contains_float(value):
+    """Check whether a JSON value contains a float anywhere."""
+    if isinstance(value, float):
+        return True
+    elif isinstance(value, dict):
+        return any(_contains_float(v) for v in value.values())
+    elif isinstance(value, list):
+        return any(_contains_float(item) for item in value)
+    else:
+        return False
+
+
+def _orjson_loads(text):
+    try:
+        value = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # orjson rejects some input the stdlib accepts (NaN, lone surrogates) and
+        # words its errors differently, so let the stdlib have the final say
+        return json.loads(text)
+    # orjson silently turns integers beyond 64 bits into floats
+    if _contains_float(value):
+        return json.loads(text)
+    return value
+
+
+def _orjson_dumps(value):
+    # orjson formats floats differently ('1e16' instead of '1e+16') and cannot
+    # serialize integers beyond 64 bits; the stdlib keeps the output bytes stable
+    if _contains_float(value):
+        return _stdlib_dumps(value)
+    try:
+        return orjson.dumps(value).decode('utf-8')
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(value)
+
+
+JSON_BACKENDS = {
+    'stdlib': JsonBackend('stdlib', json.loads, _stdlib_dumps),
+}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = JsonBackend('orjson', _orjson_loads, _orjson_dumps)
+
+
+def get_json_backend(name='auto'):
+    """
+    Look up a JSON backend by name.
+    
+    Every backend produces byte-identical output; they only differ in speed.
+    
+    Args:
+        name (str): 'stdlib', 'orjson', or 'auto' for the fastest installed backend
+    
+    Returns:
+        JsonBackend: The backend
+    
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in JSON_BACKENDS else 'stdlib'
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"JSON backend not available: {name}")
+    return JSON_BACKENDS[name]
+
+
+def _warn_invalid_json(line_num, error, line):
+    """Report a line that could not be parsed as JSON."""
+    print(f"Warning: Skipping invalid JSON on line {line_num}: {error}", file=sys.stderr)
+    print(f"  Line content: {line.strip()[:100]}...", file=sys.stderr)
+
+
+# A valid JSONL line that normalization would leave unchanged, with its parsed value
+CleanLine = namedtuple('CleanLine', ['line', 'value'])
+
+
+def is_clean_line(line):
+    """
+    Cheaply check whether normalizing a JSONL line could change anything.
+    
+    ASCII text without '\\u' escapes decodes to ASCII strings, and the grave
+    accent is the only ASCII character normalization rewrites.  str.isascii()
+    is constant time, and the substring checks are plain memory scans.
+    """
+    return line.isascii() and '\\u' not in line and '`' not in line
+
+
+def parse_jsonl_lines(lines, stats=None, on_invalid=_warn_invalid_json, backend=None, detect_clean=False):
+    """
+    Parse JSONL lines, skipping empty, whitespace-only and invalid ones.
+    
+    Args:
+        lines (iterable): Lines of JSONL text, numbered from 1
+        stats (dict, optional): Updated in place with 'lines_processed', 'lines_removed'
+            and 'chars_read', the total length of the lines processed
+        on_invalid (callable): Called with (line_num, error, line) for each invalid JSON line
+        backend (JsonBackend, optional): JSON backend, defaults to the fastest installed one
+        detect_clean (bool): Yield lines that need no normalization as CleanLine tuples
+    
+    Yields:
+        Parsed JSON values, or CleanLine tuples for already-clean lines
+    """
+    loads = (backend or get_json_backend()).loads
+    if stats is None:
+        stats = {}
+    stats.setdefault('lines_processed', 0)
+    stats.setdefault('lines_removed', 0)
+    stats.setdefault('chars_read', 0)
+    
+    for line_num, line in enumerate(lines, 1):
+        stats['lines_processed'] += 1
+        stats['chars_read'] += len(line)
+        
+        # Skip empty lines or lines with only whitespace
+        stripped = line.strip()
+        if not stripped:
+            stats['lines_removed'] += 1
+            continue
+        
+        try:
+            json_obj = loads(stripped)
+        except json.JSONDecodeError as e:
+            on_invalid(line_num, e, line)
+            stats['lines_removed'] += 1
+            continue
+        
+        # JSON arrays parse as lists, so a CleanLine is never mistaken for a record
+        if detect_clean and is_clean_line(stripped):
+            yield CleanLine(stripped, json_obj)
+        else:
+            yield json_obj
+
+
+# One dot-separated part of a field path: an optional key followed by any number of '[*]'
+_FIELD_PATH_PART = re.compile(r'([^.\[\]]*)((?:\[\*\])*)')
+
+
+def compile_field_paths(paths):
+    """
+    Compile JSON field paths into a selection tree for normalize_fields.
+    
+    A path is a dot-separated list of keys, where '*' matches every key and a
+    '[*]' suffix every list item, e.g. 'instruction' or 'messages[*].content'.
+    Everything below a selected field is normalized.
+    
+    Args:
+        paths (iterable): Field path strings
+    
+    Returns:
+        dict: Nested selection tree, with True marking selected fields
+    
+    Raises:
+        ValueError: If a path is empty or malformed
+    """
+    tree = {}
+    for path in paths:
+        tokens = []
+        for part in path.split('.'):
+            match = _FIELD_PATH_PART.fullmatch(part)
+            if not part or not match:
+                raise ValueError(f"Invalid field path: {path!r}")
+            if match.group(1):
+                tokens.append(match.group(1))
+            tokens.extend(['[*]'] * (len(match.group(2)) // 3))
+        
+        node = tree
+        for token in tokens[:-1]:
+            child = node.setdefault(token, {})
+            if child is True:
+                # A shorter path already selects this whole subtree
+                break
+            node = child
+        else:
+            node[tokens[-1]] = True
+    return _spread_wildcards(tree)
+
+
+def _merge_selections(first, second):
+    """Union of two selection trees."""
+    if first is True or second is True:
+        return True
+    merged = dict(first)
+    for key, selection in second.items():
+        merged[key] = _merge_selections(merged[key], selection) if key in merged else selection
+    return merged
+
+
+def _spread_wildcards(node):
+    """Add the '*' selection to every key beside it, since normalize_fields uses a key's own entry instead."""
+    if node is True:
+        return True
+    wildcard = node.get('*')
+    return {
+        key: _spread_wildcards(selection if wildcard is None or key == '*' else _merge_selections(selection, wildcard))
+        for key, selection in node.items()
+    }
+
+
+def _normalize_selected(value, selection):
+    if selection is True:
+        return process_json_value(value)
+    normalize_fields(value, selection)
+    return value
+
+
+def normalize_fields(value, fields):
+    """
+    Normalize Unicode in the selected fields of a JSON value, in place.
+    
+    Containers outside the selection are neither walked nor copied.
+    
+    Args:
+        value: Parsed JSON value
+        fields (dict): Selection tree from compile_field_paths
+    
+    Returns:
+        The same value, with its selected fields normalized
+    """
+    if isinstance(value, dict):
+        if '*' in fields:
+            for key in value:
+                value[key] = _normalize_selected(value[key], fields.get(key, fields['*']))
+        else:
+            for key, selection in fields.items():
+                if key in value:
+                    value[key] = _normalize_selected(value[key], selection)
+    elif isinstance(value, list) and '[*]' in fields:
+        selection = fields['[*]']
+        for index, item in enumerate(value):
+            value[index] = _normalize_selected(item, selection)
+    return value
+
+
+def normalize_record_batch(records):
+    """
+    Normalize Unicode in a batch of JSON values, a column of strings at a time.
+    
+    Records that are flat objects of strings, like instruction/context/response
+    records, have all their values normalized by a single normalize_many call.
+    Other records are normalized one by one; CleanLine tuples pass through.
+    
+    Args:
+        records (list): Parsed JSON values or CleanLine tuples
+    
+    Returns:
+        list: Normalized JSON values
+    """
+    flat = [type(record) is dict and all(type(value) is str for value in record.values()) for record in records]
+    strings = [value for record, is_flat in zip(records, flat) if is_flat for value in record.values()]
+    normalized = iter(normalize_many(strings))
+    # zip() takes the next normalized string only while the record has keys left
+    return [
+        dict(zip(record, normalized)) if is_flat
+        else record if isinstance(record, CleanLine)
+        else process_json_value(record)
+        for record, is_flat in zip(records, flat)
+    ]
+
+
+def _text_length(value):
+    """Total length of the strings in a JSON value, keys included."""
+    if isinstance(value, CleanLine):
+        return len(value.line)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + _text_length(item) for key, item in value.items())
+    if isinstance(value, list):
+        return sum(map(_text_length, value))
+    return 0
+
+
+def _counting_chars(records, stats):
+    """Pass records through, adding their text length to stats['chars_read']."""
+    stats['chars_read'] = 0
+    for record in records:
+        stats['chars_read'] += _text_length(record)
+        yield record
+
+
+def normalize_records(records, fields=None, batch_size=1, max_batch_bytes=None, stats=None):
+    """
+    Normalize Unicode in each JSON value.
+    
+    CleanLine tuples pass through untouched.
+    
+    Args:
+        records (iterable): Parsed JSON values
+        fields (dict, optional): Selection tree from compile_field_paths.
+            If None, every string is normalized.
+        batch_size (int, optional): Without a field selection, normalize this many
+            records at a time with normalize_record_batch. Reads that many records ahead.
+        max_batch_bytes (int, optional): Also stop reading ahead once the records'
+            lines reach this many characters, so a batch of huge records stays bounded
+        stats (dict, optional): Counts of the parse_jsonl_lines the records are
+            pulled from, whose 'chars_read' measures the lines read ahead.
+            If None, max_batch_bytes is measured against the records' strings.
+    
+    Yields:
+        Normalized JSON values
+    """
+    if fields is None and batch_size > 1:
+        records = iter(records)
+        if max_batch_bytes is None:
+            while True:
+                batch = list(itertools.islice(records, batch_size))
+                if not batch:
+                    return
+                yield from normalize_record_batch(batch)
+        
+        if stats is None:
+            # No lines to measure, so count the records' own text
+            stats = {}
+            records = _counting_chars(records, stats)
+        while True:
+            batch = []
+            batch_end = stats.get('chars_read', 0) + max_batch_bytes
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size or stats['chars_read'] >= batch_end:
+                    break
+            if not batch:
+                return
+            yield from normalize_record_batch(batch)
+    
+    normalize = process_json_value if fields is None else functools.partial(normalize_fields, fields=fields)
+    for record in records:
+        if isinstance(record, CleanLine):
+            yield record
+        else:
+            yield normalize(record)
+
+
+def validate_records(records, schema, stats, on_error):
+    """
+    Check parsed records against a schema, passing them all through.
+    
+    Args:
+        records (iterable): JSON values or CleanLine tuples, pulled one at a time
+            through the stages after parse_jsonl_lines so stats['lines_processed']
+            is their line number
+        schema (Schema): Fields the records must and may have
+        stats (dict): Counts of parse_jsonl_lines
+        on_error (callable): Called with (line_num, code, field, detail) for each error
+    
+    Yields:
+        The records unchanged
+    """
+    for record in records:
+        value = record.value if isinstance(record, CleanLine) else record
+        for code, field in check_record(value, schema):
+            on_error(stats['lines_processed'], code, field, None)
+        yield record
+
+
+def deduplicate_records(records, deduplicator, stats):
+    """
+    Drop records that repeat an earlier one.
+    
+    Args:
+        records (iterable): Normalized JSON values or CleanLine tuples, pulled
+            from parse_jsonl_lines so stats['lines_processed'] is their line number
+        deduplicator (Deduplicator): Remembers the records seen so far
+        stats (dict): Updated in place with 'lines_duplicate'
+    
+    Yields:
+        The records seen for the first time
+    """
+    stats.setdefault('lines_duplicate', 0)
+    for record in records:
+        value = record.value if isinstance(record, CleanLine) else record
+        if deduplicator.is_duplicate(value, stats.get('lines_processed')):
+            stats['lines_duplicate'] += 1
+            continue
+        yield record
+
+
+def measure_records(records, length_stats):
+    """
+    Collect length statistics of records and apply their token budget.
+    
+    Args:
+        records (iterable): Normalized JSON values or CleanLine tuples
+        length_stats (LengthStats): Receives the lengths and decides over-budget records
+    
+    Yields:
+        The records within the budget, truncated ones as plain JSON values
+    """
+    for record in records:
+        value = record.value if isinstance(record, CleanLine) else record
+        measured = length_stats.measure(value)
+        if measured is value:
+            yield record
+        elif measured is not None:
+            yield measured
+
+
+def serialize_records(records, backend=None, passthrough=False):
+    """
+    Serialize JSON values as compact JSONL lines, each ending with a newline.
+    
+    Args:
+        records (iterable): JSON values or CleanLine tuples
+        backend (JsonBackend, optional): JSON backend, defaults to the fastest installed one
+        passthrough (bool): Copy CleanLine text verbatim instead of re-serializing
+            its value, which keeps the line's original whitespace
+    
+    Yields:
+        str: Serialized lines
+    """
+    dumps = (backend or get_json_backend()).dumps
+    for record in records:
+        if isinstance(record, CleanLine):
+            yield (record.line if passthrough else dumps(record.value)) + '\n'
+        else:
+            yield dumps(record) + '\n'
+
+
+def batch_lines(lines, batch_size=DEFAULT_BATCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+    """
+    Group serialized lines into batches for block writes.
+    
+    A batch is emitted once it holds batch_size lines or max_batch_bytes
+    characters, whichever comes first, so memory stays bounded however long
+    the input is.
+    
+    Yields:
+        list: Serialized lines
+    """
+    batch = []
+    batch_bytes = 0
+    for line in lines:
+        batch.append(line)
+        batch_bytes += len(line)
+        if len(batch) >= batch_size or batch_bytes >= max_batch_bytes:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+def _unprofiled_stage(name, iterable):
+    """Stand-in for Profiler.iterate when a run is not profiled."""
+    return iterable
+
+
+def _clean_jsonl_lines(lines, outfile, on_invalid=_warn_invalid_json,
+                       batch_size=DEFAULT_BATCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                       json_backend='auto', fields=None, ascii_passthrough=False, profiler=None,
+                       substitutions=None, deduplicator=None, length_stats=None, schema=None,
+                       on_schema_error=None, profile=None):
+    """
+    Clean JSONL lines and write the surviving records to an open text file.
+    
+    Args:
+        lines (iterable): Lines of JSONL text, numbered from 1
+        outfile (file): Text file object receiving the cleaned records
+        on_invalid (callable): Called with (line_num, error, line) for each invalid JSON line
+        batch_size (int): Maximum number of records per write
+        max_batch_bytes (int): Maximum size of a write
+        json_backend (str): Name of the JSON backend
+        fields (list, optional): Field paths to normalize; None normalizes every string
+        ascii_passthrough (bool): Copy valid, already-clean lines verbatim
+        profiler (Profiler, optional): Records the time of every pipeline stage and
+            the characters normalization substitutes
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character
+        deduplicator (Deduplicator, optional): Drops normalized records that repeat
+            an earlier one; dropped records are not counted as removed
+        length_stats (LengthStats, optional): Measures the surviving records and drops
+            or truncates those over its token budget; dropped records are not
+            counted as removed
+        schema (Schema, optional): Check the parsed records against this schema
+        on_schema_error (callable, optional): Called with (line_num, code, field, detail)
+            for each schema error
+        profile (str or TransliterationProfile, optional): Transliteration profile to
+            normalize with; None uses the active one
+    
+    Returns:
+        tuple: (lines_processed, lines_removed, lines_written)
+    """
+    backend = get_json_backend(json_backend)
+    selection = compile_field_paths(fields) if fields is not None else None
+    stats = {}
+    stage = _unprofiled_stage if profiler is None else profiler.iterate
+    records = stage('parse', parse_jsonl_lines(stage('read', lines), stats, on_invalid, backend, detect_clean=True))
+    # The deduplicator and the validator number records by the line parsed last, so they need them one at a time
+    one_at_a_time = deduplicator is not None or schema is not None
+    normalized = stage('normalize', normalize_records(records, selection, 1 if one_at_a_time else batch_size,
+                                                      max_batch_bytes, stats))
+    if deduplicator is not None:
+        normalized = stage('dedup', deduplicate_records(normalized, deduplicator, stats))
+    if length_stats is not None:
+        normalized = stage('lengths', measure_records(normalized, length_stats))
+    if schema is not None:
+        # Last, so the records checked are the ones written, after normalization and truncation
+        normalized = stage('validate', validate_records(normalized, schema, stats, on_schema_error))
+    serialized = stage('serialize', serialize_records(normalized, backend, ascii_passthrough))
+    
+    if profiler is not None:
+        outfile = profiler.writer('write', outfile)
+    # The normalizer only counts its substitutions when someone asked for them
+    counts = Counter() if substitutions is not None or profiler is not None else None
+    
+    lines_written = 0
+    with counting_substitutions(counts), transliteration_profile(profile):
+        for batch in stage('batch', batch_lines(serialized, batch_size, max_batch_bytes)):
+            outfile.write(''.join(batch))
+            lines_written += len(batch)
+    
+    if substitutions is not None:
+        substitutions.update(counts)
+    if profiler is not None:
+        profiler.characters.update(counts)
+    return stats['lines_processed'], stats['lines_removed'], lines_written
+
+
+def _chunk_boundaries(input_path, chunk_size):
+    """Split a file into (start, end) byte ranges of roughly chunk_size that end on a newline."""
+    file_size = input_path.stat().st_size
+    boundaries = []
+    with open(input_path, 'rb') as infile:
+        start = 0
+        while start < file_size:
+            if start + chunk_size >= file_size:
+                end = file_size
+            else:
+                infile.seek(start + chunk_size)
+                infile.readline()
+                end = infile.tell()
+            boundaries.append((start, end))
+            start = end
+    return boundaries
+
+
+def _clean_jsonl_chunk(input_path, start, end, options, count_substitutions=False):
+    """
+    Clean one newline-aligned byte range of a JSONL file (runs in a worker process).
+    
+    Args:
+        input_path (str): Path to input JSONL file
+        start (int): Offset of the first byte of the chunk
+        end (int): Offset just past the last byte of the chunk
+        options (dict): Keyword arguments for _clean_jsonl_lines
+        count_substitutions (bool, optional): Count the substituted characters
+    
+    Returns:
+        tuple: (cleaned_text, counts, invalid_lines, substitutions, schema_errors) with
+        counts as (lines_processed, lines_removed, lines_written), invalid_lines as
+        (line_num, error_message, line) tuples numbered from the start of the chunk,
+        substitutions a Counter, or None if not counted, and schema_errors
+        (line_num, code, field, detail) tuples numbered the same way
+    """
+    with open(input_path, 'rb') as infile:
+        infile.seek(start)
+        data = infile.read(end - start)
+    
+    invalid_lines = []
+    schema_errors = []
+    substitutions = Counter() if count_substitutions else None
+    outfile = io.StringIO()
+    # newline=None gives the same universal-newline splitting as a text-mode file
+    counts = _clean_jsonl_lines(
+        io.StringIO(data.decode('utf-8'), newline=None),
+        outfile,
+        on_invalid=lambda line_num, error, line: invalid_lines.append((line_num, str(error), line)),
+        substitutions=substitutions,
+        on_schema_error=lambda *error: schema_errors.append(error),
+        **options
+    )
+    return outfile.getvalue(), counts, invalid_lines, substitutions, schema_errors
+
+
+def _clean_jsonl_parallel(input_path, outfile, workers, options, substitutions=None, validation=None):
+    """Clean a JSONL file across a process pool, writing results in the original line order."""
+    file_size = input_path.stat().st_size
+    chunk_size = min(max(file_size // (workers * 4), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    chunks = iter(_chunk_boundaries(input_path, chunk_size))
+    
+    lines_processed = 0
+    lines_removed = 0
+    lines_written = 0
+    
+    # Imported here so serial runs do not pay for loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next(count):
+            for start, end in itertools.islice(chunks, count):
+                pending.append(executor.submit(_clean_jsonl_chunk, str(input_path), start, end, options,
+                                               substitutions is not None))
+        
+        # Keep only a few chunks in flight so finished results cannot pile up in memory
+        pending = deque()
+        submit_next(workers * 2)
+        while pending:
+            cleaned_text, counts, invalid_lines, chunk_substitutions, schema_errors = pending.popleft().result()
+            submit_next(1)
+            
+            # Line numbers in warnings are relative to the chunk until offset here
+            for line_num, error, line in invalid_lines:
+                _warn_invalid_json(lines_processed + line_num, error, line)
+            if validation is not None:
+                errors = schema_errors + [(line_num, 'invalid_json', None, error)
+                                          for line_num, error, _ in invalid_lines]
+                for line_num, code, field, detail in sorted(errors, key=lambda error: error[0]):
+                    validation.add(lines_processed + line_num, code, field, detail)
+            outfile.write(cleaned_text)
+            lines_processed += counts[0]
+            lines_removed += counts[1]
+            lines_written += counts[2]
+            if substitutions is not None:
+                substitutions.update(chunk_substitutions)
+    
+    return lines_processed, lines_removed, lines_written
+
+
+def _clean_jsonl_text_chunk(lines, first_line_num, options):
+    """Clean a chunk of lines for incremental mode, numbering warnings from first_line_num."""
+    outfile = io.StringIO()
+    substitutions = Counter()
+    counts = _clean_jsonl_lines(
+        lines,
+        outfile,
+        on_invalid=lambda line_num, error, line: _warn_invalid_json(first_line_num - 1 + line_num, error, line),
+        substitutions=substitutions,
+        **options
+    )
+    return outfile.getvalue(), counts, substitutions
+
+
+def clean_jsonl_file(input_path, output_path=None, workers=1,
+                     batch_size=DEFAULT_BATCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                     json_backend='auto', fields=None, ascii_passthrough=False, incremental=False,
+                     profiler=None, substitutions=None, deduplicator=None,
+                     line_buffered=False, length_stats=None, validation=None, profile=None,
+                     chunk_lines=DEFAULT_CHUNK_LINES):
+    """
+    Clean JSONL file by removing empty lines and normalizing Unicode.
+    
+    gzip and zstd compressed files are read and written transparently: the
+    input is recognized by its content, the output by its extension, and an
+    in-place run keeps the input's compression.
+    
+    Args:
+        input_path (str): Path to input JSONL file, or '-' for stdin
+        output_path (str, optional): Path to output file, or '-' for stdout. If None,
+            processes in-place (or writes to stdout when reading stdin).
+        workers (int, optional): Number of worker processes. 1 processes the file serially.
+        batch_size (int, optional): Maximum number of records per output write
+        max_batch_bytes (int, optional): Maximum size of an output write, bounding memory use
+        json_backend (str, optional): 'stdlib', 'orjson', or 'auto' for the fastest installed one
+        fields (list, optional): Field paths to normalize, such as 'messages[*].content'.
+            If None, every string in every record is normalized.
+        ascii_passthrough (bool, optional): Copy lines that are valid JSON and already
+            clean ASCII verbatim instead of re-serializing them. Their original
+            whitespace is kept, so only use it on data in compact form.
+        incremental (bool, optional): Reuse the output of unchanged chunks from the
+            previous run, tracked in a manifest next to output_path. Requires
+            output_path and processes the file serially.
+        chunk_lines (int, optional): Average lines per incremental chunk; a changed
+            line re-cleans the chunk around it
+        profiler (Profiler, optional): Records per-stage times and substituted
+            characters. Profiled runs process the file serially, as do runs on
+            compressed input.
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character. Costs a little time, so only pass it when needed.
+        deduplicator (Deduplicator, optional): Drops records that repeat one seen
+            before in this file or in an earlier file given the same deduplicator.
+            Deduplicated runs process the file serially and cannot be incremental.
+        line_buffered (bool, optional): Write and flush each record as soon as it is
+            cleaned, for consumers reading the output as it grows
+        length_stats (LengthStats, optional): Collects per-field lengths of the cleaned
+            records and drops or truncates those over its token budget. Measured
+            runs process the file serially and cannot be incremental.
+        validation (ValidationReport, optional): Receives the invalid JSON lines and the
+            written records that do not match its schema, checked after normalization
+            and truncation. Validated runs cannot be incremental.
+        profile (str or TransliterationProfile, optional): Transliteration profile, by
+            built-in name or file path; None uses the active one, by default 'default'
+    
+    Returns:
+        tuple: (lines_processed, lines_removed, lines_written)
+    """
+    reading_stdin = is_stdio(input_path)
+    input_path = Path(input_path)
+    
+    if not reading_stdin and not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if reading_stdin and output_path is None:
+        output_path = STDIO_PATH
+    
+    # Fail on an unavailable backend or a bad field path before touching the output
+    get_json_backend(json_backend)
+    if fields is not None:
+        compile_field_paths(fields)
+    # Resolved here, so worker processes get the profile itself whatever they have active
+    profile = resolve_profile(profile) if profile is not None else active_profile()
+    
+    input_compression, output_compression = file_compressions(input_path, output_path)
+    
+    options = {
+        # One record per write, so each one is flushed as soon as it is ready
+        'batch_size': 1 if line_buffered else batch_size,
+        'max_batch_bytes': max_batch_bytes,
+        'json_backend': json_backend,
+        'fields': fields,
+        'ascii_passthrough': ascii_passthrough,
+        'profiler': profiler,
+        'deduplicator': deduplicator,
+        'length_stats': length_stats,
+        'schema': validation.schema if validation is not None else None,
+        'profile': profile,
+    }
+    # Stage times and lengths are only collected in this process, and records
+    # are only deduplicated against each other in one process
+    if profiler is not None or deduplicator is not None or length_stats is not None:
+        workers = 1
+    # A compressed stream cannot be split at byte offsets, nor can stdin
+    if input_compression is not None or reading_stdin:
+        workers = 1
+    
+    if incremental:
+        if output_path is None:
+            raise ValueError("Incremental mode needs an output file")
+        if deduplicator is not None:
+            # Reused chunks would never be checked for duplicates
+            raise ValueError("Incremental mode cannot deduplicate")
+        if length_stats is not None:
+            # Reused chunks would never be measured
+            raise ValueError("Incremental mode cannot collect length statistics")
+        if validation is not None:
+            raise ValueError("Incremental mode cannot validate")
+        # Unchanged chunks are copied from the previous output by byte offset
+        if reading_stdin or is_stdio(output_path):
+            raise ValueError("Incremental mode needs files, not stdin or stdout")
+        if input_compression is not None or output_compression is not None:
+            raise ValueError("Incremental mode needs uncompressed files")
+        fingerprint = cleaner_fingerprint(
+            'clean_jsonl', CLEANER_VERSION, unicodedata.unidata_version,
+            profile.digest, fields, ascii_passthrough,
+        )
+        counts, _, _ = clean_incrementally(
+            input_path, output_path, fingerprint,
+            functools.partial(_clean_jsonl_text_chunk, options=options),
+            empty_counts=(0, 0, 0),
+            chunk_lines=chunk_lines,
+            substitutions=substitutions,
+        )
+        return counts
+    
+    # Use temporary file for in-place processing
+    if output_path is None:
+        output_path = input_path.with_suffix(input_path.suffix + '.tmp')
+        process_in_place = True
+    else:
+        output_path = Path(output_path)
+        process_in_place = False
+    
+    if deduplicator is not None:
+        deduplicator.begin_file(input_path)
+    on_invalid = _warn_invalid_json
+    on_schema_error = None
+    if validation is not None:
+        validation.begin_file(input_path)
+        invalid_before = validation.errors['invalid_json']
+        on_schema_error = validation.add
+        
+        def on_invalid(line_num, error, line):
+            _warn_invalid_json(line_num, error, line)
+            validation.add(line_num, 'invalid_json', None, str(error))
+    
+    try:
+        with open_output(output_path, output_compression, buffering=WRITE_BUFFER_SIZE,
+                         line_buffering=line_buffered) as outfile:
+            if workers > 1:
+                counts = _clean_jsonl_parallel(input_path, outfile, workers, options, substitutions, validation)
+            else:
+                with open_input(input_path, input_compression) as infile:
+                    counts = _clean_jsonl_lines(infile, outfile, on_invalid=on_invalid,
+                                                on_schema_error=on_schema_error, substitutions=substitutions,
+                                                **options)
+        
+        # Replace original file if processing in-place
+        if process_in_place:
+            output_path.replace(input_path)
+            
+    except Exception as e:
+        # Clean up temporary file if something goes wrong
+        if process_in_place and output_path.exists():
+            output_path.unlink()
+        raise e
+    
+    if validation is not None:
+        # Invalid JSON lines count as removed, but they were records to check
+        validation.records_checked += counts[0] - counts[1] + validation.errors['invalid_json'] - invalid_before
+    return counts
+
+
+def _validate_jsonl_lines(lines, schema, loads, on_error):
+    """
+    Check JSONL lines against a schema without cleaning them.
+    
+    Returns:
+        tuple: (lines_processed, records_checked)
+    """
+    lines_processed = 0
+    records_checked = 0
+    for line_num, line in enumerate(lines, 1):
+        lines_processed = line_num
+        stripped = line.strip()
+        if not stripped:
+            on_error(line_num, 'empty_line', None, None)
+            continue
+        records_checked += 1
+        try:
+            record = loads(stripped)
+        except json.JSONDecodeError as e:
+            on_error(line_num, 'invalid_json', None, str(e))
+            continue
+        for code, field in check_record(record, schema):
+            on_error(line_num, code, field, None)
+    return lines_processed, records_checked
+
+
+def _validate_jsonl_chunk(input_path, start, end, schema, json_backend):
+    """
+    Validate one newline-aligned byte range of a JSONL file (runs in a worker process).
+    
+    Returns:
+        tuple: (lines_processed, records_checked, errors) with errors as
+        (line_num, code, field, detail) tuples numbered from the start of the chunk
+    """
+    with open(input_path, 'rb') as infile:
+        infile.seek(start)
+        data = infile.read(end - start)
+    
+    errors = []
+    counts = _validate_jsonl_lines(io.StringIO(data.decode('utf-8'), newline=None), schema,
+                                   get_json_backend(json_backend).loads, lambda *error: errors.append(error))
+    return (*counts, errors)
+
+
+def validate_jsonl_file(input_path, validation, workers=1, json_backend='auto'):
+    """
+    Check a JSONL file against a schema without writing anything.
+    
+    Unlike cleaning, which drops them, empty and whitespace-only lines are
+    reported as errors here: the file is expected to be ready for upload.
+    
+    Args:
+        input_path (str): Path to JSONL file, possibly gzip or zstd compressed, or '-' for stdin
+        validation (ValidationReport): Receives the errors and the schema to check against
+        workers (int, optional): Number of worker processes. 1 processes the file serially,
+            as do runs on compressed input or stdin.
+        json_backend (str, optional): 'stdlib', 'orjson', or 'auto' for the fastest installed one
+    
+    Returns:
+        tuple: (lines_processed, records_checked)
+    """
+    reading_stdin = is_stdio(input_path)
+    input_path = Path(input_path)
+    
+    if not reading_stdin and not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    loads = get_json_backend(json_backend).loads
+    input_compression, _ = file_compressions(input_path, STDIO_PATH)
+    validation.begin_file(input_path)
+    
+    if workers <= 1 or input_compression is not None or reading_stdin:
+        with open_input(input_path, input_compression) as infile:
+            lines_processed, records_checked = _validate_jsonl_lines(infile, validation.schema, loads,
+                                                                     validation.add)
+        validation.records_checked += records_checked
+        return lines_processed, records_checked
+    
+    file_size = input_path.stat().st_size
+    chunk_size = min(max(file_size // (workers * 4), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    chunks = iter(_chunk_boundaries(input_path, chunk_size))
+    lines_processed = 0
+    records_checked = 0
+    
+    # Imported here so serial runs do not pay for loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next(count):
+            for start, end in itertools.islice(chunks, count):
+                pending.append(executor.submit(_validate_jsonl_chunk, str(input_path), start, end,
+                                               validation.schema, json_backend))
+        
+        # Results arrive in file order so line numbers can be offset as they come
+        pending = deque()
+        submit_next(workers * 2)
+        while pending:
+            chunk_lines, chunk_records, errors = pending.popleft().result()
+            submit_next(1)
+            for line_num, code, field, detail in errors:
+                validation.add(lines_processed + line_num, code, field, detail)
+            lines_processed += chunk_lines
+            records_checked += chunk_records
+    
+    validation.records_checked += records_checked
+    return lines_processed, records_checked
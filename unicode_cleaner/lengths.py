@@ -0,0 +1,160 @@
+"""
+Record Length Statistics and Budgets
+
+Measures the characters and approximate tokens of every field of the
+normalized records as they stream past, and optionally drops or truncates
+records over a token budget, so records too long for the fine-tuning
+context window are caught before upload rather than by the remote
+validator.  Token counts are estimated at four characters per token, which
+is close for English text and cheap enough to run on every record.
+"""
+
+from collections import Counter
+
+
+# Characters per token of the estimate
+CHARS_PER_TOKEN = 4
+
+# What to do with records over the budget
+OVER_BUDGET_ACTIONS = ('drop', 'truncate')
+
+# Field shortened by the 'truncate' action
+DEFAULT_TRUNCATE_FIELD = 'response'
+
+# Width of the longest bar of the histogram
+_HISTOGRAM_WIDTH = 40
+
+
+def approximate_tokens(characters):
+    """Estimated number of tokens in a text of the given length."""
+    return -(-characters // CHARS_PER_TOKEN)
+
+
+def _text_length(value):
+    """Total length of the strings in a JSON value."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_text_length(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_text_length(item) for item in value)
+    return 0
+
+
+class LengthStats:
+    """
+    Per-field length statistics of records, with an optional token budget.
+    
+    Statistics describe the records as they arrive, before any truncation.
+    A record's tokens are the sum of the estimated tokens of its fields;
+    nested values count towards their top-level field.
+    """
+    
+    def __init__(self, max_tokens=None, over_budget='drop', truncate_field=DEFAULT_TRUNCATE_FIELD):
+        """
+        Args:
+            max_tokens (int, optional): Token budget per record; None only measures
+            over_budget (str, optional): 'drop' records over the budget, or 'truncate'
+                their truncate_field to fit (dropping them if that is not enough)
+            truncate_field (str, optional): Top-level string field that truncation shortens
+        """
+        if over_budget not in OVER_BUDGET_ACTIONS:
+            raise ValueError(f"Unknown over-budget action: {over_budget}")
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError(f"Token budget must be positive, not {max_tokens}")
+        self.max_tokens = max_tokens
+        self.over_budget = over_budget
+        self.truncate_field = truncate_field
+        
+        self.records = 0
+        self.dropped = 0
+        self.truncated = 0
+        # Records, total characters and longest value per field
+        self.field_records = Counter()
+        self.field_characters = Counter()
+        self.field_max_characters = Counter()
+        # Records per power-of-two token bucket, keyed by the bucket's upper bound
+        self.histogram = Counter()
+        self.max_record_tokens = 0
+    
+    def _truncate(self, record, tokens):
+        value = record.get(self.truncate_field) if isinstance(record, dict) else None
+        if not isinstance(value, str):
+            return None
+        other_tokens = tokens - approximate_tokens(len(value))
+        keep = (self.max_tokens - other_tokens) * CHARS_PER_TOKEN
+        if keep < 1:
+            return None
+        shortened = value[:keep].rstrip()
+        # Cut at a word boundary when there is one in the second half and text before it
+        space = shortened.rfind(' ')
+        if keep < len(value) and space > keep // 2 and shortened[:space].strip():
+            shortened = shortened[:space].rstrip()
+        if not shortened:
+            # Nothing but whitespace fits; an empty response is no training example
+            return None
+        truncated = dict(record)
+        truncated[self.truncate_field] = shortened
+        return truncated
+    
+    def measure(self, record):
+        """
+        Add a record to the statistics and apply the budget to it.
+        
+        Args:
+            record: Normalized JSON value
+        
+        Returns:
+            The record, a truncated copy of it, or None if it is dropped
+        """
+        fields = record.items() if isinstance(record, dict) else [('', record)]
+        tokens = 0
+        for field, value in fields:
+            characters = _text_length(value)
+            self.field_records[field] += 1
+            self.field_characters[field] += characters
+            if characters > self.field_max_characters[field]:
+                self.field_max_characters[field] = characters
+            tokens += approximate_tokens(characters)
+        
+        self.records += 1
+        self.histogram[1 << max(tokens - 1, 0).bit_length()] += 1
+        self.max_record_tokens = max(self.max_record_tokens, tokens)
+        
+        if self.max_tokens is None or tokens <= self.max_tokens:
+            return record
+        if self.over_budget == 'truncate':
+            truncated = self._truncate(record, tokens)
+            if truncated is not None:
+                self.truncated += 1
+                return truncated
+        self.dropped += 1
+        return None
+    
+    def format_report(self):
+        """
+        Describe the statistics as printable lines.
+        
+        Returns:
+            list: Lines of a per-field table and a histogram of tokens per record
+        """
+        lines = [f"{'Field':<20} {'Records':>8} {'Avg chars':>10} {'Max chars':>10} {'Avg tokens':>11}"]
+        for field, count in self.field_records.most_common():
+            characters = self.field_characters[field]
+            lines.append(f"{field or '(record)':<20} {count:>8} {characters / count:>10.0f} "
+                         f"{self.field_max_characters[field]:>10} "
+                         f"{approximate_tokens(characters) / count:>11.1f}")
+        
+        lines.append(f"Tokens per record (about {CHARS_PER_TOKEN} characters per token), "
+                     f"max {self.max_record_tokens}:")
+        largest = max(self.histogram.values(), default=0)
+        for bound in sorted(self.histogram):
+            count = self.histogram[bound]
+            bar = '#' * max(1, round(count / largest * _HISTOGRAM_WIDTH))
+            over = ' over budget' if self.max_tokens is not None and bound // 2 >= self.max_tokens else ''
+            lines.append(f"  <= {bound:>7} {bar:<{_HISTOGRAM_WIDTH}} {count}{over}")
+        
+        if self.max_tokens is not None:
+            lines.append(f"Budget {self.max_tokens} tokens: {self.dropped} records dropped, "
+                         f"{self.truncated} truncated")
+        return lines
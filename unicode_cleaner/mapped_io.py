@@ -0,0 +1,67 @@
+"""
+Memory-Mapped Line Reading
+
+Helpers that read a file through mmap and find line boundaries on the raw
+bytes, so callers can copy untouched lines straight to the output and only
+decode the lines they actually need to change.  Decoded lines follow the
+same universal-newline rules as a text-mode file.
+"""
+
+import contextlib
+import io
+import mmap
+import os
+
+
+@contextlib.contextmanager
+def mapped_file(path):
+    """
+    Memory-map a file read-only.
+
+    Yields:
+        mmap.mmap or bytes: The file contents (b'' for an empty file, which mmap cannot map)
+    """
+    with open(path, 'rb') as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def iter_line_spans(buffer, window=1):
+    """
+    Split a byte buffer into spans of whole lines without copying it.
+
+    Args:
+        buffer: Byte buffer
+        window (int, optional): Minimum span size in bytes; 1 yields every line
+            on its own, larger values group consecutive lines into one span
+
+    Yields:
+        tuple: (start, end) offsets of each span, including its final b'\\n'
+    """
+    start = 0
+    size = len(buffer)
+    while start < size:
+        newline = buffer.find(b'\n', start + window - 1)
+        end = size if newline < 0 else newline + 1
+        yield start, end
+        start = end
+
+
+def decode_lines(buffer, start, end):
+    """
+    Decode a byte range into text lines the way a text-mode file would.
+
+    A lone b'\\r' also ends a line and b'\\r\\n' becomes '\\n'.
+
+    Returns:
+        list: Decoded lines
+    """
+    text = buffer[start:end].decode('utf-8')
+    # A single line without '\r' needs no splitting
+    if '\r' not in text and text.find('\n') in (-1, len(text) - 1):
+        return [text] if text else []
+    return list(io.StringIO(text, newline=None))
+
@@ -0,0 +1,515 @@
+"""
+Markdown Cleaning Pipeline
+
+Normalizes the Unicode characters of Markdown text to ASCII line by line,
+preserving every line break and the document structure.  In preserve-code
+mode a streaming tokenizer separates code blocks and inline code spans from
+the prose and only the prose is normalized.
+"""
+
+import bisect
+import functools
+import io
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from .compressed_io import STDIO_PATH, file_compressions, is_stdio, open_input, open_output
+from .incremental import DEFAULT_CHUNK_LINES, clean_incrementally, cleaner_fingerprint
+from .mapped_io import decode_lines, iter_line_spans, mapped_file
+from .normalize import (
+    CLEANER_VERSION, active_profile, counting_substitutions, normalize_unicode, transliteration_profile,
+)
+from .transliteration import resolve_profile
+
+
+# Opening line of a fenced code block: indentation, the fence and its info string
+_FENCE_OPEN = re.compile(r'[ \t]*(`{3,}|~{3,})([^\r\n]*)')
+
+# Closing line of a fenced code block
+_FENCE_CLOSE = re.compile(r'[ \t]*(`{3,}|~{3,})[ \t]*(?:\r\n|\r|\n)?')
+
+# Bullet or ordered list item marker with the spacing after it
+_LIST_ITEM = re.compile(r'[ \t]*(?:[-+*]|\d{1,9}[.)])(?=[ \t\r\n]|$)')
+
+# ATX heading, which interrupts a paragraph like a fence does
+_ATX_HEADING = re.compile(r' {0,3}#{1,6}(?=[ \t\r\n]|$)')
+
+# Paragraphs are buffered to match code spans across their lines; one without
+# a blank line for this long is flushed regardless
+_MAX_PARAGRAPH_CHARS = 1 << 20
+
+
+def _indent_width(line):
+    """Columns of leading whitespace, with tab stops every four columns."""
+    body = line.lstrip(' \t')
+    return len(line[:len(line) - len(body)].expandtabs(4))
+
+
+def _is_escaped(text, index, lower):
+    """Whether text[index] follows an odd number of backslashes at or after lower."""
+    backslashes = 0
+    while index - backslashes > lower and text[index - backslashes - 1] == '\\':
+        backslashes += 1
+    return backslashes % 2 == 1
+
+
+def _split_code_spans(text):
+    """
+    Split paragraph text into prose and inline code spans.
+    
+    A code span opens with a run of backticks and closes at the next run of
+    exactly the same length.  A run without a closer is literal text, as is a
+    backtick escaped with a backslash.
+    
+    Args:
+        text (str): Text of a paragraph, possibly spanning several lines
+    
+    Yields:
+        tuple: (is_code, segment), with the segments adding up to text
+    """
+    if '`' not in text:
+        yield False, text
+        return
+    
+    runs = [match.span() for match in re.finditer('`+', text)]
+    # Start offsets of the runs of each length, in order, to look up closers
+    starts_by_length = {}
+    for start, end in runs:
+        starts_by_length.setdefault(end - start, []).append(start)
+    
+    prose_start = 0
+    for start, end in runs:
+        if start < prose_start:
+            continue  # Part of the code span just emitted
+        if _is_escaped(text, start, prose_start):
+            start += 1
+        candidates = starts_by_length.get(end - start, ())
+        index = bisect.bisect_left(candidates, end)
+        if start == end or index == len(candidates):
+            continue
+        close = candidates[index] + end - start
+        if start > prose_start:
+            yield False, text[prose_start:start]
+        yield True, text[start:close]
+        prose_start = close
+    
+    if prose_start < len(text):
+        yield False, text[prose_start:]
+
+
+def iter_markdown_segments(lines, stats=None):
+    """
+    Split streamed Markdown lines into code and prose.
+    
+    Recognizes fenced code blocks (``` or ~~~, closed by a fence of the same
+    character at least as long, or by the end of the document), indented code
+    blocks (four columns deeper than the enclosing list item and not
+    continuing a paragraph) and inline code spans.  Only the current paragraph
+    is buffered, so memory stays bounded however long the document is.
+    
+    Args:
+        lines (iterable): Lines of Markdown text, with their line endings
+        stats (dict, optional): Receives 'lines_processed' and 'code_characters'
+    
+    Yields:
+        tuple: (is_code, text), with the texts adding up to the input
+    """
+    if stats is None:
+        stats = {}
+    stats['lines_processed'] = 0
+    stats['code_characters'] = 0
+    
+    fence = None          # (character, length) of the open fenced code block
+    list_indents = []     # Content columns of the enclosing list items
+    previous_blank = True
+    in_paragraph = False
+    in_indented_code = False
+    paragraph = []
+    paragraph_size = 0
+    
+    def flush():
+        nonlocal paragraph_size
+        text = ''.join(paragraph)
+        paragraph.clear()
+        paragraph_size = 0
+        for is_code, segment in _split_code_spans(text):
+            if is_code:
+                stats['code_characters'] += len(segment)
+            yield is_code, segment
+    
+    for line in lines:
+        stats['lines_processed'] += 1
+        
+        if fence is not None:
+            stats['code_characters'] += len(line)
+            yield True, line
+            match = _FENCE_CLOSE.fullmatch(line)
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= fence[1]:
+                fence = None
+            continue
+        
+        if not line.strip(' \t\r\n'):
+            if paragraph:
+                yield from flush()
+            yield False, line
+            previous_blank = True
+            in_paragraph = False
+            continue
+        
+        indent = _indent_width(line)
+        if previous_blank:
+            # A line after a blank one belongs to the list items it is indented under
+            while list_indents and indent < list_indents[-1]:
+                list_indents.pop()
+        previous_blank = False
+        base_indent = list_indents[-1] if list_indents else 0
+        
+        # Indented code cannot interrupt a paragraph
+        if indent >= base_indent + 4 and (in_indented_code or not in_paragraph):
+            stats['code_characters'] += len(line)
+            yield True, line
+            in_indented_code = True
+            continue
+        in_indented_code = False
+        
+        match = _FENCE_OPEN.match(line)
+        if (match and indent <= base_indent + 3
+                and not (match.group(1)[0] == '`' and '`' in match.group(2))):
+            if paragraph:
+                yield from flush()
+            stats['code_characters'] += len(line)
+            yield True, line
+            fence = (match.group(1)[0], len(match.group(1)))
+            in_paragraph = False
+            continue
+        
+        if _ATX_HEADING.match(line):
+            if paragraph:
+                yield from flush()
+            paragraph.append(line)
+            yield from flush()
+            in_paragraph = False
+            continue
+        
+        match = _LIST_ITEM.match(line)
+        if match:
+            if paragraph:
+                yield from flush()
+            marker_end = len(match.group(0).expandtabs(4))
+            content = marker_end + _indent_width(line[match.end():])
+            # Content after five or more spaces is indented code inside the item
+            if content - marker_end > 4 or not line[match.end():].strip():
+                content = marker_end + 1
+            while list_indents and indent < list_indents[-1]:
+                list_indents.pop()
+            list_indents.append(content)
+        
+        paragraph.append(line)
+        paragraph_size += len(line)
+        in_paragraph = True
+        if paragraph_size >= _MAX_PARAGRAPH_CHARS:
+            yield from flush()
+    
+    if paragraph:
+        yield from flush()
+
+
+def _clean_markdown_lines(lines, outfile, profiler=None, substitutions=None, preserve_code=False,
+                          profile=None):
+    """
+    Normalize Markdown lines and write them to an open text file.
+    
+    Args:
+        lines (iterable): Lines of Markdown text
+        outfile (file): Text file object receiving the normalized lines
+        profiler (Profiler, optional): Records the time of reading, normalizing and
+            writing, and the characters normalization substitutes
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character
+        preserve_code (bool, optional): Copy code blocks and inline code spans
+            unchanged and only normalize the prose around them
+        profile (str or TransliterationProfile, optional): Transliteration profile to
+            normalize with; None uses the active one
+    
+    Returns:
+        tuple: (lines_processed, characters_replaced)
+    """
+    normalize = normalize_unicode
+    if profiler is not None:
+        lines = profiler.iterate('read', lines)
+        normalize = profiler.timed('normalize', normalize_unicode)
+        outfile = profiler.writer('write', outfile)
+    
+    lines_processed = 0
+    counts = Counter()
+    # The normalizer counts its substitutions as it makes them
+    with counting_substitutions(counts), transliteration_profile(profile):
+        if preserve_code:
+            stats = {}
+            segments = iter_markdown_segments(lines, stats)
+            if profiler is not None:
+                segments = profiler.iterate('tokenize', segments)
+            for is_code, text in segments:
+                outfile.write(text if is_code else normalize(text))
+            lines_processed = stats['lines_processed']
+        else:
+            for line in lines:
+                lines_processed += 1
+                # Write the line (including newlines and empty lines)
+                outfile.write(normalize(line))
+    
+    if substitutions is not None:
+        substitutions.update(counts)
+    if profiler is not None:
+        profiler.characters.update(counts)
+    return lines_processed, sum(counts.values())
+
+
+# Buffer size of the output file in memory-mapped mode
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Size of the line-aligned windows preserve-code mode decodes the mapped file in
+_SCAN_WINDOW = 256 << 10
+
+# A byte that may need work: any non-ASCII byte, the grave accent and a
+# carriage return, which the text path turns into a '\n' line ending
+_NEEDS_WORK = re.compile(rb'[\x80-\xff`\r]')
+
+# Size of the windows the mapped file is screened for bytes that need work in
+_SCREEN_WINDOW = 16 << 10
+
+# Clean lines between two lines that need work are decoded along with them
+# when they are shorter than this, rather than copied on their own
+_MIN_COPY = 1 << 10
+
+
+def _iter_mapped_lines(buffer):
+    """Decode a mapped buffer window by window into lines, keeping their line endings."""
+    view = memoryview(buffer)
+    try:
+        for start, end in iter_line_spans(buffer, window=_SCAN_WINDOW):
+            yield from io.StringIO(str(view[start:end], 'utf-8'), newline='')
+    finally:
+        view.release()
+
+
+def _find_work(buffer, pos):
+    """Return the offset of the first byte from pos on that needs work, or -1."""
+    size = len(buffer)
+    while pos < size:
+        window = buffer[pos:pos + _SCREEN_WINDOW]
+        # isascii() and the substring checks run at memory speed, the regex does not
+        if not window.isascii() or b'`' in window or b'\r' in window:
+            return pos + _NEEDS_WORK.search(window).start()
+        pos += len(window)
+    return -1
+
+
+def _iter_dirty_spans(buffer):
+    """
+    Find the runs of whole lines in a byte buffer that need normalizing.
+    
+    Yields:
+        tuple: (start, end) offsets of each run; the bytes between runs are
+            ASCII lines the normalizer leaves unchanged
+    """
+    size = len(buffer)
+    found = _find_work(buffer, 0)
+    while found >= 0:
+        start = buffer.rfind(b'\n', 0, found) + 1
+        while True:
+            newline = buffer.find(b'\n', found)
+            end = size if newline < 0 else newline + 1
+            found = _find_work(buffer, end)
+            if found < 0 or found - end >= _MIN_COPY:
+                break
+        yield start, end
+
+
+def _iter_passing_through(buffer, outfile, copied_lines):
+    """
+    Yield the lines of a mapped buffer that need normalizing, copying the rest.
+    
+    The unchanged lines before each run of lines that need work are written
+    to outfile straight from the buffer by the time the run is asked for.
+    
+    Args:
+        buffer (mmap.mmap or bytes): Contents of the input file
+        outfile (file): Binary file object the unchanged lines are copied to
+        copied_lines (list): Its single element is raised by the number of copied lines
+    
+    Yields:
+        str: Decoded lines that need normalizing
+    """
+    view = memoryview(buffer)
+    try:
+        copied = 0
+        for start, end in _iter_dirty_spans(buffer):
+            if start > copied:
+                # mmap has no count(); counting a copy still runs at memory speed
+                copied_lines[0] += buffer[copied:start].count(b'\n')
+                outfile.write(view[copied:start])
+            yield from decode_lines(buffer, start, end)
+            copied = end
+        if copied < len(buffer):
+            copied_lines[0] += buffer[copied:].count(b'\n') + (buffer[-1:] != b'\n')
+            outfile.write(view[copied:])
+    finally:
+        view.release()
+
+
+def _clean_markdown_mapped(buffer, outfile, profiler=None, substitutions=None, preserve_code=False,
+                           profile=None):
+    """
+    Normalize a memory-mapped Markdown file into an open binary file.
+    
+    Lines without any byte that needs work are written straight from the
+    mapped buffer without being decoded; only the lines around the other
+    bytes go through the text path.  In preserve-code mode every line is
+    decoded, since whether a line is code depends on the lines before it.
+    
+    Args:
+        buffer (mmap.mmap or bytes): Contents of the input file
+        outfile (file): Binary file object receiving the normalized text
+        profiler (Profiler, optional): Records per-stage times and substituted characters
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character
+        preserve_code (bool, optional): Copy code unchanged, see _clean_markdown_lines
+        profile (str or TransliterationProfile, optional): Transliteration profile to
+            normalize with; None uses the active one
+    
+    Returns:
+        tuple: (lines_processed, characters_replaced)
+    """
+    copied_lines = [0]
+    if preserve_code:
+        lines = _iter_mapped_lines(buffer)
+    else:
+        lines = _iter_passing_through(buffer, outfile, copied_lines)
+    
+    # Written through, so normalized lines and copied bytes reach outfile in order
+    text_outfile = io.TextIOWrapper(outfile, encoding='utf-8', newline='', write_through=True)
+    try:
+        lines_processed, characters_replaced = _clean_markdown_lines(
+            lines, text_outfile, profiler, substitutions, preserve_code=preserve_code, profile=profile,
+        )
+    finally:
+        text_outfile.flush()
+        text_outfile.detach()
+    return lines_processed + copied_lines[0], characters_replaced
+
+
+def _clean_markdown_text_chunk(lines, first_line_num, profiler=None, profile=None):
+    """Clean a chunk of lines for incremental mode."""
+    outfile = io.StringIO()
+    substitutions = Counter()
+    counts = _clean_markdown_lines(lines, outfile, profiler, substitutions, profile=profile)
+    return outfile.getvalue(), counts, substitutions
+
+
+def clean_markdown_file(input_path, output_path=None, incremental=False, use_mmap=False, profiler=None,
+                        substitutions=None, preserve_code=False, line_buffered=False, profile=None,
+                        chunk_lines=DEFAULT_CHUNK_LINES):
+    """
+    Clean Markdown file by normalizing Unicode to ASCII while preserving structure.
+    
+    gzip and zstd compressed files are read and written transparently: the
+    input is recognized by its content, the output by its extension, and an
+    in-place run keeps the input's compression.
+    
+    Args:
+        input_path (str): Path to input Markdown file, or '-' for stdin
+        output_path (str, optional): Path to output file, or '-' for stdout. If None,
+            processes in-place (or writes to stdout when reading stdin).
+        incremental (bool, optional): Reuse the output of unchanged chunks from the
+            previous run, tracked in a manifest next to output_path. Requires output_path.
+        chunk_lines (int, optional): Average lines per incremental chunk; a changed
+            line re-cleans the chunk around it
+        use_mmap (bool, optional): Read the input through mmap and copy lines that
+            need no changes without decoding them
+        profiler (Profiler, optional): Records per-stage times and substituted characters
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character; characters_replaced is their total
+        preserve_code (bool, optional): Copy fenced and indented code blocks and
+            inline code spans byte for byte and only normalize the prose
+        line_buffered (bool, optional): Flush every line as soon as it is written
+        profile (str or TransliterationProfile, optional): Transliteration profile, by
+            built-in name or file path; None uses the active one, by default 'default'
+    
+    Returns:
+        tuple: (lines_processed, characters_replaced)
+    """
+    reading_stdin = is_stdio(input_path)
+    input_path = Path(input_path)
+    
+    if not reading_stdin and not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if reading_stdin:
+        if use_mmap:
+            raise ValueError("Memory-mapped mode needs an input file")
+        if output_path is None:
+            output_path = STDIO_PATH
+    
+    input_compression, output_compression = file_compressions(input_path, output_path)
+    if input_compression is not None and use_mmap:
+        raise ValueError("Memory-mapped mode needs an uncompressed input")
+    profile = resolve_profile(profile) if profile is not None else active_profile()
+    
+    if incremental:
+        if output_path is None:
+            raise ValueError("Incremental mode needs an output file")
+        if preserve_code:
+            # A chunk cannot tell whether it starts inside a code block
+            raise ValueError("Incremental mode cannot preserve code")
+        # Unchanged chunks are copied from the previous output by byte offset
+        if reading_stdin or is_stdio(output_path):
+            raise ValueError("Incremental mode needs files, not stdin or stdout")
+        if input_compression is not None or output_compression is not None:
+            raise ValueError("Incremental mode needs uncompressed files")
+        fingerprint = cleaner_fingerprint(
+            'clean_markdown', CLEANER_VERSION, unicodedata.unidata_version, profile.digest,
+        )
+        counts, _, _ = clean_incrementally(
+            input_path, output_path, fingerprint,
+            functools.partial(_clean_markdown_text_chunk, profiler=profiler, profile=profile),
+            empty_counts=(0, 0),
+            chunk_lines=chunk_lines,
+            substitutions=substitutions,
+        )
+        return counts
+    
+    # Use temporary file for in-place processing
+    if output_path is None:
+        output_path = input_path.with_suffix(input_path.suffix + '.tmp')
+        process_in_place = True
+    else:
+        output_path = Path(output_path)
+        process_in_place = False
+    
+    try:
+        if use_mmap:
+            with mapped_file(input_path) as buffer, \
+                 open_output(output_path, output_compression, 'wb', buffering=WRITE_BUFFER_SIZE,
+                             line_buffering=line_buffered) as outfile:
+                counts = _clean_markdown_mapped(buffer, outfile, profiler, substitutions, preserve_code, profile)
+        else:
+            # Code is copied with its original line endings
+            newline = '' if preserve_code else None
+            with open_input(input_path, input_compression, newline=newline) as infile, \
+                 open_output(output_path, output_compression, newline=newline,
+                             line_buffering=line_buffered) as outfile:
+                counts = _clean_markdown_lines(infile, outfile, profiler, substitutions, preserve_code, profile)
+        
+        # Replace original file if processing in-place
+        if process_in_place:
+            output_path.replace(input_path)
+            
+    except Exception as e:
+        # Clean up temporary file if something goes wrong
+        if process_in_place and output_path.exists():
+            output_path.unlink()
+        raise e
+    
+    return counts
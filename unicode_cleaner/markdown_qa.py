@@ -0,0 +1,218 @@
+"""
+Markdown Question/Answer Conversion
+
+Turns synthetic data exported as Markdown question/answer lists, such as
+
+    ### Attractions
+    
+    1. **Q: What are the must-visit attractions in Los Angeles?**
+       **A:** Absolutely! You must visit the Hollywood Walk of Fame, ...
+
+into instruction/context/response JSONL records.  The records are normalized
+to ASCII on their way out, so the Markdown is read and normalized once
+instead of being cleaned, converted and cleaned again.
+"""
+
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from .compressed_io import (
+    compression_from_suffix, detect_compression, open_input, open_output, strip_compression_suffix,
+)
+from .jsonl import (
+    DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_BYTES, WRITE_BUFFER_SIZE, _unprofiled_stage, batch_lines,
+    get_json_backend, normalize_records, serialize_records,
+)
+from .normalize import counting_substitutions, transliteration_profile
+
+
+# Question line: an optional list marker, then 'Q:' or 'Question:', bold or not.
+# A label that is not bold must be followed by whitespace, so text such as
+# 'Q:A ratio' is not taken for one.
+_QUESTION = re.compile(
+    r'[ \t]*(?:(?:\d{1,9}[.)]|[-+*])[ \t]+)?(\*\*)?(?:Q|Question)[ \t]*:(?:\*\*|(?=\s|$))[ \t]*(.*?)\s*$',
+    re.IGNORECASE,
+)
+
+# Answer line: 'A:' or 'Answer:', bold or not, followed by whitespace like a question
+_ANSWER = re.compile(
+    r'[ \t]*(?:[-+*][ \t]+)?(\*\*)?(?:A|Answer)[ \t]*:(?:\*\*|(?=\s|$))[ \t]*(.*?)\s*$',
+    re.IGNORECASE,
+)
+
+_HEADING = re.compile(r' {0,3}#{1,6}[ \t]+(.*?)(?:[ \t]+#+)?\s*$')
+
+
+def _strip_bold(text, opened):
+    """Remove the closing ** of a label that was opened with **."""
+    if opened and text.endswith('**'):
+        return text[:-2].rstrip()
+    return text
+
+
+def parse_qa_markdown(lines, stats=None, section_context=False):
+    """
+    Parse question/answer pairs out of Markdown lines.
+    
+    A question starts at a 'Q:' line and may wrap onto further lines; its
+    answer starts at the next 'A:' line and runs until a blank line followed
+    by an unindented line, the next question or a heading.  Wrapped lines are
+    joined with spaces and the answer's paragraphs with blank lines.
+    
+    Args:
+        lines (iterable): Lines of Markdown text
+        stats (dict, optional): Receives 'lines_processed', 'questions_unanswered'
+            and 'answers_orphaned' (answers without a question)
+        section_context (bool, optional): Use the heading above each pair as its
+            context instead of an empty string
+    
+    Yields:
+        dict: {'instruction': ..., 'context': ..., 'response': ...}
+    """
+    if stats is None:
+        stats = {}
+    stats['lines_processed'] = 0
+    stats['questions_unanswered'] = 0
+    stats['answers_orphaned'] = 0
+    
+    section = ''
+    question = None          # Lines of the current question
+    question_bold = None     # Whether it opened with ** that closes on its last line
+    answer = None            # Paragraphs, each a list of lines, of its answer
+    after_blank = False
+    
+    def finish():
+        nonlocal question, answer
+        record = None
+        if question is not None:
+            if answer is None:
+                stats['questions_unanswered'] += 1
+            else:
+                record = {
+                    'instruction': _strip_bold(' '.join(question), question_bold),
+                    'context': section if section_context else '',
+                    'response': '\n\n'.join(' '.join(paragraph) for paragraph in answer if paragraph),
+                }
+        question = answer = None
+        return record
+    
+    for line in lines:
+        stats['lines_processed'] += 1
+        stripped = line.strip()
+        
+        if not stripped:
+            after_blank = True
+            if answer is not None and answer[-1]:
+                answer.append([])
+            continue
+        
+        match = _QUESTION.match(line)
+        if match:
+            record = finish()
+            if record is not None:
+                yield record
+            question = [match.group(2)]
+            question_bold = match.group(1)
+            after_blank = False
+            continue
+        
+        match = _ANSWER.match(line)
+        if match:
+            if question is None or answer is not None:
+                stats['answers_orphaned'] += 1
+                record = finish()
+                if record is not None:
+                    yield record
+            else:
+                answer = [[_strip_bold(match.group(2), match.group(1))]]
+            after_blank = False
+            continue
+        
+        match = _HEADING.match(line)
+        if match:
+            record = finish()
+            if record is not None:
+                yield record
+            section = match.group(1)
+            after_blank = False
+            continue
+        
+        if answer is not None:
+            if after_blank and not line[:1].isspace():
+                # Unindented text after a blank line is no longer part of the list item
+                record = finish()
+                if record is not None:
+                    yield record
+            else:
+                answer[-1].append(stripped)
+        elif question is not None and not after_blank:
+            question.append(stripped)
+        after_blank = False
+    
+    record = finish()
+    if record is not None:
+        yield record
+
+
+def convert_markdown_file(input_path, output_path=None, json_backend='auto', section_context=False,
+                          batch_size=DEFAULT_BATCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                          profiler=None, substitutions=None, profile=None):
+    """
+    Convert a Markdown question/answer file into cleaned JSONL records.
+    
+    Args:
+        input_path (str): Path to input Markdown file, which may be gzip or zstd compressed
+        output_path (str, optional): Path to output JSONL file, compressed if its extension
+            says so. If None, the input path with a .jsonl extension.
+        json_backend (str, optional): 'stdlib', 'orjson', or 'auto' for the fastest installed one
+        section_context (bool, optional): Use the heading above each pair as its context
+        batch_size (int, optional): Maximum number of records per output write
+        max_batch_bytes (int, optional): Maximum size of an output write
+        profiler (Profiler, optional): Records per-stage times and substituted characters
+        substitutions (Counter, optional): Receives the number of substitutions
+            per source character
+        profile (str or TransliterationProfile, optional): Transliteration profile, by
+            built-in name or file path; None uses the active one, by default 'default'
+    
+    Returns:
+        tuple: (lines_processed, records_written, questions_unanswered)
+    """
+    input_path = Path(input_path)
+    
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    if output_path is None:
+        output_path = strip_compression_suffix(input_path).with_suffix('.jsonl')
+    output_path = Path(output_path)
+    if output_path.resolve() == input_path.resolve():
+        raise ValueError("Conversion needs an output file different from the input")
+    backend = get_json_backend(json_backend)
+    
+    stats = {}
+    stage = _unprofiled_stage if profiler is None else profiler.iterate
+    counts = Counter() if substitutions is not None or profiler is not None else None
+    records_written = 0
+    
+    with open_input(input_path, detect_compression(input_path)) as infile, \
+         open_output(output_path, compression_from_suffix(output_path), buffering=WRITE_BUFFER_SIZE) as outfile:
+        records = stage('parse', parse_qa_markdown(stage('read', infile), stats, section_context))
+        normalized = stage('normalize', normalize_records(records))
+        serialized = stage('serialize', serialize_records(normalized, backend))
+        if profiler is not None:
+            outfile = profiler.writer('write', outfile)
+        
+        with counting_substitutions(counts), transliteration_profile(profile):
+            for batch in stage('batch', batch_lines(serialized, batch_size, max_batch_bytes)):
+                outfile.write(''.join(batch))
+                records_written += len(batch)
+    
+    if substitutions is not None:
+        substitutions.update(counts)
+    if profiler is not None:
+        profiler.characters.update(counts)
+    if stats['answers_orphaned']:
+        print(f"Warning: skipped {stats['answers_orphaned']} answers without a question", file=sys.stderr)
+    return stats['lines_processed'], records_written, stats['questions_unanswered']
@@ -0,0 +1,334 @@
+"""
+Unicode to ASCII Normalization
+
+The transliteration engine shared by the JSONL and Markdown cleaners: NFKD
+decomposition, removal of combining marks, the replacements of a
+transliteration profile and its fallback (by default '?') for anything left
+without an ASCII equivalent.  The per-character results are compiled into a
+translation table: the Basic Multilingual Plane all at once, loaded from the
+disk cache the first time the data needs a character, and other code points
+one at a time as they turn up.
+"""
+
+import contextlib
+import contextvars
+import functools
+import re
+import unicodedata
+
+from .transliteration import DEFAULT_PROFILE_NAME, load_compiled_table, resolve_profile
+
+# Bump when a code change alters the cleaned output, to invalidate incremental manifests
+CLEANER_VERSION = 2
+
+
+def _transliterate_char(char, profile, fallback=True):
+    """Transliterate a single character with a profile's replacements.
+
+    A character the profile maps as it is, such as a precomposed 'ü' or '½',
+    takes that replacement.  Any other character is decomposed and its parts
+    are looked up instead.  NFKD decomposition is per code point except for
+    the canonical reordering of combining marks, and every mark with a
+    non-zero combining class is in category Mn or Mc and gets dropped anyway.
+    Transliterating a string is therefore the concatenation of transliterating
+    each of its characters, which is what lets the whole algorithm run as a
+    single ``str.translate`` pass.
+
+    With fallback=False the final fallback substitution is skipped, which shows
+    what the replacements left without an ASCII equivalent.
+    """
+    replacements = profile.replacements
+    if char in replacements:
+        return replacements[char]
+
+    # First apply NFKD normalization (decomposes accented characters)
+    normalized = unicodedata.normalize('NFKD', char)
+
+    # Remove combining characters (accent marks) to get pure ASCII base characters
+    # Filter out characters in categories 'Mn' (Mark, nonspacing) and 'Mc' (Mark, spacing combining),
+    # and replace the others as the profile says
+    ascii_text = ''.join(replacements.get(c, c) for c in normalized
+                         if unicodedata.category(c) not in ('Mn', 'Mc'))
+
+    if not fallback:
+        return ascii_text
+
+    # Final safety check: replace any remaining non-ASCII characters with the fallback
+    return ''.join(c if ord(c) < 128 else profile.fallback for c in ascii_text)
+
+
+# Code points whose translations are compiled together and cached on disk
+_PRECOMPILED_CODEPOINTS = range(0x80, 0x10000)
+
+
+class _TranslationTable(dict):
+    """``str.translate`` table of one transliteration profile.
+
+    The first lookup loads the whole Basic Multilingual Plane from the disk
+    cache (compiling and caching it on a miss); code points beyond it are
+    compiled on first use.  Only ``max_size`` code points are memoized, so
+    adversarial input cannot grow the table without bound.  Each table also
+    memoizes the runs of characters it translated, so profiles used by
+    different threads never share results.
+    """
+
+    max_size = 1 << 17
+
+    def __init__(self, profile):
+        super().__init__()
+        self.profile = profile
+        self.misses = 0
+        self.precompiled = False
+        # What the grave accent, the only ASCII character a profile may map, becomes
+        self.grave_replacement = profile.replacements.get('`', '`')
+        self.transliterate_run = functools.lru_cache(maxsize=_RUN_CACHE_SIZE)(self._transliterate_run)
+        self.replace_run = self._make_replace_run()
+
+    def _precompile(self):
+        self.precompiled = True
+        translations = load_compiled_table(
+            [CLEANER_VERSION, unicodedata.unidata_version, self.profile.digest],
+            len(_PRECOMPILED_CODEPOINTS),
+            lambda: [_transliterate_char(chr(codepoint), self.profile) for codepoint in _PRECOMPILED_CODEPOINTS],
+        )
+        self.update(zip(_PRECOMPILED_CODEPOINTS, translations))
+
+    def __missing__(self, codepoint):
+        if not self.precompiled:
+            self._precompile()
+            if codepoint in self:
+                return self[codepoint]
+        self.misses += 1
+        result = _transliterate_char(chr(codepoint), self.profile)
+        if len(self) < self.max_size:
+            self[codepoint] = result
+        return result
+
+    def _transliterate_run(self, run):
+        """Transliterate a run of non-ASCII characters; memoized per distinct run as transliterate_run."""
+        return run.translate(self)
+
+    def _make_replace_run(self):
+        """Build the replacement function for _NON_ASCII_RUN.sub, as a closure to keep lookups local."""
+        transliterate_run = self.transliterate_run
+
+        def replace_run(match):
+            run = match.group()
+            if len(run) > _MAX_CACHED_RUN_LENGTH:
+                return run.translate(self)
+            return transliterate_run(run)
+        return replace_run
+
+
+# Runs of characters that need transliteration (ASCII maps to itself apart from '`')
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Distinct runs memoized per profile
+_RUN_CACHE_SIZE = 16384
+
+# Longer runs are translated directly instead of being memoized
+_MAX_CACHED_RUN_LENGTH = 64
+
+
+# Tables of the profiles used so far, by digest.  Tables start empty, so
+# importing the module costs nothing and only runs whose data needs
+# transliteration load one.
+_translation_tables = {}
+
+# The table of the process-wide profile set by use_profile, and the one of the
+# current thread or asyncio task inside transliteration_profile, which wins
+_default_table = None
+_context_table = contextvars.ContextVar('transliteration_table')
+
+# Counter of substituted source characters while counting_substitutions is
+# active in the current thread or asyncio task
+_substitution_counts = contextvars.ContextVar('substitution_counts', default=None)
+
+
+def _table_for(profile):
+    table = _translation_tables.get(profile.digest)
+    if table is None:
+        table = _translation_tables.setdefault(profile.digest, _TranslationTable(profile))
+    return table
+
+
+def use_profile(profile):
+    """
+    Make a transliteration profile the process-wide one normalize_unicode uses.
+
+    Every thread uses it, except inside a transliteration_profile block,
+    which picks a profile for its own thread or asyncio task.  Meant for
+    setting up a process, such as a script applying its command line.
+
+    Args:
+        profile (str or TransliterationProfile): Name of a built-in profile,
+            path of a profile file, or a loaded profile
+
+    Returns:
+        TransliterationProfile: The process-wide profile previously in use
+    """
+    global _default_table
+    previous = _default_table.profile if _default_table is not None else None
+    _default_table = _table_for(resolve_profile(profile))
+    return previous
+
+
+def active_profile():
+    """Return the TransliterationProfile normalize_unicode currently uses in this thread."""
+    return _context_table.get(_default_table).profile
+
+
+@contextlib.contextmanager
+def transliteration_profile(profile):
+    """
+    Use a transliteration profile while the block runs.
+
+    The profile only applies to the current thread or asyncio task, so
+    concurrent blocks with different profiles do not affect each other.
+
+    Args:
+        profile (str or TransliterationProfile): Profile to use, see use_profile;
+            None keeps the active one
+
+    Yields:
+        TransliterationProfile: The profile in use inside the block
+    """
+    if profile is None:
+        yield active_profile()
+        return
+    table = _table_for(resolve_profile(profile))
+    token = _context_table.set(table)
+    try:
+        yield table.profile
+    finally:
+        _context_table.reset(token)
+
+
+# Every process starts out with the built-in profile
+use_profile(DEFAULT_PROFILE_NAME)
+
+
+@contextlib.contextmanager
+def counting_substitutions(counts):
+    """
+    Count the characters normalize_unicode substitutes while the block runs.
+
+    Every non-ASCII character and every grave accent the profile maps is
+    substituted, so the counts come straight out of the regex pass that
+    rewrites them.  Only strings normalized by the current thread or asyncio
+    task are counted.
+
+    Args:
+        counts (Counter): Receives the number of substitutions per source character;
+            None turns counting off inside the block
+
+    Yields:
+        Counter: counts
+    """
+    token = _substitution_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _substitution_counts.reset(token)
+
+
+def describe_substitution(char):
+    """
+    Describe what normalization turns a single character into.
+
+    Returns:
+        tuple: (replacement, fallbacks) where fallbacks is the number of fallback
+        characters the final safety check put in for characters without an ASCII equivalent
+    """
+    table = _context_table.get(_default_table)
+    if char == '`':
+        return table.grave_replacement, 0
+    mapped = _transliterate_char(char, table.profile, fallback=False)
+    return _transliterate_char(char, table.profile), sum(ord(c) >= 128 for c in mapped)
+
+
+def normalize_unicode(text):
+    """Normalize Unicode characters to ASCII equivalents by removing accents and replacing typographic characters."""
+    table = _context_table.get(_default_table)
+    grave_replacement = table.grave_replacement
+    counts = _substitution_counts.get()
+    if counts is not None:
+        if grave_replacement != '`' and '`' in text:
+            counts['`'] += text.count('`')
+        if not text.isascii():
+            # Every non-ASCII character is substituted, so the runs are exactly what changed
+            for run in _NON_ASCII_RUN.findall(text):
+                counts.update(run)
+    # Pure ASCII text (the common case) skips the regex scan entirely
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(table.replace_run, text)
+    # The grave accent is the only ASCII character that can get rewritten
+    if grave_replacement == '`':
+        return text
+    return text.replace('`', grave_replacement)
+
+
+# Joins the strings normalize_many transliterates in one pass.  It is ASCII, so
+# it ends every non-ASCII run and comes out of normalization unchanged.
+_BATCH_SEPARATOR = '\x00'
+
+
+def normalize_many(texts):
+    """
+    Normalize a column of strings with one call into the transliteration pass.
+    
+    Strings that are clean ASCII already are returned as they are.  The others
+    are joined with NUL separators, normalized as one string and split again,
+    which saves the per-string overhead of calling normalize_unicode.  The
+    result is identical to normalizing each string on its own.
+    
+    Args:
+        texts (iterable): Strings to normalize
+    
+    Returns:
+        list: The normalized strings, in order
+    """
+    normalized = list(texts)
+    dirty = [i for i, text in enumerate(normalized) if not text.isascii() or '`' in text]
+    if not dirty:
+        return normalized
+    
+    joined = _BATCH_SEPARATOR.join([normalized[i] for i in dirty])
+    if joined.count(_BATCH_SEPARATOR) == len(dirty) - 1:
+        results = normalize_unicode(joined).split(_BATCH_SEPARATOR)
+    else:
+        # Some string contains the separator itself
+        results = [normalize_unicode(normalized[i]) for i in dirty]
+    for i, result in zip(dirty, results):
+        normalized[i] = result
+    return normalized
+
+
+def normalize_cache_info():
+    """
+    Report the hit/miss counters of the transliteration caches of the active profile.
+
+    Returns:
+        dict: Run cache hits, misses and size, plus per-code-point table misses and size
+    """
+    table = _context_table.get(_default_table)
+    runs = table.transliterate_run.cache_info()
+    return {
+        'run_hits': runs.hits,
+        'run_misses': runs.misses,
+        'run_cache_size': runs.currsize,
+        'codepoint_misses': table.misses,
+        'codepoint_table_size': len(table),
+    }
+
+
+def process_json_value(value):
+    """Recursively process JSON values to normalize Unicode strings."""
+    if isinstance(value, str):
+        return normalize_unicode(value)
+    elif isinstance(value, dict):
+        return {k: process_json_value(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [process_json_value(item) for item in value]
+    else:
+        return value
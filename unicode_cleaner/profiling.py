@@ -0,0 +1,180 @@
+"""
+Per-Stage Profiling of a Cleaning Run
+
+Collects the time spent in each stage of a cleaning pipeline together with
+how often each stage ran, and the characters normalization substituted.  A
+run is only instrumented when a Profiler is passed in, so the cleaners pay
+nothing for it otherwise.  The collected data is written out as
+a JSON report.
+"""
+
+import contextlib
+import json
+import sys
+import time
+import unicodedata
+from collections import Counter
+
+
+# Bump when the report layout changes
+REPORT_FORMAT = 1
+
+# Characters listed in the report by default
+DEFAULT_TOP_CHARACTERS = 25
+
+
+class _TimedWriter:
+    """File wrapper that charges the time spent in write() to a profiler stage."""
+
+    def __init__(self, profiler, name, outfile):
+        self._profiler = profiler
+        self._name = name
+        self._outfile = outfile
+
+    def write(self, data):
+        with self._profiler.stage(self._name):
+            return self._outfile.write(data)
+
+
+class Profiler:
+    """
+    Time and call counters per pipeline stage, plus counts of substituted characters.
+
+    The cleaners add their substitution counts to the characters Counter.
+
+    Stages may nest, as the stages of a generator pipeline do when each one
+    pulls from the one before it; a stage is only charged for its own time,
+    not for the time of the stages it waits on.
+    """
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.characters = Counter()
+        self._active = []
+        self._since = None
+        self._started = time.perf_counter()
+
+    def _register(self, name):
+        # Reports list stages in the order they were first wrapped or entered
+        self.calls.setdefault(name, 0)
+        self.seconds.setdefault(name, 0.0)
+
+    def _enter(self, name):
+        self._register(name)
+        now = time.perf_counter()
+        if self._active:
+            self.seconds[self._active[-1]] += now - self._since
+        self._active.append(name)
+        self._since = now
+
+    def _exit(self):
+        now = time.perf_counter()
+        self.seconds[self._active.pop()] += now - self._since
+        self._since = now
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Charge the time spent in the with block to a stage and count one call."""
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+            self.calls[name] += 1
+
+    def iterate(self, name, iterable):
+        """
+        Wrap a pipeline stage, charging the time spent producing each item to it.
+
+        Returns:
+            iterator: The items of iterable; every item counts as one call
+        """
+        self._register(name)
+        return self._iterate(name, iter(iterable))
+
+    def _iterate(self, name, iterator):
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            self.calls[name] += 1
+            yield item
+
+    def timed(self, name, func):
+        """Wrap a function so every call to it is charged to a stage."""
+        self._register(name)
+
+        def timed_func(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return timed_func
+
+    def writer(self, name, outfile):
+        """Wrap a file so the time spent writing to it is charged to a stage."""
+        return _TimedWriter(self, name, outfile)
+
+    def report(self, describe_substitution, top=DEFAULT_TOP_CHARACTERS, **extra):
+        """
+        Build the profile report.
+
+        Args:
+            describe_substitution (callable): Maps a character to (replacement, fallbacks),
+                where fallbacks is how many '?' the safety fallback put into the replacement
+            top (int, optional): Number of most frequent characters to list
+            **extra: Additional top-level entries, such as counts and cache statistics
+
+        Returns:
+            dict: JSON-serializable report
+        """
+        fallback_characters = 0
+        substitutions = []
+        for char, count in self.characters.most_common():
+            replacement, fallbacks = describe_substitution(char)
+            fallback_characters += count * fallbacks
+            if len(substitutions) < top:
+                substitutions.append({
+                    'char': char,
+                    'codepoint': f"U+{ord(char):04X}",
+                    'name': unicodedata.name(char, ''),
+                    'count': count,
+                    'replacement': replacement,
+                    'fallback': fallbacks > 0,
+                })
+
+        return {
+            'format': REPORT_FORMAT,
+            'wall_seconds': time.perf_counter() - self._started,
+            'stages': {name: {'seconds': self.seconds[name], 'calls': self.calls[name]}
+                       for name in self.calls},
+            'characters': {
+                'substituted': sum(self.characters.values()),
+                'distinct': len(self.characters),
+                'fallback': fallback_characters,
+                'top': substitutions,
+            },
+            **extra,
+        }
+
+
+def write_report(report, path, stdout=None):
+    """
+    Write a profile report as JSON to path, or to stdout if path is '-'.
+
+    Args:
+        report (dict): Report built by Profiler.report
+        path (str): Report file, or '-' for stdout
+        stdout (file, optional): Stream '-' stands for, by default sys.stdout;
+            scripts that send their messages to stderr pass the real stdout
+    """
+    if path == '-':
+        stdout = sys.stdout if stdout is None else stdout
+        json.dump(report, stdout, indent=2, ensure_ascii=False)
+        stdout.write('\n')
+        return
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2, ensure_ascii=False)
@@ -0,0 +1,246 @@
+"""
+Transliteration Profiles
+
+A profile is a JSON file naming what the normalizer turns characters into.
+A character is looked up as it is, so a precomposed 'ü' or '½' can have its
+own replacement; a character without one is NFKD-decomposed, its accents are
+removed and the remaining parts are looked up:
+
+    {
+        "description": "...",
+        "extends": "default",
+        "fallback": "?",
+        "replacements": {
+            "greek": {"α": "a", "β": "b"},
+            "math": {"°": null}
+        }
+    }
+
+Replacements are grouped so a profile extending another one can change a
+group entry by entry: its entries override those of the same group, a null
+entry removes one, and a null group removes the whole group.  Later groups
+win over earlier ones.  Characters left without an ASCII equivalent become
+the fallback, which may be empty to drop them.
+
+The built-in profiles live in the profiles directory next to this module;
+any other profile is given by its path.  Compiled translation tables are
+cached on disk, keyed by a hash of everything that went into them, so a
+profile is only compiled the first time it is used.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+
+# Directory of the built-in profiles
+PROFILE_DIR = Path(__file__).with_name('profiles')
+
+DEFAULT_PROFILE_NAME = 'default'
+
+# Bump when the layout of the cached tables changes
+TABLE_CACHE_FORMAT = 1
+
+# A resolved profile: its replacement groups with the extended profiles merged
+# in, the flattened character table and a digest of both and the fallback
+TransliterationProfile = namedtuple(
+    'TransliterationProfile', ['name', 'description', 'groups', 'replacements', 'fallback', 'digest'],
+)
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def available_profiles():
+    """Return the names of the built-in profiles."""
+    return sorted(path.stem for path in PROFILE_DIR.glob('*.json'))
+
+
+def _is_profile_path(name):
+    """Whether a profile name is a file path rather than the name of a built-in profile."""
+    return name.endswith('.json') or os.sep in name or '/' in name
+
+
+def absolute_profile_name(name):
+    """Make a profile path absolute, so it names the same file from any working directory."""
+    return os.path.abspath(name) if _is_profile_path(name) else name
+
+
+def _profile_path(name, base_dir=None):
+    """Find the file of a profile given by built-in name or by path, relative to base_dir if given."""
+    if _is_profile_path(name):
+        return Path(name) if base_dir is None else base_dir / name
+    path = PROFILE_DIR / f"{name}.json"
+    if not path.exists():
+        raise ValueError(f"Unknown transliteration profile {name!r} "
+                         f"(built-in profiles: {', '.join(available_profiles())})")
+    return path
+
+
+def _is_printable_ascii(text):
+    """Whether a string consists of printable ASCII characters only, without control characters."""
+    return isinstance(text, str) and all(' ' <= c <= '~' for c in text)
+
+
+def _check_replacement(path, group, char, replacement):
+    """Reject replacements the normalizer could not apply in a single table lookup."""
+    if not isinstance(char, str) or len(char) != 1:
+        raise ValueError(f"{path}: group {group!r} maps {char!r}, not a single character")
+    # The fast paths only look for non-ASCII characters and the grave accent
+    if char.isascii() and char != '`':
+        raise ValueError(f"{path}: group {group!r} maps the ASCII character {char!r}; "
+                         f"only '`' can be replaced")
+    # Control characters would corrupt the output, and NUL separates the strings normalize_many joins
+    if replacement is not None and not _is_printable_ascii(replacement):
+        raise ValueError(f"{path}: group {group!r} maps {char!r} to {replacement!r}, "
+                         f"not a string of printable ASCII characters")
+
+
+def _file_state(path):
+    """Modification time and size of a file, or None if it cannot be read."""
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return status.st_mtime_ns, status.st_size
+
+
+def _read_profile(path, seen, sources):
+    """
+    Read a profile file and the profiles it extends into (description, groups, fallback).
+
+    Every file read is appended to sources as a (path, _file_state(path)) tuple.
+    """
+    if path.resolve() in seen:
+        raise ValueError(f"{path}: profiles extend each other in a cycle")
+    seen = seen | {path.resolve()}
+    sources.append((path, _file_state(path)))
+    with open(path, 'r', encoding='utf-8') as profile_file:
+        data = json.load(profile_file)
+    if not isinstance(data, dict) or not isinstance(data.get('replacements', {}), dict):
+        raise ValueError(f"{path}: a profile is a JSON object with a 'replacements' object")
+
+    groups = {}
+    fallback = '?'
+    if data.get('extends') is not None:
+        _, groups, fallback = _read_profile(_profile_path(data['extends'], path.parent), seen, sources)
+
+    for group, entries in data.get('replacements', {}).items():
+        if entries is None:
+            groups.pop(group, None)
+            continue
+        if not isinstance(entries, dict):
+            raise ValueError(f"{path}: group {group!r} must be an object or null")
+        merged = dict(groups.get(group, {}))
+        for char, replacement in entries.items():
+            _check_replacement(path, group, char, replacement)
+            if replacement is None:
+                merged.pop(char, None)
+            else:
+                merged[char] = replacement
+        groups[group] = merged
+
+    fallback = data.get('fallback', fallback)
+    if not _is_printable_ascii(fallback):
+        raise ValueError(f"{path}: fallback must be a string of printable ASCII characters")
+    return data.get('description', ''), groups, fallback
+
+
+# Loaded profiles by resolved path, with the files they were read from and
+# the modification time and size of each
+_loaded_profiles = {}
+
+
+def load_profile(name=DEFAULT_PROFILE_NAME):
+    """
+    Load and resolve a transliteration profile.
+
+    Loaded profiles are cached until one of their files changes, so a
+    long-running process such as the daemon picks up edited profiles.
+
+    Args:
+        name (str, optional): Name of a built-in profile, or path of a profile file
+
+    Returns:
+        TransliterationProfile: The profile with the profiles it extends merged in
+
+    Raises:
+        ValueError: For an unknown name or an invalid profile
+        FileNotFoundError: For a profile path that does not exist
+    """
+    path = _profile_path(name)
+    key = str(path.resolve())
+    cached = _loaded_profiles.get(key)
+    if cached is not None and all(_file_state(source) == state for source, state in cached[1]):
+        return cached[0]
+
+    sources = []
+    description, groups, fallback = _read_profile(path, frozenset(), sources)
+    replacements = {}
+    for entries in groups.values():
+        replacements.update(entries)
+    payload = json.dumps([replacements, fallback], sort_keys=True, ensure_ascii=True)
+    profile = TransliterationProfile(name, description, groups, replacements, fallback,
+                                     _digest(payload.encode('utf-8')))
+    _loaded_profiles[key] = profile, sources
+    return profile
+
+
+def resolve_profile(profile):
+    """Return profile itself if it is a TransliterationProfile, else load it by name."""
+    return profile if isinstance(profile, TransliterationProfile) else load_profile(profile)
+
+
+def table_cache_dir():
+    """
+    Directory of the compiled table cache.
+
+    $UNICODE_CLEANER_CACHE_DIR if set, else unicode_cleaner under
+    $XDG_CACHE_HOME or ~/.cache.
+    """
+    if os.environ.get('UNICODE_CLEANER_CACHE_DIR'):
+        return Path(os.environ['UNICODE_CLEANER_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'unicode_cleaner'
+
+
+def load_compiled_table(key_parts, size, compile_table):
+    """
+    Load a compiled translation table from the disk cache, compiling it on a miss.
+
+    The cache is best effort: an unreadable or unwritable cache directory only
+    means the table is compiled again next time.
+
+    Args:
+        key_parts (list): JSON-serializable values the table is compiled from,
+            such as the profile digest and the Unicode database version
+        size (int): Number of entries a valid table has
+        compile_table (callable): Returns the table as a list of strings
+
+    Returns:
+        list: The table's strings
+    """
+    key = _digest(json.dumps([TABLE_CACHE_FORMAT, *key_parts], sort_keys=True).encode('utf-8'))
+    path = table_cache_dir() / f"table-{key}.json"
+    try:
+        with open(path, 'r', encoding='utf-8') as cache_file:
+            table = json.load(cache_file)
+        if isinstance(table, list) and len(table) == size:
+            return table
+    except (OSError, ValueError):
+        pass
+
+    table = compile_table()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so concurrent runs never read half a table
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(table, cache_file, separators=(',', ':'))
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+    return table
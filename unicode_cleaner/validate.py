@@ -0,0 +1,134 @@
+"""
+Training Data Validation
+
+Checks records against the instruction/context/response schema the league's
+online validator expects, so malformed data is found locally, with line
+numbers, instead of after an upload.  A record must be a JSON object whose
+'instruction' and 'response' are non-empty strings; 'context' is optional
+and may be empty, and no other fields are allowed.
+
+The checks are plain function calls on the parsed records, cheap enough to
+run inside the cleaning pass or across worker processes.
+"""
+
+import json
+from collections import Counter, namedtuple
+
+
+# Fields the league's schema defines
+REQUIRED_FIELDS = ('instruction', 'response')
+OPTIONAL_FIELDS = ('context',)
+
+# Fields each record must and may have, and whether others are tolerated
+Schema = namedtuple('Schema', ['required', 'optional', 'allow_extra'])
+
+DEFAULT_SCHEMA = Schema(REQUIRED_FIELDS, OPTIONAL_FIELDS, False)
+
+# Descriptions of the error codes, for summaries
+ERROR_DESCRIPTIONS = {
+    'invalid_json': 'invalid JSON',
+    'empty_line': 'empty lines',
+    'not_object': 'records that are not JSON objects',
+    'missing_field': 'missing fields',
+    'wrong_type': 'fields that are not strings',
+    'empty_field': 'empty required fields',
+    'unexpected_field': 'unexpected fields',
+}
+
+
+def check_record(record, schema=DEFAULT_SCHEMA):
+    """
+    Check a parsed record against a schema.
+
+    Args:
+        record: Parsed JSON value
+        schema (Schema, optional): Fields the record must and may have
+
+    Returns:
+        list: (code, field) tuples, one per problem; empty for a valid record
+    """
+    if not isinstance(record, dict):
+        return [('not_object', None)]
+
+    errors = []
+    for field in schema.required:
+        value = record.get(field)
+        if value is None and field not in record:
+            errors.append(('missing_field', field))
+        elif not isinstance(value, str):
+            errors.append(('wrong_type', field))
+        elif not value.strip():
+            errors.append(('empty_field', field))
+    for field in schema.optional:
+        if field in record and not isinstance(record[field], str):
+            errors.append(('wrong_type', field))
+    if not schema.allow_extra:
+        for field in record:
+            if field not in schema.required and field not in schema.optional:
+                errors.append(('unexpected_field', field))
+    return errors
+
+
+class ValidationReport:
+    """
+    Collects the schema errors of one or more files.
+
+    Errors are counted by code, and each one is written as a JSON line to
+    the report file if there is one.  Call begin_file() before each file so
+    the report can say where errors came from.
+    """
+
+    def __init__(self, report=None, schema=DEFAULT_SCHEMA):
+        """
+        Args:
+            report (file, optional): Text file receiving one JSON line per error
+            schema (Schema, optional): Fields the records must and may have
+        """
+        self.report = report
+        self.schema = schema
+        self.errors = Counter()
+        self.records_checked = 0
+        self.invalid_records = 0
+        self.files = []
+        self._last_error = None
+
+    def begin_file(self, name):
+        """Attribute the following errors to the named file."""
+        self.files.append(str(name))
+
+    def add(self, line_num, code, field=None, detail=None):
+        """
+        Record one error.
+
+        Args:
+            line_num (int): Line of the offending record in the current file
+            code (str): Error code, a key of ERROR_DESCRIPTIONS
+            field (str, optional): Field the error is about
+            detail (str, optional): Further explanation, such as a parser message
+        """
+        self.errors[code] += 1
+        # A record's errors arrive together, so it is counted at its first one
+        source = (len(self.files), line_num)
+        if source != self._last_error:
+            self._last_error = source
+            self.invalid_records += 1
+        if self.report is not None:
+            entry = {'file': self.files[-1] if self.files else None, 'line': line_num, 'error': code}
+            if field is not None:
+                entry['field'] = field
+            if detail is not None:
+                entry['detail'] = detail
+            self.report.write(json.dumps(entry) + '\n')
+
+    def format_summary(self):
+        """
+        Describe the errors found as printable lines.
+
+        Returns:
+            list: A total line followed by one line per error code
+        """
+        lines = [f"Validated {self.records_checked} records: {self.invalid_records} invalid, "
+                 f"{sum(self.errors.values())} errors"]
+        for code, count in self.errors.most_common():
+            lines.append(f"  {count} {ERROR_DESCRIPTIONS.get(code, code)}")
+        return lines